@@ -0,0 +1,85 @@
+from dotenv import load_dotenv
+load_dotenv()
+import argparse
+import asyncio
+import logging
+import os
+
+from src.agent.deep_research.batch_runner import load_topics, run_batch
+from src.utils import llm_provider
+
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless batch runner for the Deep Research Agent")
+    parser.add_argument("topics_file", type=str,
+                        help="Text file with one topic per line, or JSONL with {\"topic\", \"task_id\"} objects")
+    parser.add_argument("--save-dir", type=str, default="./tmp/deep_research",
+                        help="Directory for the per-topic output dirs, must be inside ./tmp/deep_research")
+    parser.add_argument("--summary", type=str, default=None,
+                        help="JSONL summary file, defaults to batch_summary.jsonl in the save dir")
+    parser.add_argument("--llm-provider", type=str, default=os.getenv("DEFAULT_LLM", "openai"), help="LLM provider")
+    parser.add_argument("--llm-model", type=str, default=None, help="LLM model name")
+    parser.add_argument("--llm-temperature", type=float, default=0.5, help="LLM temperature")
+    parser.add_argument("--llm-base-url", type=str, default=None, help="LLM base URL")
+    parser.add_argument("--max-topics", type=int, default=4, help="Topics researched at the same time")
+    parser.add_argument("--max-browsers", type=int, default=4, help="Browser agents running at once across all topics")
+    parser.add_argument("--max-llm-calls", type=int, default=None,
+                        help="LLM calls in flight across all topics, 0 for no limit. Defaults to 8, "
+                             "the process backend cannot limit LLM calls and requires 0")
+    parser.add_argument("--max-parallel-tasks", type=int, default=1, help="Tasks of one research category run at once")
+    parser.add_argument("--browser-max-steps", type=int, default=100, help="Step limit of one browser agent")
+    parser.add_argument("--browser-timeout", type=float, default=300,
+                        help="Seconds after which a browser agent is cancelled, 0 for no limit")
+    parser.add_argument("--browser-backend", choices=["inline", "process"], default="inline",
+                        help="Run browser agents on the main event loop or in worker processes")
+    parser.add_argument("--browser-workers", type=int, default=None,
+                        help="Worker processes of the process backend, defaults to --max-browsers")
+    parser.add_argument("--no-headless", action="store_true", help="Show the browser windows")
+    parser.add_argument("--no-query-cache", action="store_true", help="Bypass the cross-run query cache")
+    parser.add_argument("--no-plan-cache", action="store_true", help="Plan every topic anew instead of reusing cached plans")
+    parser.add_argument("--dedup-threshold", type=float, default=0.0,
+                        help="Similarity from which a query reuses the result of an earlier near-duplicate, "
+                             "0 disables deduplication, 0.9 is a conservative value")
+    parser.add_argument("--rerun-completed", action="store_true",
+                        help="Also research topics the summary already lists as completed")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    llm_kwargs = {"temperature": args.llm_temperature, "base_url": args.llm_base_url}
+    if args.llm_model:
+        llm_kwargs["model_name"] = args.llm_model
+    llm = llm_provider.get_llm_model(provider=args.llm_provider, **llm_kwargs)
+
+    topics = load_topics(args.topics_file)
+    logger.info(f"Loaded {len(topics)} topics from {args.topics_file}")
+    summaries = asyncio.run(run_batch(
+        topics,
+        llm=llm,
+        llm_config={"provider": args.llm_provider, **llm_kwargs},
+        browser_config={"headless": not args.no_headless},
+        save_dir=args.save_dir,
+        summary_path=args.summary,
+        max_concurrent_topics=args.max_topics,
+        max_browsers=args.max_browsers,
+        max_llm_calls=args.max_llm_calls if args.max_llm_calls is not None else (
+            0 if args.browser_backend == "process" else 8),
+        skip_completed=not args.rerun_completed,
+        max_parallel_tasks=args.max_parallel_tasks,
+        use_query_cache=not args.no_query_cache,
+        use_plan_cache=not args.no_plan_cache,
+        dedup_threshold=args.dedup_threshold,
+        browser_max_steps=args.browser_max_steps,
+        browser_timeout_s=args.browser_timeout or None,
+        browser_backend=args.browser_backend,
+        browser_workers=args.browser_workers or args.max_browsers,
+    ))
+    statuses = {}
+    for summary in summaries:
+        statuses[summary["status"]] = statuses.get(summary["status"], 0) + 1
+    print(f"Finished {len(summaries)} topics: {statuses}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,223 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import AsyncCallbackHandler
+
+from src.agent.deep_research.deep_research_agent import REPORT_FILENAME, DeepResearchAgent
+from src.agent.deep_research.process_backend import shutdown_browser_process_pool
+from src.browser.browser_pool import get_browser_pool
+from src.utils.llm_provider import with_callbacks
+
+logger = logging.getLogger(__name__)
+
+BATCH_SUMMARY_FILENAME = "batch_summary.jsonl"
+
+
+class LLMCallLimiter(AsyncCallbackHandler):
+    """
+    Caps the number of LLM calls in flight across every model wrapped with `limit_llm_calls`.
+
+    The limiter is a callback handler: a call takes a slot when it starts and gives it back when
+    it ends or fails. Calls that are cancelled, e.g. by browser timeouts or a stop request, do not
+    report their end, their slot is given back once the task that made the call finishes. Only
+    async calls are limited, sync calls run their callbacks on a separate event loop.
+    """
+
+    # Awaited in the task making the call instead of a task of its own, so the call waits for its slot
+    run_inline = True
+
+    def __init__(self, max_concurrent_calls: int):
+        self.max_concurrent_calls = max(1, max_concurrent_calls)
+        self._semaphore = asyncio.Semaphore(self.max_concurrent_calls)
+        # Task of every call holding a slot by run ID, nested calls of a task share its slot
+        self._holders: Dict[UUID, asyncio.Task] = {}
+        try:
+            self._loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._loop = None
+        self.calls = 0
+        self.wait_time_s = 0.0
+
+    async def on_chat_model_start(self, serialized, messages, *, run_id: UUID, **kwargs: Any) -> None:
+        task = asyncio.current_task()
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+        if task is None or task.get_loop() is not self._loop or task in self._holders.values():
+            return
+        start_time = time.perf_counter()
+        await self._semaphore.acquire()
+        self.wait_time_s += time.perf_counter() - start_time
+        self.calls += 1
+        self._holders[run_id] = task
+        task.add_done_callback(lambda _: self._release(run_id))
+
+    async def on_llm_end(self, response, *, run_id: UUID, **kwargs: Any) -> None:
+        self._release(run_id)
+
+    async def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._release(run_id)
+
+    def _release(self, run_id: UUID):
+        if self._holders.pop(run_id, None) is not None:
+            self._semaphore.release()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "max_concurrent_calls": self.max_concurrent_calls,
+            "calls": self.calls,
+            "in_flight": len(self._holders),
+            "wait_time_s": round(self.wait_time_s, 3),
+        }
+
+
+def limit_llm_calls(llm: Any, limiter: LLMCallLimiter) -> Any:
+    """Returns a copy of `llm` whose calls go through `limiter`. Objects other than chat models are returned unchanged."""
+    return with_callbacks(llm, limiter)
+
+
+def load_topics(topics_file: str) -> List[Dict[str, Any]]:
+    """
+    Reads research topics from a text file (one topic per line, `#` starts a comment) or from a
+    JSONL file whose lines are {"topic": ..., "task_id": ...} objects, `task_id` being optional.
+    """
+    topics = []
+    with open(topics_file, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if topics_file.endswith(".jsonl"):
+                entry = json.loads(line)
+                topics.append({"topic": entry["topic"], "task_id": entry.get("task_id")})
+            else:
+                topics.append({"topic": line, "task_id": None})
+    return topics
+
+
+def topic_task_id(topic: str) -> str:
+    """Stable task ID of a topic, so running the same batch again resumes unfinished topics."""
+    return "batch-" + hashlib.sha1(topic.encode("utf-8")).hexdigest()[:16]
+
+
+def _load_completed_task_ids(summary_path: str) -> set:
+    completed = set()
+    if not os.path.exists(summary_path):
+        return completed
+    with open(summary_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if entry.get("status") == "completed":
+                completed.add(entry.get("task_id"))
+    return completed
+
+
+async def run_batch(
+        topics: List[Dict[str, Any]],
+        llm: Any,
+        browser_config: Dict[str, Any],
+        save_dir: str = "./tmp/deep_research",
+        summary_path: Optional[str] = None,
+        max_concurrent_topics: int = 4,
+        max_browsers: int = 4,
+        max_llm_calls: int = 8,
+        skip_completed: bool = True,
+        mcp_server_config: Optional[Dict[str, Any]] = None,
+        llm_config: Optional[Dict[str, Any]] = None,
+        **run_kwargs,
+) -> List[Dict[str, Any]]:
+    """
+    Researches many topics concurrently, each with its own DeepResearchAgent and output dir.
+
+    All runs share one budget of `max_browsers` browser agents and `max_llm_calls` LLM calls in
+    flight (0 for no limit), at most `max_concurrent_topics` topics run at once. One JSON line per finished topic,
+    with its status and timings, is appended to `summary_path` as soon as the topic finishes.
+    Topics already completed according to the summary are skipped, unfinished ones resume from
+    their checkpoint because task IDs are derived from the topic. `llm_config`, the
+    `llm_provider.get_llm_model` kwargs of `llm`, lets the process browser backend rebuild the
+    model in its workers. The limiter cannot reach the LLM calls of browser worker processes, so
+    the process backend requires `max_llm_calls=0` (no limit); the token budget of each run still
+    applies to its workers.
+    """
+    if run_kwargs.get("browser_backend") == "process" and max_llm_calls:
+        raise ValueError(
+            "max_llm_calls cannot limit the LLM calls of browser worker processes, pass max_llm_calls=0 "
+            "with the process browser backend or use the inline backend."
+        )
+    save_dir = os.path.abspath(save_dir)
+    summary_path = summary_path or os.path.join(save_dir, BATCH_SUMMARY_FILENAME)
+    os.makedirs(os.path.dirname(os.path.abspath(summary_path)), exist_ok=True)
+    completed_task_ids = _load_completed_task_ids(summary_path) if skip_completed else set()
+
+    llm_limiter = LLMCallLimiter(max_llm_calls) if max_llm_calls else None
+    limited_llm = limit_llm_calls(llm, llm_limiter) if llm_limiter else llm
+    browser_semaphore = asyncio.Semaphore(max(1, max_browsers))
+    topic_semaphore = asyncio.Semaphore(max(1, max_concurrent_topics))
+    summary_lock = asyncio.Lock()
+    batch_start = time.perf_counter()
+
+    async def research_topic(entry: Dict[str, Any]) -> Dict[str, Any]:
+        topic = entry["topic"]
+        task_id = entry.get("task_id") or topic_task_id(topic)
+        if task_id in completed_task_ids:
+            logger.info(f"Skipping already completed topic '{topic}' ({task_id}).")
+            return {"topic": topic, "task_id": task_id, "status": "skipped"}
+
+        async with topic_semaphore:
+            agent = DeepResearchAgent(llm=limited_llm, browser_config=browser_config,
+                                      mcp_server_config=mcp_server_config, navigator_llm_config=llm_config)
+            started_at = time.time()
+            start_time = time.perf_counter()
+            try:
+                result = await agent.run(
+                    topic,
+                    task_id=task_id,
+                    save_dir=save_dir,
+                    max_parallel_browsers=max_browsers,
+                    browser_semaphore=browser_semaphore,
+                    **run_kwargs,
+                )
+            except Exception as e:
+                logger.error(f"Research for topic '{topic}' failed: {e}", exc_info=True)
+                result = {"status": "error", "message": str(e), "task_id": task_id}
+
+        final_state = result.get("final_state") or {}
+        output_dir = os.path.join(save_dir, task_id)
+        report_path = os.path.join(output_dir, REPORT_FILENAME)
+        summary = {
+            "topic": topic,
+            "task_id": task_id,
+            "status": result.get("status"),
+            "message": result.get("message"),
+            "output_dir": output_dir,
+            "report_path": report_path if os.path.exists(report_path) else None,
+            "search_result_count": final_state.get("search_result_count", 0),
+            "started_at": started_at,
+            "finished_at": time.time(),
+            "duration_s": round(time.perf_counter() - start_time, 3),
+        }
+        async with summary_lock:
+            with open(summary_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(summary, ensure_ascii=False) + "\n")
+        logger.info(f"Finished topic '{topic}' with status {summary['status']} in {summary['duration_s']}s.")
+        return summary
+
+    try:
+        summaries = await asyncio.gather(*[research_topic(entry) for entry in topics])
+    finally:
+        # Warm browsers belong to this event loop, close them before it ends
+        await get_browser_pool().close()
+        shutdown_browser_process_pool()
+    logger.info(
+        f"Batch of {len(topics)} topics finished in {time.perf_counter() - batch_start:.1f}s. "
+        f"LLM calls: {llm_limiter.get_stats() if llm_limiter else 'not limited'}"
+    )
+    return summaries
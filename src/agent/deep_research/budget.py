@@ -0,0 +1,119 @@
+import logging
+import time
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import AsyncCallbackHandler
+
+from src.utils.llm_provider import with_callbacks
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BROWSER_MAX_STEPS = 100  # BrowserUseAgent.run default
+
+
+class ResearchBudget:
+    """
+    Token, wall-time and browser-step budget of one research run.
+
+    Usage is tracked across planning, task execution and browser sub-agents. The budget
+    counts as exhausted once less than `synthesis_reserve` of the token or time budget is
+    left, so the run can still afford to write its report, or when no browser steps are left.
+    A limit of 0 or None means unlimited.
+    """
+
+    def __init__(
+            self,
+            max_tokens: Optional[int] = None,
+            max_wall_time_s: Optional[float] = None,
+            max_browser_steps: Optional[int] = None,
+            synthesis_reserve: float = 0.1,
+    ):
+        self.max_tokens = max_tokens or None
+        self.max_wall_time_s = max_wall_time_s or None
+        self.max_browser_steps = max_browser_steps or None
+        self.synthesis_reserve = synthesis_reserve
+        self.start_time = time.monotonic()
+        self.tokens_used = 0
+        self.browser_steps_used = 0
+
+    def add_tokens(self, tokens: int):
+        self.tokens_used += tokens
+
+    def add_browser_steps(self, steps: int):
+        self.browser_steps_used += steps
+
+    def elapsed_s(self) -> float:
+        return time.monotonic() - self.start_time
+
+    def remaining_tokens(self) -> Optional[int]:
+        """Tokens left for research before the synthesis reserve, None without a token budget."""
+        if not self.max_tokens:
+            return None
+        return max(0, int(self.max_tokens * (1 - self.synthesis_reserve)) - self.tokens_used)
+
+    def remaining_wall_time_s(self) -> Optional[float]:
+        """Time left for research before the synthesis reserve, None without a time budget."""
+        if not self.max_wall_time_s:
+            return None
+        return max(0.0, self.max_wall_time_s * (1 - self.synthesis_reserve) - self.elapsed_s())
+
+    def remaining_browser_steps(self, default: int = DEFAULT_BROWSER_MAX_STEPS) -> int:
+        """Step limit for the next browser sub-agent."""
+        if not self.max_browser_steps:
+            return default
+        return max(0, min(default, self.max_browser_steps - self.browser_steps_used))
+
+    def exhausted(self) -> Optional[str]:
+        """Returns why no further research should be started, or None while budget is left."""
+        if self.max_tokens and self.tokens_used >= self.max_tokens * (1 - self.synthesis_reserve):
+            return f"token budget exhausted ({self.tokens_used}/{self.max_tokens} tokens used)"
+        if self.max_wall_time_s and self.elapsed_s() >= self.max_wall_time_s * (1 - self.synthesis_reserve):
+            return f"time budget exhausted ({self.elapsed_s():.1f}/{self.max_wall_time_s:.1f}s elapsed)"
+        if self.max_browser_steps and self.browser_steps_used >= self.max_browser_steps:
+            return f"browser step budget exhausted ({self.browser_steps_used}/{self.max_browser_steps} steps used)"
+        return None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "tokens_used": self.tokens_used,
+            "max_tokens": self.max_tokens,
+            "elapsed_s": round(self.elapsed_s(), 3),
+            "max_wall_time_s": self.max_wall_time_s,
+            "browser_steps_used": self.browser_steps_used,
+            "max_browser_steps": self.max_browser_steps,
+            "exhausted": self.exhausted(),
+        }
+
+
+def llm_result_usage(response: Any) -> Dict[str, int]:
+    """Input, output and total tokens an LLM call reported in its LLMResult, zeros when it reported none."""
+    usage_totals = {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0}
+    for generations in response.generations:
+        for generation in generations:
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if usage:
+                for key in usage_totals:
+                    usage_totals[key] += usage.get(key, 0)
+    if not usage_totals["total_tokens"] and response.llm_output:
+        usage = response.llm_output.get("token_usage") or response.llm_output.get("usage") or {}
+        usage_totals["input_tokens"] = usage.get("input_tokens", 0) or usage.get("prompt_tokens", 0)
+        usage_totals["output_tokens"] = usage.get("output_tokens", 0) or usage.get("completion_tokens", 0)
+        usage_totals["total_tokens"] = usage.get("total_tokens", 0) or (
+                usage_totals["input_tokens"] + usage_totals["output_tokens"])
+    return usage_totals
+
+
+class TokenUsageCallback(AsyncCallbackHandler):
+    """Adds the token usage reported by every finished LLM call to a ResearchBudget."""
+
+    def __init__(self, budget: ResearchBudget):
+        self.budget = budget
+
+    async def on_llm_end(self, response, *, run_id: UUID, **kwargs: Any) -> None:
+        self.budget.add_tokens(llm_result_usage(response)["total_tokens"])
+
+
+def track_llm_usage(llm: Any, budget: ResearchBudget) -> Any:
+    """Returns a copy of `llm` whose token usage is charged to `budget`."""
+    return with_callbacks(llm, TokenUsageCallback(budget))
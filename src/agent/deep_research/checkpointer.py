@@ -0,0 +1,277 @@
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+from typing import Any, AsyncIterator, Dict, Iterator, Optional, Sequence, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_DB_FILENAME = "checkpoints.sqlite"
+
+# One row per thread and namespace, channel values are stored per channel so a put only writes the
+# channels that changed.
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS latest_checkpoints (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL,
+    checkpoint_id TEXT NOT NULL,
+    parent_checkpoint_id TEXT,
+    checkpoint_type TEXT NOT NULL,
+    checkpoint BLOB NOT NULL,
+    metadata_type TEXT NOT NULL,
+    metadata BLOB NOT NULL,
+    PRIMARY KEY (thread_id, checkpoint_ns)
+);
+CREATE TABLE IF NOT EXISTS channel_values (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL,
+    channel TEXT NOT NULL,
+    version TEXT NOT NULL,
+    type TEXT NOT NULL,
+    value BLOB NOT NULL,
+    PRIMARY KEY (thread_id, checkpoint_ns, channel)
+);
+CREATE TABLE IF NOT EXISTS pending_writes (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL,
+    checkpoint_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    channel TEXT NOT NULL,
+    type TEXT NOT NULL,
+    value BLOB NOT NULL,
+    task_path TEXT NOT NULL,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+);
+"""
+
+
+class SqliteCheckpointSaver(BaseCheckpointSaver[int]):
+    """
+    LangGraph checkpointer that keeps the latest checkpoint of every thread in a local SQLite file.
+
+    Research runs only ever resume from their last completed node, so a put replaces the previous
+    checkpoint, only rewrites the channels that changed and drops the pending writes of superseded
+    checkpoints. Nothing is held in memory, lookups read the database. Every put is committed
+    before the graph moves on, so a crashed or stopped run can continue from its last completed node.
+    The async methods run the database work in a thread, off the event loop.
+
+    Only the latest checkpoint is kept: `get_tuple` returns None for any older `checkpoint_id` and
+    `list` never yields older checkpoints, so state history and time travel are not supported.
+    """
+
+    def __init__(self, db_path: str):
+        super().__init__()
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=FULL")
+        self.conn.executescript(_SCHEMA)
+        # The connection is shared by the event loop thread and the threads of the async methods
+        self._lock = threading.Lock()
+
+    def _load_tuple(self, thread_id: str, checkpoint_ns: str, checkpoint_id: Optional[str]) -> Optional[CheckpointTuple]:
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT checkpoint_id, parent_checkpoint_id, checkpoint_type, checkpoint, metadata_type, metadata "
+                "FROM latest_checkpoints WHERE thread_id = ? AND checkpoint_ns = ?",
+                (thread_id, checkpoint_ns),
+            ).fetchone()
+            if row is None or (checkpoint_id and checkpoint_id != row[0]):
+                return None
+            saved_id, parent_checkpoint_id, checkpoint_type, checkpoint, metadata_type, metadata = row
+            values = self.conn.execute(
+                "SELECT channel, version, type, value FROM channel_values WHERE thread_id = ? AND checkpoint_ns = ?",
+                (thread_id, checkpoint_ns),
+            ).fetchall()
+            writes = self.conn.execute(
+                "SELECT task_id, channel, type, value FROM pending_writes "
+                "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? ORDER BY task_id, idx",
+                (thread_id, checkpoint_ns, saved_id),
+            ).fetchall()
+
+        checkpoint_: Checkpoint = self.serde.loads_typed((checkpoint_type, checkpoint))
+        channel_versions = {channel: str(version) for channel, version in checkpoint_["channel_versions"].items()}
+        channel_values = {
+            channel: self.serde.loads_typed((type_, value))
+            for channel, version, type_, value in values
+            if channel_versions.get(channel) == version and type_ != "empty"
+        }
+        return CheckpointTuple(
+            config={"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns,
+                                     "checkpoint_id": saved_id}},
+            checkpoint={**checkpoint_, "channel_values": channel_values},
+            metadata=self.serde.loads_typed((metadata_type, metadata)),
+            pending_writes=[(task_id, channel, self.serde.loads_typed((type_, value)))
+                            for task_id, channel, type_, value in writes],
+            parent_config=(
+                {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns,
+                                  "checkpoint_id": parent_checkpoint_id}}
+                if parent_checkpoint_id else None
+            ),
+        )
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        """The latest checkpoint of the thread, or None if `config` asks for an older one."""
+        return self._load_tuple(
+            config["configurable"]["thread_id"],
+            config["configurable"].get("checkpoint_ns", ""),
+            get_checkpoint_id(config),
+        )
+
+    def list(
+            self,
+            config: Optional[RunnableConfig],
+            *,
+            filter: Optional[Dict[str, Any]] = None,
+            before: Optional[RunnableConfig] = None,
+            limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        """Yields the latest checkpoint of the thread of `config`, or of every thread without one."""
+        with self._lock:
+            if config is None:
+                keys = self.conn.execute("SELECT thread_id, checkpoint_ns FROM latest_checkpoints").fetchall()
+            elif config["configurable"].get("checkpoint_ns") is not None:
+                keys = [(config["configurable"]["thread_id"], config["configurable"]["checkpoint_ns"])]
+            else:
+                keys = self.conn.execute("SELECT thread_id, checkpoint_ns FROM latest_checkpoints WHERE thread_id = ?",
+                                         (config["configurable"]["thread_id"],)).fetchall()
+        before_id = get_checkpoint_id(before) if before else None
+        count = 0
+        for thread_id, checkpoint_ns in keys:
+            checkpoint_tuple = self._load_tuple(thread_id, checkpoint_ns, get_checkpoint_id(config) if config else None)
+            if checkpoint_tuple is None:
+                continue
+            if before_id and checkpoint_tuple.config["configurable"]["checkpoint_id"] >= before_id:
+                continue
+            if filter and not all(checkpoint_tuple.metadata.get(key) == value for key, value in filter.items()):
+                continue
+            if limit is not None and count >= limit:
+                return
+            count += 1
+            yield checkpoint_tuple
+
+    def put(
+            self,
+            config: RunnableConfig,
+            checkpoint: Checkpoint,
+            metadata: CheckpointMetadata,
+            new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        saved_checkpoint = checkpoint.copy()
+        values: Dict[str, Any] = saved_checkpoint.pop("channel_values")
+        changed_values = [
+            (thread_id, checkpoint_ns, channel, str(version),
+             *(self.serde.dumps_typed(values[channel]) if channel in values else ("empty", b"")))
+            for channel, version in new_versions.items()
+        ]
+        checkpoint_row = (
+            thread_id, checkpoint_ns, checkpoint["id"], config["configurable"].get("checkpoint_id"),
+            *self.serde.dumps_typed(saved_checkpoint),
+            *self.serde.dumps_typed(get_checkpoint_metadata(config, metadata)),
+        )
+        with self._lock, self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO channel_values VALUES (?, ?, ?, ?, ?, ?)", changed_values)
+            self.conn.execute("INSERT OR REPLACE INTO latest_checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                              checkpoint_row)
+            # Writes of the superseded checkpoint are part of this one now
+            self.conn.execute(
+                "DELETE FROM pending_writes WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id != ?",
+                (thread_id, checkpoint_ns, checkpoint["id"]),
+            )
+        return {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns,
+                                 "checkpoint_id": checkpoint["id"]}}
+
+    def put_writes(
+            self,
+            config: RunnableConfig,
+            writes: Sequence[Tuple[str, Any]],
+            task_id: str,
+            task_path: str = "",
+    ) -> None:
+        outer_key = (
+            config["configurable"]["thread_id"],
+            config["configurable"].get("checkpoint_ns", ""),
+            config["configurable"]["checkpoint_id"],
+        )
+        rows = [
+            (*outer_key, task_id, WRITES_IDX_MAP.get(channel, idx), channel, *self.serde.dumps_typed(value), task_path)
+            for idx, (channel, value) in enumerate(writes)
+        ]
+        # Regular writes are kept as first written, special writes (errors, interrupts) replace earlier ones
+        with self._lock, self.conn:
+            self.conn.executemany("INSERT OR IGNORE INTO pending_writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                  [row for row in rows if row[4] >= 0])
+            self.conn.executemany("INSERT OR REPLACE INTO pending_writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                  [row for row in rows if row[4] < 0])
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock, self.conn:
+            for table in ("latest_checkpoints", "channel_values", "pending_writes"):
+                self.conn.execute(f"DELETE FROM {table} WHERE thread_id = ?", (thread_id,))
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+            self,
+            config: Optional[RunnableConfig],
+            *,
+            filter: Optional[Dict[str, Any]] = None,
+            before: Optional[RunnableConfig] = None,
+            limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        for checkpoint_tuple in await asyncio.to_thread(
+                lambda: list(self.list(config, filter=filter, before=before, limit=limit))):
+            yield checkpoint_tuple
+
+    async def aput(
+            self,
+            config: RunnableConfig,
+            checkpoint: Checkpoint,
+            metadata: CheckpointMetadata,
+            new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+            self,
+            config: RunnableConfig,
+            writes: Sequence[Tuple[str, Any]],
+            task_id: str,
+            task_path: str = "",
+    ) -> None:
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+
+def open_checkpointer(output_dir: str) -> Optional[SqliteCheckpointSaver]:
+    """Opens the checkpoint database of a research output dir, or returns None if that fails."""
+    db_path = os.path.join(str(output_dir), CHECKPOINT_DB_FILENAME)
+    try:
+        return SqliteCheckpointSaver(db_path)
+    except Exception as e:
+        logger.error(f"Failed to open checkpoint database {db_path}: {e}", exc_info=True)
+        return None
@@ -1,13 +1,15 @@
 import asyncio
+import contextvars
 import json
 import logging
+import math
 import os
 import threading
+import time
 import uuid
 from pathlib import Path
-from typing import Any, Dict, List, Optional, TypedDict
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, TypedDict
 
-from browser_use.browser.browser import BrowserConfig
 from langchain_community.tools.file_management import (
     ListDirectoryTool,
     ReadFileTool,
@@ -23,6 +25,7 @@ from langchain_core.messages import (
     ToolMessage,
 )
 from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.runnables import RunnableConfig
 from langchain_core.tools import StructuredTool, Tool
 
 # Langgraph imports
@@ -32,19 +35,129 @@ from pydantic import BaseModel, Field
 from browser_use.browser.context import BrowserContextConfig
 
 from src.agent.browser_use.browser_use_agent import BrowserUseAgent
-from src.browser.custom_browser import CustomBrowser
+from src.agent.deep_research.budget import DEFAULT_BROWSER_MAX_STEPS, ResearchBudget, track_llm_usage
+from src.agent.deep_research.checkpointer import SqliteCheckpointSaver, open_checkpointer
+from src.agent.deep_research.events import (
+    ResearchEvent,
+    ResearchEventType,
+    emit_event,
+    has_event_sink,
+    reset_event_sink,
+    set_event_sink,
+)
+from src.agent.deep_research.fast_fetch import FastFetcher, browser_fallback_query
+from src.agent.deep_research.message_compaction import compact_messages
+from src.agent.deep_research.process_backend import BrowserProcessPool, get_browser_process_pool, llm_spec_for
+from src.agent.deep_research.plan_cache import PlanCache, get_plan_cache
+from src.agent.deep_research.query_cache import QueryResultCache, get_query_cache, normalize_query
+from src.agent.deep_research.query_dedup import QueryDeduplicator
+from src.agent.deep_research.report_synthesis import (
+    SynthesisCache,
+    estimate_text_tokens,
+    llm_model_name,
+    summarize_sections,
+)
+from src.agent.deep_research.result_store import SearchResultStore, close_result_store, get_result_store
+from src.agent.deep_research.run_metrics import (
+    EVENT_LOG_FILENAME,
+    RunMetrics,
+    count_metric,
+    get_run_metrics,
+    reset_run_metrics,
+    set_run_metrics,
+    timed_node,
+    track_llm_metrics,
+)
+from src.browser.browser_pool import get_browser_pool
 from src.controller.custom_controller import CustomController
 from src.utils.mcp_client import setup_mcp_client_and_tools
+from src.utils.page_store import PageStore, get_page_store, is_search_page
 
 logger = logging.getLogger(__name__)
 
 # Constants
 REPORT_FILENAME = "report.md"
 PLAN_FILENAME = "research_plan.md"
-SEARCH_INFO_FILENAME = "search_info.json"
+SEARCH_INFO_FILENAME = "search_info.json"  # Legacy results file, migrated into the result store on resume
+DEFAULT_SYNTHESIS_CHUNK_TOKENS = 12000
+DEFAULT_BROWSER_TIMEOUT_S = 300
+DEFAULT_STOP_TIMEOUT_S = 2.0
+# Every batch of research tasks is one graph step, LangGraph's default limit of 25 steps would end
+# runs with plans of more than about 20 tasks
+GRAPH_RECURSION_LIMIT = 10000
+# Bump when the planning prompt changes, so cached plans of the old prompt are not reused
+PLAN_PROMPT_VERSION = "1"
+
+# Tools that append each of their results to the result store themselves
+_SELF_STORING_TOOLS = ("parallel_browser_search", "fast_fetch")
+# Fields of a browser result that describe one run of the query, not its finding, and are not cached
+_UNCACHED_RESULT_FIELDS = ("query", "status", "steps", "timings", "tokens", "error")
+
+# (category index, task index) of the research task a tool is running for. Set per asyncio task,
+# so results of tasks executed in parallel are attributed to the right plan entry.
+_CURRENT_RESEARCH_TASK: contextvars.ContextVar[Optional[tuple]] = contextvars.ContextVar(
+    "current_research_task", default=None
+)
+
 
-_AGENT_STOP_FLAGS = {}
-_BROWSER_AGENT_INSTANCES = {}
+def _task_result_record(result: Dict[str, Any], **fields) -> Dict[str, Any]:
+    """Adds the plan position of the running research task to a result before it is stored."""
+    location = _CURRENT_RESEARCH_TASK.get()
+    record = {**result, **fields}
+    if location:
+        record["category_index"], record["task_index"] = location
+    return record
+
+
+def _completed_queries(result_store: SearchResultStore) -> Dict[str, Dict[str, Any]]:
+    """
+    Browser queries an earlier run of the task already completed, by normalized query, read from its
+    stored results. A resumed run answers them from here instead of browsing again.
+    """
+    completed = {}
+    for record in result_store.iter_records():
+        if (record.get("tool_name") == "parallel_browser_search" and record.get("status") == "completed"
+                and record.get("result") and record.get("query")):
+            completed[normalize_query(record["query"])] = record
+    return completed
+
+
+def _emit_query_completed(result: Dict[str, Any]):
+    location = _CURRENT_RESEARCH_TASK.get() or (None, None)
+    run_metrics = get_run_metrics()
+    if run_metrics is not None:
+        run_metrics.record_query(result, category_index=location[0], task_index=location[1])
+    emit_event(
+        ResearchEventType.QUERY_COMPLETED,
+        query=result.get("query"),
+        status=result.get("status"),
+        category_index=location[0],
+        task_index=location[1],
+        cached=bool(result.get("cached")),
+        duplicate_of=result.get("duplicate_of"),
+    )
+
+
+def _visited_sources(history: Any, page_store: Optional[PageStore] = None) -> List[Dict[str, str]]:
+    """Pages a browser agent read, in visiting order, without search engine result pages."""
+    candidates = [(item.state.url, item.state.title) for item in history.history if item.state]
+    # Pages extracted from the page store were never opened in the browser
+    candidates += [(action["extract_url_content"].get("url"), None) for action in history.model_actions()
+                   if "extract_url_content" in action]
+    sources, seen = [], set()
+    for url, title in candidates:
+        if not url or not url.startswith("http") or url in seen or is_search_page(url):
+            continue
+        seen.add(url)
+        if not title and page_store is not None:
+            title = page_store.get_title(url)
+        sources.append({"url": url, "title": title or url})
+    return sources
+
+
+def _partial_result(history: Any) -> Optional[str]:
+    """Everything a browser agent extracted before it was cut short."""
+    return "\n".join(history.extracted_content()) or None
 
 
 async def run_single_browser_task(
@@ -54,10 +167,21 @@ async def run_single_browser_task(
         browser_config: Dict[str, Any],
         stop_event: threading.Event,
         use_vision: bool = False,
+        max_steps: int = DEFAULT_BROWSER_MAX_STEPS,
+        timeout_s: Optional[float] = None,
+        page_store: Optional[PageStore] = None,
+        page_extraction_llm: Optional[Any] = None,
+        agent_registry: Optional[Dict[str, Any]] = None,
 ) -> Dict[str, Any]:
     """
-    Runs a single BrowserUseAgent task.
-    Manages browser creation and closing for this specific task.
+    Runs a single BrowserUseAgent task of at most `max_steps` steps.
+    `llm` drives the navigation steps, `page_extraction_llm` (defaults to `llm`) the extract_content action.
+    While it runs, the browser agent is registered in `agent_registry`, the registry of the research run,
+    so stopping the run can stop it.
+    The browser is leased from the shared browser pool, the context is created and closed for this specific task.
+    An agent still running after `timeout_s` seconds is cancelled, the result then holds what it extracted
+    so far and the status is "timed_out". Results list the pages the agent read as "sources", and the context
+    launch, agent run and context close times as "timings".
     """
     if not BrowserUseAgent:
         return {
@@ -65,57 +189,26 @@ async def run_single_browser_task(
             "error": "BrowserUseAgent components not available.",
         }
 
-    # --- Browser Setup ---
-    # These should ideally come from the main agent's config
-    headless = browser_config.get("headless", False)
-    window_w = browser_config.get("window_width", 1280)
-    window_h = browser_config.get("window_height", 1100)
-    browser_user_data_dir = browser_config.get("user_data_dir", None)
-    use_own_browser = browser_config.get("use_own_browser", False)
-    browser_binary_path = browser_config.get("browser_binary_path", None)
-    wss_url = browser_config.get("wss_url", None)
-    cdp_url = browser_config.get("cdp_url", None)
-    disable_security = browser_config.get("disable_security", False)
-
-    bu_browser = None
     bu_browser_context = None
+    task_key = None
+    browser_pool = get_browser_pool()
+    # Shared by every returned result, close_s is filled in once the context is released
+    timings: Dict[str, float] = {}
     try:
         logger.info(f"Starting browser task for query: {task_query}")
-        extra_args = []
-        if use_own_browser:
-            browser_binary_path = os.getenv("BROWSER_PATH", None) or browser_binary_path
-            if browser_binary_path == "":
-                browser_binary_path = None
-            browser_user_data = browser_user_data_dir or os.getenv("BROWSER_USER_DATA", None)
-            if browser_user_data:
-                extra_args += [f"--user-data-dir={browser_user_data}"]
-        else:
-            browser_binary_path = None
-
-        bu_browser = CustomBrowser(
-            config=BrowserConfig(
-                headless=headless,
-                browser_binary_path=browser_binary_path,
-                extra_browser_args=extra_args,
-                wss_url=wss_url,
-                cdp_url=cdp_url,
-                new_context_config=BrowserContextConfig(
-                    window_width=window_w,
-                    window_height=window_h,
-                )
-            )
-        )
-
         context_config = BrowserContextConfig(
             save_downloads_path="./tmp/downloads",
-            window_height=window_h,
-            window_width=window_w,
+            window_height=browser_config.get("window_height", 1100),
+            window_width=browser_config.get("window_width", 1280),
             force_new_context=True,
         )
-        bu_browser_context = await bu_browser.new_context(config=context_config)
+        # Sub-agents only get a fresh context, the browser itself comes warm from the shared pool
+        launch_start = time.perf_counter()
+        bu_browser_context = await browser_pool.new_context(browser_config, context_config)
+        timings["launch_s"] = round(time.perf_counter() - launch_start, 3)
 
         # Simple controller example, replace with your actual implementation if needed
-        bu_controller = CustomController()
+        bu_controller = CustomController(page_store=page_store)
 
         # Construct the task prompt for BrowserUseAgent
         # Instruct it to find specific info and return title/URL
@@ -127,13 +220,14 @@ async def run_single_browser_task(
         2. The title of the source page or document.
         3. The URL of the source.
         Focus on accuracy and relevance. Avoid irrelevant details.
-        PDF cannot directly extract _content, please try to download first, then using read_file, if you can't save or read, please try other methods.
+        For PDF documents use the read_pdf_document action with the PDF URL and the research task as query, do not open them in the browser.
         """
 
         bu_agent_instance = BrowserUseAgent(
             task=bu_task_prompt,
             llm=llm,  # Use the passed LLM
-            browser=bu_browser,
+            page_extraction_llm=page_extraction_llm,
+            browser=bu_browser_context.browser,
             browser_context=bu_browser_context,
             controller=bu_controller,
             use_vision=use_vision,
@@ -141,8 +235,9 @@ async def run_single_browser_task(
         )
 
         # Store instance for potential stop() call
-        task_key = f"{task_id}_{uuid.uuid4()}"
-        _BROWSER_AGENT_INSTANCES[task_key] = bu_agent_instance
+        if agent_registry is not None:
+            task_key = str(uuid.uuid4())
+            agent_registry[task_key] = bu_agent_instance
 
         # --- Run with Stop Check ---
         # BrowserUseAgent needs to internally check a stop signal or have a stop method.
@@ -153,50 +248,63 @@ async def run_single_browser_task(
             return {"query": task_query, "result": None, "status": "cancelled"}
 
         # The run needs to be awaitable and ideally accept a stop signal or have a .stop() method
-        # result = await bu_agent_instance.run(max_steps=max_steps) # Add max_steps if applicable
-        # Let's assume a simplified run for now
         logger.info(f"Running BrowserUseAgent for: {task_query}")
-        result = await bu_agent_instance.run()  # Assuming run is the main method
+        run_start = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(bu_agent_instance.run(max_steps=max_steps), timeout=timeout_s)
+        except asyncio.TimeoutError:
+            timings["run_s"] = round(time.perf_counter() - run_start, 3)
+            history = bu_agent_instance.state.history
+            logger.warning(f"Browser task for '{task_query}' timed out after {timeout_s:.1f}s.")
+            return {"query": task_query, "result": _partial_result(history), "status": "timed_out",
+                    "steps": history.number_of_steps(), "sources": _visited_sources(history, page_store),
+                    "error": f"Timed out after {timeout_s:.1f}s.", "timings": timings}
+        timings["run_s"] = round(time.perf_counter() - run_start, 3)
         logger.info(f"BrowserUseAgent finished for: {task_query}")
 
-        final_data = result.final_result()
+        # Agents stopped by the step limit have no final result, keep what they extracted on the way
+        final_data = result.final_result() if result.is_done() else _partial_result(result)
+        steps = result.number_of_steps()
+        sources = _visited_sources(result, page_store)
 
         if stop_event.is_set():
             logger.info(f"Browser task for '{task_query}' stopped during execution.")
-            return {"query": task_query, "result": final_data, "status": "stopped"}
+            return {"query": task_query, "result": final_data, "status": "stopped", "steps": steps,
+                    "sources": sources, "timings": timings}
         else:
             logger.info(f"Browser result for '{task_query}': {final_data}")
-            return {"query": task_query, "result": final_data, "status": "completed"}
+            return {"query": task_query, "result": final_data, "status": "completed", "steps": steps,
+                    "sources": sources, "timings": timings}
 
     except Exception as e:
         logger.error(
             f"Error during browser task for query '{task_query}': {e}", exc_info=True
         )
-        return {"query": task_query, "error": str(e), "status": "failed"}
+        return {"query": task_query, "error": str(e), "status": "failed", "timings": timings}
     finally:
         if bu_browser_context:
             try:
-                await bu_browser_context.close()
+                close_start = time.perf_counter()
+                await browser_pool.release_context(bu_browser_context)
+                timings["close_s"] = round(time.perf_counter() - close_start, 3)
                 bu_browser_context = None
-                logger.info("Closed browser context.")
-            except Exception as e:
-                logger.error(f"Error closing browser context: {e}")
-        if bu_browser:
-            try:
-                await bu_browser.close()
-                bu_browser = None
-                logger.info("Closed browser.")
+                logger.info("Released browser context.")
             except Exception as e:
-                logger.error(f"Error closing browser: {e}")
+                logger.error(f"Error releasing browser context: {e}")
 
-        if task_key in _BROWSER_AGENT_INSTANCES:
-            del _BROWSER_AGENT_INSTANCES[task_key]
+        if task_key:
+            agent_registry.pop(task_key, None)
 
 
 class BrowserSearchInput(BaseModel):
     queries: List[str] = Field(
         description="List of distinct search queries to find information relevant to the research task."
     )
+    priorities: Optional[List[int]] = Field(
+        default=None,
+        description="Optional priority for each query, in the same order as `queries`. "
+                    "Queries with a higher priority are started first. Defaults to 0 for every query."
+    )
 
 
 async def _run_browser_search_tool(
@@ -206,48 +314,224 @@ async def _run_browser_search_tool(
         browser_config: Dict[str, Any],
         stop_event: threading.Event,
         max_parallel_browsers: int = 1,
+        browser_semaphore: Optional[asyncio.Semaphore] = None,
+        priorities: Optional[List[int]] = None,
+        max_queries_per_call: int = 10,
+        result_store: Optional[SearchResultStore] = None,
+        query_cache: Optional[QueryResultCache] = None,
+        query_deduplicator: Optional[QueryDeduplicator] = None,
+        budget: Optional[ResearchBudget] = None,
+        browser_max_steps: int = DEFAULT_BROWSER_MAX_STEPS,
+        browser_timeout_s: Optional[float] = DEFAULT_BROWSER_TIMEOUT_S,
+        page_store: Optional[PageStore] = None,
+        page_extraction_llm: Optional[Any] = None,
+        agent_registry: Optional[Dict[str, Any]] = None,
+        completed_queries: Optional[Dict[str, Dict[str, Any]]] = None,
+        process_pool: Optional[BrowserProcessPool] = None,
+        navigator_llm_spec: Any = None,
 ) -> List[Dict[str, Any]]:
     """
     Internal function to execute parallel browser searches based on LLM-provided queries.
-    Handles concurrency and stop signals.
+    Handles concurrency and stop signals. `browser_semaphore` caps browsers across
+    research tasks running in parallel, a per-call semaphore is used when it is missing.
+
+    Every query up to `max_queries_per_call` is put on a priority queue and drained by
+    `max_parallel_browsers` workers, queries beyond the cap are reported back as skipped.
+    Results keep the order of `queries` and carry their queue wait and run time. With a
+    `result_store`, each result is durably appended the moment its query finishes. Queries found in
+    `completed_queries`, the results an interrupted earlier run of the task stored, are not run again.
+    With a `process_pool`, browser agents run in its worker processes with the model of `navigator_llm_spec`.
+    Queries found in `query_cache` return the cached result without launching a browser agent.
+    With a `query_deduplicator`, near-duplicates of queries already run in this research run
+    (or queued in this call) wait for and reuse that query's result instead of being queued.
+    Each browser agent runs at most `browser_max_steps` steps and `browser_timeout_s` seconds.
+    With a `budget`, browser agents are limited to the remaining browser steps, the time left
+    is shared among the queries still waiting for a browser, and queries are skipped once the
+    budget is exhausted.
     """
-
-    # Limit queries just in case LLM ignores the description
-    queries = queries[:max_parallel_browsers]
+    priorities = list(priorities or [])
+    priorities += [0] * (len(queries) - len(priorities))
+    accepted = list(enumerate(queries))[:max_queries_per_call]
+    overflow = queries[max_queries_per_call:]
     logger.info(
-        f"[Browser Tool {task_id}] Running search for {len(queries)} queries: {queries}"
+        f"[Browser Tool {task_id}] Running search for {len(accepted)} queries: {[q for _, q in accepted]}"
     )
+    if overflow:
+        logger.warning(
+            f"[Browser Tool {task_id}] Skipping {len(overflow)} queries above the per-call limit of {max_queries_per_call}."
+        )
 
-    results = []
-    semaphore = asyncio.Semaphore(max_parallel_browsers)
+    semaphore = browser_semaphore or asyncio.Semaphore(max_parallel_browsers)
+    queue: asyncio.PriorityQueue = asyncio.PriorityQueue(maxsize=max(1, len(accepted)))
+    enqueue_time = time.perf_counter()
+    owned_entries = {}
+    duplicates = []
+    # Higher priority first, ties keep the order in which the LLM listed the queries
+    for index, query in sorted(accepted, key=lambda item: (-priorities[item[0]], item[0])):
+        if query_deduplicator is not None:
+            entry, is_duplicate, similarity = query_deduplicator.claim(query)
+            if is_duplicate:
+                duplicates.append((index, entry, similarity))
+                continue
+            owned_entries[index] = entry
+        queue.put_nowait((-priorities[index], index, query))
+    if duplicates:
+        logger.info(
+            f"[Browser Tool {task_id}] Suppressed {len(duplicates)} near-duplicate queries, "
+            f"launching {queue.qsize()} browser tasks."
+        )
 
-    async def task_wrapper(query):
+    search_results: List[Any] = [None] * len(accepted)
+
+    def query_timeout() -> Optional[float]:
+        remaining_time = budget.remaining_wall_time_s() if budget is not None else None
+        if remaining_time is None:
+            return browser_timeout_s
+        # Leave time for the queries queued behind this one, they start once a browser frees up
+        waves = math.ceil((queue.qsize() + 1) / max(1, max_parallel_browsers))
+        share = remaining_time / waves
+        return min(browser_timeout_s, share) if browser_timeout_s else share
+
+    async def run_query(query: str):
+        stored_result = completed_queries.get(normalize_query(query)) if completed_queries else None
+        if stored_result is not None:
+            logger.info(f"[Browser Tool {task_id}] Query already completed before the resume: {query}")
+            count_metric("resumed_queries")
+            return ({"query": query, "result": stored_result["result"], "status": "completed",
+                     "sources": stored_result.get("sources") or [], "resumed": True},
+                    time.perf_counter() - enqueue_time, 0.0)
+        if query_cache is not None:
+            cached_result = query_cache.get(query)
+            if cached_result is not None:
+                logger.info(f"[Browser Tool {task_id}] Query cache hit: {query}")
+                if not isinstance(cached_result, dict):
+                    # Entries cached before results were stored with their sources
+                    cached_result = {"result": cached_result}
+                return ({**cached_result, "query": query, "status": "completed", "cached": True},
+                        time.perf_counter() - enqueue_time, 0.0)
         async with semaphore:
+            queue_wait = time.perf_counter() - enqueue_time
             if stop_event.is_set():
                 logger.info(
                     f"[Browser Tool {task_id}] Skipping task due to stop signal: {query}"
                 )
-                return {"query": query, "result": None, "status": "cancelled"}
-            # Pass necessary injected configs and the stop event
-            return await run_single_browser_task(
-                query,
-                task_id,
-                llm,  # Pass the main LLM (or a dedicated one if needed)
-                browser_config,
-                stop_event,
-                # use_vision could be added here if needed
+                return {"query": query, "result": None, "status": "cancelled"}, queue_wait, 0.0
+            max_steps = browser_max_steps
+            if budget is not None:
+                exhausted = budget.exhausted()
+                max_steps = budget.remaining_browser_steps(default=browser_max_steps)
+                if exhausted or max_steps <= 0:
+                    logger.info(f"[Browser Tool {task_id}] Skipping query, research budget exhausted: {query}")
+                    return ({"query": query, "result": None, "status": "skipped",
+                             "error": f"Research {exhausted or 'browser step budget exhausted'}."}, queue_wait, 0.0)
+            start_time = time.perf_counter()
+            if process_pool is not None:
+                result = await process_pool.run_task(
+                    query,
+                    task_id,
+                    navigator_llm_spec,
+                    browser_config,
+                    stop_event,
+                    page_store_dir=os.path.dirname(page_store.db_path) if page_store is not None else None,
+                    max_tokens=budget.remaining_tokens() if budget is not None else None,
+                    max_steps=max_steps,
+                    timeout_s=query_timeout(),
+                )
+                if budget is not None:
+                    # LLM calls in the worker are not seen by the callbacks of this process
+                    budget.add_tokens(result.get("tokens", 0))
+            else:
+                # Pass necessary injected configs and the stop event
+                result = await run_single_browser_task(
+                    query,
+                    task_id,
+                    llm,  # Navigator tier of the run
+                    browser_config,
+                    stop_event,
+                    # use_vision could be added here if needed
+                    max_steps=max_steps,
+                    timeout_s=query_timeout(),
+                    page_store=page_store,
+                    page_extraction_llm=page_extraction_llm,
+                    agent_registry=agent_registry,
+                )
+            if budget is not None:
+                budget.add_browser_steps(result.get("steps", 0))
+            if query_cache is not None and result.get("status") == "completed" and result.get("result"):
+                query_cache.put(query, {key: value for key, value in result.items()
+                                        if key not in _UNCACHED_RESULT_FIELDS})
+            return result, queue_wait, time.perf_counter() - start_time
+
+    async def execute(index: int, query: str, priority: int):
+        try:
+            result, queue_wait, run_time = await run_query(query)
+            if isinstance(result, dict):
+                result = {**result, "priority": priority, "queue_wait_s": round(queue_wait, 3),
+                          "run_time_s": round(run_time, 3)}
+                # Results restored on resume are stored already
+                if result_store is not None and not result.get("resumed"):
+                    await result_store.aappend(
+                        _task_result_record(result, tool_name="parallel_browser_search", query_index=index)
+                    )
+                _emit_query_completed(result)
+            search_results[index] = result
+        except Exception as e:
+            search_results[index] = e
+            if result_store is not None:
+                await result_store.aappend(
+                    _task_result_record({"query": query, "error": str(e), "status": "failed"},
+                                        tool_name="parallel_browser_search", query_index=index)
+                )
+            _emit_query_completed({"query": query, "status": "failed"})
+        finally:
+            if index in owned_entries:
+                # Near-duplicates waiting for this query get its outcome and rerun themselves unless it completed
+                result = search_results[index]
+                query_deduplicator.resolve(
+                    owned_entries[index],
+                    result if isinstance(result, dict) else {"query": query, "status": "failed", "error": str(result)},
+                )
+
+    async def worker():
+        while True:
+            try:
+                neg_priority, index, query = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            try:
+                await execute(index, query, -neg_priority)
+            finally:
+                queue.task_done()
+
+    async def reuse_result(index: int, entry, similarity: float):
+        result = await query_deduplicator.reuse(entry, queries[index], similarity)
+        if result is None:
+            logger.info(f"[Browser Tool {task_id}] '{entry.query}' did not complete, running '{queries[index]}' itself.")
+            await execute(index, queries[index], priorities[index])
+            return
+        search_results[index] = result
+        if result_store is not None:
+            # The finding itself is stored once, under the query that produced it
+            await result_store.aappend(
+                _task_result_record({"query": result["query"], "status": "duplicate",
+                                     "duplicate_of": result["duplicate_of"], "similarity": result["similarity"]},
+                                    tool_name="parallel_browser_search", query_index=index)
             )
+        _emit_query_completed(result)
 
-    tasks = [task_wrapper(query) for query in queries]
-    search_results = await asyncio.gather(*tasks, return_exceptions=True)
+    num_workers = min(max_parallel_browsers, queue.qsize())
+    await asyncio.gather(
+        *[worker() for _ in range(num_workers)],
+        *[reuse_result(index, entry, similarity) for index, entry, similarity in duplicates],
+    )
 
     processed_results = []
     for i, res in enumerate(search_results):
         query = queries[i]  # Get corresponding query
         if isinstance(res, Exception):
             logger.error(
-                f"[Browser Tool {task_id}] Gather caught exception for query '{query}': {res}",
-                exc_info=True,
+                f"[Browser Tool {task_id}] Worker caught exception for query '{query}': {res}",
+                exc_info=res,
             )
             processed_results.append(
                 {"query": query, "error": str(res), "status": "failed"}
@@ -261,6 +545,11 @@ async def _run_browser_search_tool(
             processed_results.append(
                 {"query": query, "error": "Unexpected result type", "status": "failed"}
             )
+    for query in overflow:
+        processed_results.append(
+            {"query": query, "result": None, "status": "skipped",
+             "error": f"Exceeded the limit of {max_queries_per_call} queries per search call."}
+        )
 
     logger.info(
         f"[Browser Tool {task_id}] Finished search. Results count: {len(processed_results)}"
@@ -274,8 +563,25 @@ def create_browser_search_tool(
         task_id: str,
         stop_event: threading.Event,
         max_parallel_browsers: int = 1,
+        max_queries_per_call: int = 10,
+        result_store: Optional[SearchResultStore] = None,
+        query_cache: Optional[QueryResultCache] = None,
+        query_deduplicator: Optional[QueryDeduplicator] = None,
+        browser_semaphore: Optional[asyncio.Semaphore] = None,
+        budget: Optional[ResearchBudget] = None,
+        browser_max_steps: int = DEFAULT_BROWSER_MAX_STEPS,
+        browser_timeout_s: Optional[float] = DEFAULT_BROWSER_TIMEOUT_S,
+        page_store: Optional[PageStore] = None,
+        page_extraction_llm: Optional[Any] = None,
+        agent_registry: Optional[Dict[str, Any]] = None,
+        completed_queries: Optional[Dict[str, Dict[str, Any]]] = None,
+        process_pool: Optional[BrowserProcessPool] = None,
+        navigator_llm_spec: Any = None,
 ) -> StructuredTool:
-    """Factory function to create the browser search tool with necessary dependencies."""
+    """
+    Factory function to create the browser search tool with necessary dependencies.
+    Pass a `browser_semaphore` to share one browser limit between several research runs.
+    """
     # Use partial to bind the dependencies that aren't part of the LLM call arguments
     from functools import partial
 
@@ -286,25 +592,116 @@ def create_browser_search_tool(
         browser_config=browser_config,
         stop_event=stop_event,
         max_parallel_browsers=max_parallel_browsers,
+        # Shared by every call of this tool, so parallel research tasks respect the same browser limit
+        browser_semaphore=browser_semaphore or asyncio.Semaphore(max_parallel_browsers),
+        max_queries_per_call=max_queries_per_call,
+        result_store=result_store,
+        query_cache=query_cache,
+        query_deduplicator=query_deduplicator,
+        budget=budget,
+        browser_max_steps=browser_max_steps,
+        browser_timeout_s=browser_timeout_s,
+        page_store=page_store,
+        page_extraction_llm=page_extraction_llm,
+        agent_registry=agent_registry,
+        completed_queries=completed_queries,
+        process_pool=process_pool,
+        navigator_llm_spec=navigator_llm_spec,
     )
 
     return StructuredTool.from_function(
         coroutine=bound_tool_func,
         name="parallel_browser_search",
         description=f"""Use this tool to actively search the web for information related to a specific research task or question.
-It runs up to {max_parallel_browsers} searches in parallel using a browser agent for better results than simple scraping.
-Provide a list of distinct search queries(up to {max_parallel_browsers}) that are likely to yield relevant information.""",
+It runs up to {max_parallel_browsers} searches in parallel using a browser agent for better results than simple scraping, further queries are queued.
+Provide a list of distinct search queries(up to {max_queries_per_call}) that are likely to yield relevant information.""",
         args_schema=BrowserSearchInput,
     )
 
 
+class FastFetchInput(BaseModel):
+    urls: List[str] = Field(description="URLs of the pages to read.")
+
+
+async def _run_fast_fetch_tool(
+        urls: List[str],
+        fetcher: FastFetcher,
+        browser_search: Optional[Callable[..., Any]] = None,
+        result_store: Optional[SearchResultStore] = None,
+        max_urls_per_call: int = 10,
+) -> List[Dict[str, Any]]:
+    """
+    Reads pages over plain HTTP and returns their main content. Pages the fetcher cannot handle,
+    because they need JavaScript or interaction or the request failed, are passed on to
+    `browser_search` (the bound browser search tool) and come back as its results.
+    Every page read by the fetcher is appended to `result_store` right away.
+    """
+    accepted = urls[:max_urls_per_call]
+    pages = await fetcher.fetch_many(accepted)
+    results: List[Optional[Dict[str, Any]]] = [None] * len(accepted)
+    fallback = []
+    for index, (url, page) in enumerate(zip(accepted, pages)):
+        if page["status"] == "completed":
+            result = {"query": url, "result": f"Title: {page['title']}\n\n{page['content']}", "status": "completed",
+                      "sources": [{"url": url, "title": page["title"]}]}
+            if result_store is not None:
+                await result_store.aappend(_task_result_record(result, tool_name="fast_fetch", query_index=index))
+            _emit_query_completed(result)
+            results[index] = result
+        elif browser_search is not None:
+            fallback.append(index)
+        else:
+            results[index] = {"query": url, "result": None, "status": "failed",
+                              "error": page.get("error") or page.get("reason")}
+
+    if fallback:
+        logger.info(f"[Fast Fetch] Handing {len(fallback)} of {len(accepted)} pages to the browser agent.")
+        browser_results = await browser_search(
+            queries=[browser_fallback_query(accepted[index], pages[index].get("title")) for index in fallback]
+        )
+        for index, browser_result in zip(fallback, browser_results):
+            results[index] = {**browser_result, "url": accepted[index], "fallback": "browser"}
+
+    for url in urls[max_urls_per_call:]:
+        results.append({"query": url, "result": None, "status": "skipped",
+                        "error": f"Exceeded the limit of {max_urls_per_call} URLs per fetch call."})
+    return results
+
+
+def create_fast_fetch_tool(
+        fetcher: FastFetcher,
+        browser_search_tool: Optional[StructuredTool] = None,
+        result_store: Optional[SearchResultStore] = None,
+        max_urls_per_call: int = 10,
+) -> StructuredTool:
+    """Creates the fast_fetch tool, falling back to `browser_search_tool` for pages that need a browser."""
+    from functools import partial
+
+    bound_tool_func = partial(
+        _run_fast_fetch_tool,
+        fetcher=fetcher,
+        browser_search=browser_search_tool.coroutine if browser_search_tool else None,
+        result_store=result_store,
+        max_urls_per_call=max_urls_per_call,
+    )
+
+    return StructuredTool.from_function(
+        coroutine=bound_tool_func,
+        name="fast_fetch",
+        description=f"""Use this tool to read web pages whose URLs you already know, e.g. documentation, articles or papers.
+It downloads the pages directly and returns their main content, which is much faster than a browser search.
+Pages that need JavaScript or interaction are read by a browser agent automatically. Provide up to {max_urls_per_call} URLs.""",
+        args_schema=FastFetchInput,
+    )
+
+
 # --- Langgraph State Definition ---
 
 
 class ResearchTaskItem(TypedDict):
     # step: int # Maybe step within category, or just implicit by order
     task_description: str
-    status: str  # "pending", "completed", "failed"
+    status: str  # "pending", "completed", "failed", "skipped"
     queries: Optional[List[str]]
     result_summary: Optional[str]
 
@@ -319,9 +716,8 @@ class DeepResearchState(TypedDict):
     task_id: str
     topic: str
     research_plan: List[ResearchCategoryItem]  # CHANGED
-    search_results: List[Dict[str, Any]]
-    llm: Any
-    tools: List[Tool]
+    search_result_count: int  # Results themselves are streamed from the SearchResultStore in output_dir
+    # llms and tools are not part of the checkpointed state, nodes read them from config["configurable"]
     output_dir: Path
     browser_config: Dict[str, Any]
     final_report: Optional[str]
@@ -330,6 +726,13 @@ class DeepResearchState(TypedDict):
     stop_requested: bool
     error_message: Optional[str]
     messages: List[BaseMessage]
+    max_parallel_tasks: int
+    max_history_tokens: int
+    synthesis_mode: str  # "auto", "single" or "hierarchical"
+    synthesis_chunk_tokens: int
+    max_parallel_synthesis: int
+    skipped_tasks: List[Dict[str, Any]]  # Tasks left out when the research budget ran out
+    budget_exhausted: Optional[str]
 
 
 # --- Langgraph Nodes ---
@@ -405,46 +808,114 @@ def _load_previous_state(task_id: str, output_dir: str) -> Dict[str, Any]:
     else:
         logger.info(f"Plan file {plan_file} not found. Will start fresh.")
 
-    if os.path.exists(search_file):
-        try:
-            with open(search_file, "r", encoding="utf-8") as f:
-                state_updates["search_results"] = json.load(f)
-                logger.info(f"Loaded search results from {search_file}")
-        except Exception as e:
-            logger.error(f"Failed to load search results {search_file}: {e}")
-            state_updates["error_message"] = (
-                    state_updates.get("error_message", "") + f" Failed to load search results: {e}").strip()
+    try:
+        # Results stay on disk, only the store's index is loaded
+        result_store = get_result_store(output_dir)
+        result_store.migrate_legacy_json(search_file)
+        state_updates["search_result_count"] = len(result_store)
+        logger.info(f"Found {len(result_store)} search results in {result_store.path}")
+    except Exception as e:
+        logger.error(f"Failed to open search results in {output_dir}: {e}")
+        state_updates["error_message"] = (
+                state_updates.get("error_message", "") + f" Failed to load search results: {e}").strip()
 
     return state_updates
 
 
-def _save_plan_to_md(plan: List[ResearchCategoryItem], output_dir: str):
+def _format_plan_md(plan: List[ResearchCategoryItem]) -> str:
+    plan_md = "# Research Plan\n\n"
+    for cat_idx, category in enumerate(plan):
+        plan_md += f"## {cat_idx + 1}. {category['category_name']}\n\n"
+        for task_idx, task in enumerate(category['tasks']):
+            # [-] for failed, skipped tasks stay unchecked so a resumed run researches them
+            marker = "- [x]" if task["status"] == "completed" else "- [ ]" if task[
+                "status"] in ("pending", "skipped") else "- [-]"
+            plan_md += f"  {marker} {task['task_description']}\n"
+        plan_md += "\n"
+    return plan_md
+
+
+def _save_plan_to_md(plan: List[ResearchCategoryItem], output_dir: str,
+                     event_type: ResearchEventType = ResearchEventType.PLAN_UPDATED):
+    """Saves the plan as markdown and publishes it to the event stream of the run."""
     plan_file = os.path.join(output_dir, PLAN_FILENAME)
+    plan_md = _format_plan_md(plan)
+    emit_event(event_type, plan=plan, markdown=plan_md)
     try:
         with open(plan_file, "w", encoding="utf-8") as f:
-            f.write(f"# Research Plan\n\n")
-            for cat_idx, category in enumerate(plan):
-                f.write(f"## {cat_idx + 1}. {category['category_name']}\n\n")
-                for task_idx, task in enumerate(category['tasks']):
-                    marker = "- [x]" if task["status"] == "completed" else "- [ ]" if task[
-                                                                                          "status"] == "pending" else "- [-]"  # [-] for failed
-                    f.write(f"  {marker} {task['task_description']}\n")
-                f.write("\n")
+            f.write(plan_md)
         logger.info(f"Hierarchical research plan saved to {plan_file}")
     except Exception as e:
         logger.error(f"Failed to save research plan to {plan_file}: {e}")
 
 
-def _save_search_results_to_json(results: List[Dict[str, Any]], output_dir: str):
-    """Appends or overwrites search results to a JSON file."""
-    search_file = os.path.join(output_dir, SEARCH_INFO_FILENAME)
-    try:
-        # Simple overwrite for now, could be append
-        with open(search_file, "w", encoding="utf-8") as f:
-            json.dump(results, f, indent=2, ensure_ascii=False)
-        logger.info(f"Search results saved to {search_file}")
-    except Exception as e:
-        logger.error(f"Failed to save search results to {search_file}: {e}")
+def _iter_results_in_plan_order(result_store: SearchResultStore):
+    """
+    Streams stored results ordered by plan position instead of completion order.
+    Only the sort keys are kept in memory, records are read one by one via the offset index.
+    """
+    sort_keys = []
+    for record_id, record in enumerate(result_store.iter_records()):
+        sort_keys.append((
+            record.get("category_index", float("inf")),
+            record.get("task_index", 0),
+            record.get("query_index", 0),
+            record_id,
+        ))
+    sort_keys.sort()
+    yield from result_store.get_many(key[-1] for key in sort_keys)
+
+
+def _format_result_entry(result_entry: Dict[str, Any]) -> str:
+    """Formats one stored result as a findings block for the synthesis prompt."""
+    query = result_entry.get("query", "Unknown Query")  # From parallel_browser_search
+    tool_name = result_entry.get("tool_name")  # From other tools
+    status = result_entry.get("status", "unknown")
+    result_data = result_entry.get("result")  # From BrowserUseAgent's final_result
+    tool_output_str = result_entry.get("output")  # From other tools
+
+    formatted = ""
+    if tool_name == "fast_fetch" and status == "completed" and result_data:
+        formatted += f'### Finding from Page: "{query}"\n'
+        formatted += f"- **Content:**\n{result_data}\n"
+        formatted += "---\n"
+    elif tool_name == "parallel_browser_search" and status in ("completed", "timed_out") and result_data:
+        # result_data is the summary from BrowserUseAgent
+        formatted += f'### Finding from Web Search Query: "{query}"\n'
+        if status == "timed_out":
+            formatted += "- **Note:** Partial result, the search timed out before finishing.\n"
+        formatted += f"- **Summary:**\n{result_data}\n"  # result_data is already a summary string here
+        # If result_data contained title/URL, you'd format them here.
+        # The current BrowserUseAgent returns a string summary directly as 'final_data' in run_single_browser_task
+        formatted += "---\n"
+    elif tool_name not in _SELF_STORING_TOOLS and status == "completed" and tool_output_str:
+        formatted += f'### Finding from Tool: "{tool_name}" (Args: {result_entry.get("args")})\n'
+        formatted += f"- **Output:**\n{tool_output_str}\n"
+        formatted += "---\n"
+    elif status == "failed":
+        error = result_entry.get("error")
+        q_or_t = f"Query: \"{query}\"" if query != "Unknown Query" else f"Tool: \"{tool_name}\""
+        formatted += f'### Failed {q_or_t}\n'
+        formatted += f"- **Error:** {error}\n"
+        formatted += "---\n"
+    return formatted
+
+
+async def _generate_report(llm: Any, messages: List[BaseMessage]) -> str:
+    """Runs the final synthesis call, streaming the report tokens when someone listens to the run's events."""
+    if not has_event_sink():
+        response = await llm.ainvoke(messages)
+        return response.content
+    report_chunks = []
+    async for chunk in llm.astream(messages):
+        if isinstance(chunk.content, str) and chunk.content:
+            report_chunks.append(chunk.content)
+            emit_event(ResearchEventType.SYNTHESIS_TOKEN, text=chunk.content)
+    report = "".join(report_chunks)
+    # Reasoning models stream their thoughts in front of the answer, ainvoke of their wrappers strips them
+    if "</think>" in report:
+        report = report.split("</think>", 1)[1]
+    return report
 
 
 def _save_report_to_md(report: str, output_dir: Path):
@@ -458,13 +929,66 @@ def _save_report_to_md(report: str, output_dir: Path):
         logger.error(f"Failed to save final report to {report_file}: {e}")
 
 
-async def planning_node(state: DeepResearchState) -> Dict[str, Any]:
+def _build_plan(parsed_plan: Any) -> List[ResearchCategoryItem]:
+    """Turns the category list returned by the planner into a plan of pending tasks, skipping malformed entries."""
+    new_plan: List[ResearchCategoryItem] = []
+    for cat_idx, category_data in enumerate(parsed_plan):
+        if not isinstance(category_data,
+                          dict) or "category_name" not in category_data or "tasks" not in category_data:
+            logger.warning(f"Skipping invalid category data: {category_data}")
+            continue
+
+        tasks: List[ResearchTaskItem] = []
+        for task_idx, task_desc in enumerate(category_data["tasks"]):
+            if isinstance(task_desc, str):
+                tasks.append(
+                    ResearchTaskItem(
+                        task_description=task_desc,
+                        status="pending",
+                        queries=None,
+                        result_summary=None,
+                    )
+                )
+            else:  # Sometimes LLM puts tasks as {"task": "description"}
+                if isinstance(task_desc, dict) and "task_description" in task_desc:
+                    tasks.append(
+                        ResearchTaskItem(
+                            task_description=task_desc["task_description"],
+                            status="pending",
+                            queries=None,
+                            result_summary=None,
+                        )
+                    )
+                elif isinstance(task_desc, dict) and "task" in task_desc:  # common LLM mistake
+                    tasks.append(
+                        ResearchTaskItem(
+                            task_description=task_desc["task"],
+                            status="pending",
+                            queries=None,
+                            result_summary=None,
+                        )
+                    )
+                else:
+                    logger.warning(
+                        f"Skipping invalid task data: {task_desc} in category {category_data['category_name']}")
+
+        new_plan.append(
+            ResearchCategoryItem(
+                category_name=category_data["category_name"],
+                tasks=tasks,
+            )
+        )
+
+    return new_plan
+
+
+async def planning_node(state: DeepResearchState, config: RunnableConfig) -> Dict[str, Any]:
     logger.info("--- Entering Planning Node ---")
     if state.get("stop_requested"):
         logger.info("Stop requested, skipping planning.")
         return {"stop_requested": True}
 
-    llm = state["llm"]
+    llm = config["configurable"].get("planner_llm") or config["configurable"]["llm"]
     topic = state["topic"]
     existing_plan = state.get("research_plan")
     output_dir = state["output_dir"]
@@ -472,10 +996,26 @@ async def planning_node(state: DeepResearchState) -> Dict[str, Any]:
     if existing_plan and (
             state.get("current_category_index", 0) > 0 or state.get("current_task_index_in_category", 0) > 0):
         logger.info("Resuming with existing plan.")
-        _save_plan_to_md(existing_plan, output_dir)  # Ensure it's saved initially
+        _save_plan_to_md(existing_plan, output_dir, ResearchEventType.PLAN_CREATED)  # Ensure it's saved initially
         # current_category_index and current_task_index_in_category should be set by _load_previous_state
         return {"research_plan": existing_plan}
 
+    plan_cache: Optional[PlanCache] = config["configurable"].get("plan_cache")
+    model_name = llm_model_name(llm)
+    cached_plan = plan_cache.get(topic, model_name, PLAN_PROMPT_VERSION) if plan_cache is not None else None
+    if plan_cache is not None:
+        count_metric("plan_cache_hits" if cached_plan else "plan_cache_misses")
+    if cached_plan:
+        new_plan = _build_plan(cached_plan)
+        if new_plan:
+            logger.info(f"Using cached research plan with {len(new_plan)} categories for topic: {topic}")
+            _save_plan_to_md(new_plan, output_dir, ResearchEventType.PLAN_CREATED)
+            return {
+                "research_plan": new_plan,
+                "current_category_index": 0,
+                "current_task_index_in_category": 0,
+            }
+
     logger.info(f"Generating new research plan for topic: {topic}")
 
     prompt_text = f"""You are a meticulous research assistant. Your goal is to create a hierarchical research plan to thoroughly investigate the topic: "{topic}".
@@ -536,66 +1076,21 @@ Ensure the output is a valid JSON array.
         logger.debug(f"LLM response for plan: {raw_content}")
         parsed_plan_from_llm = json.loads(raw_content)
 
-        new_plan: List[ResearchCategoryItem] = []
-        for cat_idx, category_data in enumerate(parsed_plan_from_llm):
-            if not isinstance(category_data,
-                              dict) or "category_name" not in category_data or "tasks" not in category_data:
-                logger.warning(f"Skipping invalid category data: {category_data}")
-                continue
-
-            tasks: List[ResearchTaskItem] = []
-            for task_idx, task_desc in enumerate(category_data["tasks"]):
-                if isinstance(task_desc, str):
-                    tasks.append(
-                        ResearchTaskItem(
-                            task_description=task_desc,
-                            status="pending",
-                            queries=None,
-                            result_summary=None,
-                        )
-                    )
-                else:  # Sometimes LLM puts tasks as {"task": "description"}
-                    if isinstance(task_desc, dict) and "task_description" in task_desc:
-                        tasks.append(
-                            ResearchTaskItem(
-                                task_description=task_desc["task_description"],
-                                status="pending",
-                                queries=None,
-                                result_summary=None,
-                            )
-                        )
-                    elif isinstance(task_desc, dict) and "task" in task_desc:  # common LLM mistake
-                        tasks.append(
-                            ResearchTaskItem(
-                                task_description=task_desc["task"],
-                                status="pending",
-                                queries=None,
-                                result_summary=None,
-                            )
-                        )
-                    else:
-                        logger.warning(
-                            f"Skipping invalid task data: {task_desc} in category {category_data['category_name']}")
-
-            new_plan.append(
-                ResearchCategoryItem(
-                    category_name=category_data["category_name"],
-                    tasks=tasks,
-                )
-            )
+        new_plan = _build_plan(parsed_plan_from_llm)
 
         if not new_plan:
             logger.error("LLM failed to generate a valid plan structure from JSON.")
             return {"error_message": "Failed to generate research plan structure."}
 
         logger.info(f"Generated research plan with {len(new_plan)} categories.")
-        _save_plan_to_md(new_plan, output_dir)  # Save the hierarchical plan
+        _save_plan_to_md(new_plan, output_dir, ResearchEventType.PLAN_CREATED)  # Save the hierarchical plan
+        if plan_cache is not None:
+            plan_cache.put(topic, model_name, PLAN_PROMPT_VERSION, parsed_plan_from_llm)
 
         return {
             "research_plan": new_plan,
             "current_category_index": 0,
             "current_task_index_in_category": 0,
-            "search_results": [],
         }
 
     except json.JSONDecodeError as e:
@@ -606,68 +1101,37 @@ Ensure the output is a valid JSON array.
         return {"error_message": f"LLM Error during planning: {e}"}
 
 
-async def research_execution_node(state: DeepResearchState) -> Dict[str, Any]:
-    logger.info("--- Entering Research Execution Node ---")
-    if state.get("stop_requested"):
-        logger.info("Stop requested, skipping research execution.")
-        return {
-            "stop_requested": True,
-            "current_category_index": state["current_category_index"],
-            "current_task_index_in_category": state["current_task_index_in_category"],
-        }
-
-    plan = state["research_plan"]
-    cat_idx = state["current_category_index"]
-    task_idx = state["current_task_index_in_category"]
-    llm = state["llm"]
-    tools = state["tools"]
-    output_dir = str(state["output_dir"])
-    task_id = state["task_id"]  # For _AGENT_STOP_FLAGS
-
-    # This check should ideally be handled by `should_continue`
-    if not plan or cat_idx >= len(plan):
-        logger.info("Research plan complete or categories exhausted.")
-        return {}  # should route to synthesis
-
-    current_category = plan[cat_idx]
-    if task_idx >= len(current_category["tasks"]):
-        logger.info(f"All tasks in category '{current_category['category_name']}' completed. Moving to next category.")
-        # This logic is now effectively handled by should_continue and the index updates below
-        # The next iteration will be caught by should_continue or this node with updated indices
-        return {
-            "current_category_index": cat_idx + 1,
-            "current_task_index_in_category": 0,
-            "messages": state["messages"]  # Pass messages along
-        }
-
-    current_task = current_category["tasks"][task_idx]
-
-    if current_task["status"] == "completed":
-        logger.info(
-            f"Task '{current_task['task_description']}' in category '{current_category['category_name']}' already completed. Skipping.")
-        # Logic to find next task
-        next_task_idx = task_idx + 1
-        next_cat_idx = cat_idx
-        if next_task_idx >= len(current_category["tasks"]):
-            next_cat_idx += 1
-            next_task_idx = 0
-        return {
-            "current_category_index": next_cat_idx,
-            "current_task_index_in_category": next_task_idx,
-            "messages": state["messages"]  # Pass messages along
-        }
+async def _execute_research_task(
+        state: DeepResearchState,
+        config: RunnableConfig,
+        cat_idx: int,
+        task_idx: int,
+) -> Dict[str, Any]:
+    """
+    Executes a single research task: lets the LLM pick tool calls for it and runs them.
+    Updates the task status in place, appends tool results to the result store and returns
+    the new messages of this task, so several tasks can run side by side and be merged afterwards.
+    """
+    category = state["research_plan"][cat_idx]
+    task = category["tasks"][task_idx]
+    llm = config["configurable"]["llm"]
+    tools = config["configurable"]["tools"]
+    result_store = get_result_store(state["output_dir"])
+    # Lets the browser tool attribute the results it stores to this task
+    _CURRENT_RESEARCH_TASK.set((cat_idx, task_idx))
 
     logger.info(
-        f"Executing research task: '{current_task['task_description']}' (Category: '{current_category['category_name']}')"
+        f"Executing research task: '{task['task_description']}' (Category: '{category['category_name']}')"
     )
 
     llm_with_tools = llm.bind_tools(tools)
 
     # Construct messages for LLM invocation
     task_prompt_content = (
-        f"Current Research Category: {current_category['category_name']}\n"
-        f"Specific Task: {current_task['task_description']}\n\n"
+        f"Current Research Category: {category['category_name']}\n"
+        f"Specific Task: {task['task_description']}\n\n"
         "Please use the available tools, especially 'parallel_browser_search', to gather information for this specific task. "
+        "To read pages whose URLs you already know, prefer 'fast_fetch'. "
         "Provide focused search queries relevant ONLY to this task. "
         "If you believe you have sufficient information from previous steps for this specific task, you can indicate that you are ready to summarize or that no further search is needed."
     )
@@ -683,191 +1147,316 @@ async def research_execution_node(state: DeepResearchState) -> Dict[str, Any]:
         invocation_messages = state["messages"] + current_task_message_history
 
     try:
-        logger.info(f"Invoking LLM with tools for task: {current_task['task_description']}")
+        logger.info(f"Invoking LLM with tools for task: {task['task_description']}")
         ai_response: BaseMessage = await llm_with_tools.ainvoke(invocation_messages)
         logger.info("LLM invocation complete.")
 
-        tool_results = []
-        executed_tool_names = []
-        current_search_results = state.get("search_results", [])  # Get existing search results
-
         if not isinstance(ai_response, AIMessage) or not ai_response.tool_calls:
             logger.warning(
-                f"LLM did not call any tool for task '{current_task['task_description']}'. Response: {ai_response.content[:100]}..."
+                f"LLM did not call any tool for task '{task['task_description']}'. Response: {ai_response.content[:100]}..."
             )
-            current_task["status"] = "pending"  # Or "completed_no_tool" if LLM explains it's done
-            current_task["result_summary"] = f"LLM did not use a tool. Response: {ai_response.content}"
-            current_task["current_category_index"] = cat_idx
-            current_task["current_task_index_in_category"] = task_idx
-            return current_task
+            task["status"] = "pending"  # Or "completed_no_tool" if LLM explains it's done
+            task["result_summary"] = f"LLM did not use a tool. Response: {ai_response.content}"
             # We still save the plan and advance.
-        else:
-            # Process tool calls
-            for tool_call in ai_response.tool_calls:
-                tool_name = tool_call.get("name")
-                tool_args = tool_call.get("args", {})
-                tool_call_id = tool_call.get("id")
-
-                logger.info(f"LLM requested tool call: {tool_name} with args: {tool_args}")
-                executed_tool_names.append(tool_name)
-                selected_tool = next((t for t in tools if t.name == tool_name), None)
-
-                if not selected_tool:
-                    logger.error(f"LLM called tool '{tool_name}' which is not available.")
-                    tool_results.append(
-                        ToolMessage(content=f"Error: Tool '{tool_name}' not found.", tool_call_id=tool_call_id))
-                    continue
-
+            return {"messages": current_task_message_history + [ai_response]}
+
+        # Independent tool calls of one AI message run concurrently, capped by the run-wide semaphore
+        tool_call_semaphore = config["configurable"].get("tool_call_semaphore") or asyncio.Semaphore(
+            len(ai_response.tool_calls))
+        stop_event: Optional[threading.Event] = config["configurable"].get("stop_event")
+
+        async def run_tool_call(tool_call: Dict[str, Any]) -> Optional[ToolMessage]:
+            tool_name = tool_call.get("name")
+            tool_args = tool_call.get("args", {})
+            tool_call_id = tool_call.get("id")
+
+            logger.info(f"LLM requested tool call: {tool_name} with args: {tool_args}")
+            selected_tool = next((t for t in tools if t.name == tool_name), None)
+
+            if not selected_tool:
+                logger.error(f"LLM called tool '{tool_name}' which is not available.")
+                return ToolMessage(content=f"Error: Tool '{tool_name}' not found.", tool_call_id=tool_call_id)
+
+            wait_start = time.perf_counter()
+            async with tool_call_semaphore:
+                count_metric("tool_call_queue_wait_s", time.perf_counter() - wait_start)
+                if stop_event and stop_event.is_set():
+                    logger.info(f"Stop requested before executing tool: {tool_name}")
+                    return None
                 try:
-                    stop_event = _AGENT_STOP_FLAGS.get(task_id)
-                    if stop_event and stop_event.is_set():
-                        logger.info(f"Stop requested before executing tool: {tool_name}")
-                        current_task["status"] = "pending"  # Or a new "stopped" status
-                        _save_plan_to_md(plan, output_dir)
-                        return {"stop_requested": True, "research_plan": plan, "current_category_index": cat_idx,
-                                "current_task_index_in_category": task_idx}
-
                     logger.info(f"Executing tool: {tool_name}")
                     tool_output = await selected_tool.ainvoke(tool_args)
                     logger.info(f"Tool '{tool_name}' executed successfully.")
 
-                    if tool_name == "parallel_browser_search":
-                        current_search_results.extend(tool_output)  # tool_output is List[Dict]
-                    else:  # For other tools, we might need specific handling or just log
+                    # Search and fetch tools store each result themselves as soon as it finishes
+                    if tool_name not in _SELF_STORING_TOOLS:
                         logger.info(f"Result from tool '{tool_name}': {str(tool_output)[:200]}...")
-                        # Storing non-browser results might need a different structure or key in search_results
-                        current_search_results.append(
+                        await result_store.aappend(_task_result_record(
                             {"tool_name": tool_name, "args": tool_args, "output": str(tool_output),
-                             "status": "completed"})
+                             "status": "completed"}))
 
-                    tool_results.append(ToolMessage(content=json.dumps(tool_output), tool_call_id=tool_call_id))
+                    return ToolMessage(content=json.dumps(tool_output), tool_call_id=tool_call_id)
 
                 except Exception as e:
                     logger.error(f"Error executing tool '{tool_name}': {e}", exc_info=True)
-                    tool_results.append(
-                        ToolMessage(content=f"Error executing tool {tool_name}: {e}", tool_call_id=tool_call_id))
-                    current_search_results.append(
-                        {"tool_name": tool_name, "args": tool_args, "status": "failed", "error": str(e)})
-
-            # After processing all tool calls for this task
-            step_failed_tool_execution = any("Error:" in str(tr.content) for tr in tool_results)
-            # Consider a task successful if a browser search was attempted and didn't immediately error out during call
-            # The browser search itself returns status for each query.
-            browser_tool_attempted_successfully = "parallel_browser_search" in executed_tool_names and not step_failed_tool_execution
-
-            if step_failed_tool_execution:
-                current_task["status"] = "failed"
-                current_task[
-                    "result_summary"] = f"Tool execution failed. Errors: {[tr.content for tr in tool_results if 'Error' in str(tr.content)]}"
-            elif executed_tool_names:  # If any tool was called
-                current_task["status"] = "completed"
-                current_task["result_summary"] = f"Executed tool(s): {', '.join(executed_tool_names)}."
-                # TODO: Could ask LLM to summarize the tool_results for this task if needed, rather than just listing tools.
-            else:  # No tool calls but AI response had .tool_calls structure (empty)
-                current_task["status"] = "failed"  # Or a more specific status
-                current_task["result_summary"] = "LLM prepared for tool call but provided no tools."
-
-        # Save progress
-        _save_plan_to_md(plan, output_dir)
-        _save_search_results_to_json(current_search_results, output_dir)
+                    await result_store.aappend(_task_result_record(
+                        {"tool_name": tool_name, "args": tool_args, "status": "failed", "error": str(e)}))
+                    return ToolMessage(content=f"Error executing tool {tool_name}: {e}", tool_call_id=tool_call_id)
+
+        executed_tool_names = [tool_call.get("name") for tool_call in ai_response.tool_calls]
+        # gather keeps the order of the tool calls, so every ToolMessage follows its call in the history
+        tool_results = await asyncio.gather(*[run_tool_call(tool_call) for tool_call in ai_response.tool_calls])
+        if any(tool_result is None for tool_result in tool_results):
+            task["status"] = "pending"  # Or a new "stopped" status
+            return {"stop_requested": True, "messages": []}
+
+        # After processing all tool calls for this task
+        step_failed_tool_execution = any("Error:" in str(tr.content) for tr in tool_results)
+
+        if step_failed_tool_execution:
+            task["status"] = "failed"
+            task[
+                "result_summary"] = f"Tool execution failed. Errors: {[tr.content for tr in tool_results if 'Error' in str(tr.content)]}"
+        elif executed_tool_names:  # If any tool was called
+            task["status"] = "completed"
+            task["result_summary"] = f"Executed tool(s): {', '.join(executed_tool_names)}."
+            # TODO: Could ask LLM to summarize the tool_results for this task if needed, rather than just listing tools.
+        else:  # No tool calls but AI response had .tool_calls structure (empty)
+            task["status"] = "failed"  # Or a more specific status
+            task["result_summary"] = "LLM prepared for tool call but provided no tools."
+
+        return {"messages": current_task_message_history + [ai_response] + tool_results}
 
-        # Determine next indices
-        next_task_idx = task_idx + 1
-        next_cat_idx = cat_idx
-        if next_task_idx >= len(current_category["tasks"]):
-            next_cat_idx += 1
-            next_task_idx = 0
+    except Exception as e:
+        logger.error(f"Unhandled error during research execution for task '{task['task_description']}': {e}",
+                     exc_info=True)
+        task["status"] = "failed"
+        return {
+            "error_message": f"Core Execution Error on task '{task['task_description']}': {e}",
+            "messages": current_task_message_history,  # Preserve messages up to error
+        }
 
-        updated_messages = state["messages"] + current_task_message_history + [ai_response] + tool_results
 
+async def research_execution_node(state: DeepResearchState, config: RunnableConfig) -> Dict[str, Any]:
+    logger.info("--- Entering Research Execution Node ---")
+    if state.get("stop_requested"):
+        logger.info("Stop requested, skipping research execution.")
         return {
-            "research_plan": plan,
-            "search_results": current_search_results,
-            "current_category_index": next_cat_idx,
-            "current_task_index_in_category": next_task_idx,
-            "messages": updated_messages,
+            "stop_requested": True,
+            "current_category_index": state["current_category_index"],
+            "current_task_index_in_category": state["current_task_index_in_category"],
         }
 
-    except Exception as e:
-        logger.error(f"Unhandled error during research execution for task '{current_task['task_description']}': {e}",
-                     exc_info=True)
-        current_task["status"] = "failed"
+    plan = state["research_plan"]
+    cat_idx = state["current_category_index"]
+    task_idx = state["current_task_index_in_category"]
+    output_dir = str(state["output_dir"])
+    max_parallel_tasks = max(1, state.get("max_parallel_tasks") or 1)
+
+    # This check should ideally be handled by `should_continue`
+    if not plan or cat_idx >= len(plan):
+        logger.info("Research plan complete or categories exhausted.")
+        return {}  # should route to synthesis
+
+    budget: Optional[ResearchBudget] = config["configurable"].get("budget")
+    exhausted = budget.exhausted() if budget is not None else None
+    if exhausted:
+        # Write the report with what was gathered so far instead of running the remaining tasks
+        logger.warning(f"Research {exhausted}, skipping remaining tasks and moving to synthesis.")
+        skipped_tasks = list(state.get("skipped_tasks") or [])
+        for skip_cat_idx in range(cat_idx, len(plan)):
+            first_task_idx = task_idx if skip_cat_idx == cat_idx else 0
+            for skip_task_idx, task in enumerate(plan[skip_cat_idx]["tasks"]):
+                if skip_task_idx < first_task_idx or task["status"] == "completed":
+                    continue
+                task["status"] = "skipped"
+                task["result_summary"] = f"Skipped: {exhausted}."
+                skipped_tasks.append({
+                    "category_index": skip_cat_idx,
+                    "task_index": skip_task_idx,
+                    "task_description": task["task_description"],
+                    "reason": exhausted,
+                })
         _save_plan_to_md(plan, output_dir)
-        # Determine next indices even on error to attempt to move on
-        next_task_idx = task_idx + 1
-        next_cat_idx = cat_idx
-        if next_task_idx >= len(current_category["tasks"]):
-            next_cat_idx += 1
-            next_task_idx = 0
         return {
             "research_plan": plan,
+            "skipped_tasks": skipped_tasks,
+            "budget_exhausted": exhausted,
+            "current_category_index": len(plan),
+            "current_task_index_in_category": 0,
+        }
+
+    current_category = plan[cat_idx]
+    if task_idx >= len(current_category["tasks"]):
+        logger.info(f"All tasks in category '{current_category['category_name']}' completed. Moving to next category.")
+        # This logic is now effectively handled by should_continue and the index updates below
+        # The next iteration will be caught by should_continue or this node with updated indices
+        return {
+            "current_category_index": cat_idx + 1,
+            "current_task_index_in_category": 0,
+            "messages": state["messages"]  # Pass messages along
+        }
+
+    # Collect the next batch of unfinished tasks of this category. Tasks inside a category are
+    # independent, so up to `max_parallel_tasks` of them are fanned out at once.
+    batch_task_indices = []
+    scan_idx = task_idx
+    while scan_idx < len(current_category["tasks"]) and len(batch_task_indices) < max_parallel_tasks:
+        task = current_category["tasks"][scan_idx]
+        if task["status"] == "completed":
+            logger.info(
+                f"Task '{task['task_description']}' in category '{current_category['category_name']}' already completed. Skipping.")
+        else:
+            batch_task_indices.append(scan_idx)
+        scan_idx += 1
+
+    # Determine next indices
+    next_task_idx = scan_idx
+    next_cat_idx = cat_idx
+    if next_task_idx >= len(current_category["tasks"]):
+        next_cat_idx += 1
+        next_task_idx = 0
+
+    if not batch_task_indices:
+        return {
             "current_category_index": next_cat_idx,
             "current_task_index_in_category": next_task_idx,
-            "error_message": f"Core Execution Error on task '{current_task['task_description']}': {e}",
-            "messages": state["messages"] + current_task_message_history  # Preserve messages up to error
+            "messages": state["messages"]  # Pass messages along
         }
 
+    if len(batch_task_indices) > 1:
+        logger.info(
+            f"Executing {len(batch_task_indices)} tasks of category '{current_category['category_name']}' in parallel.")
+
+    async def execute_task(i: int) -> Dict[str, Any]:
+        task = current_category["tasks"][i]
+        emit_event(ResearchEventType.TASK_STARTED, category_index=cat_idx, task_index=i,
+                   task_description=task["task_description"])
+        outcome = await _execute_research_task(state, config, cat_idx, i)
+        emit_event(ResearchEventType.TASK_FINISHED, category_index=cat_idx, task_index=i,
+                   task_description=task["task_description"], status=task["status"])
+        return outcome
+
+    task_outcomes = await asyncio.gather(*[execute_task(i) for i in batch_task_indices])
+
+    # Merge in plan order so messages, results and the saved checkpoint do not depend on completion order
+    updated_messages = list(state["messages"])
+    error_message = None
+    stop_requested = False
+    for outcome in task_outcomes:
+        updated_messages.extend(outcome["messages"])
+        stop_requested = stop_requested or outcome.get("stop_requested", False)
+        error_message = error_message or outcome.get("error_message")
+
+    # Keep the history that is re-sent with every task inside the token budget,
+    # the full tool outputs stay available in the result store
+    updated_messages = compact_messages(updated_messages, state.get("max_history_tokens") or 0)
+
+    # Save progress, search results were already appended to the result store as they completed
+    _save_plan_to_md(plan, output_dir)
+    search_result_count = len(get_result_store(output_dir))
+
+    if stop_requested:
+        # Resume from the start of this batch, tasks finished in it are skipped as completed
+        return {
+            "stop_requested": True,
+            "research_plan": plan,
+            "search_result_count": search_result_count,
+            "current_category_index": cat_idx,
+            "current_task_index_in_category": task_idx,
+            "messages": updated_messages,
+        }
+
+    updates = {
+        "research_plan": plan,
+        "search_result_count": search_result_count,
+        "current_category_index": next_cat_idx,
+        "current_task_index_in_category": next_task_idx,
+        "messages": updated_messages,
+    }
+    if error_message:
+        updates["error_message"] = error_message
+    return updates
 
-async def synthesis_node(state: DeepResearchState) -> Dict[str, Any]:
+
+async def synthesis_node(state: DeepResearchState, config: RunnableConfig) -> Dict[str, Any]:
     """Synthesizes the final report from the collected search results."""
     logger.info("--- Entering Synthesis Node ---")
     if state.get("stop_requested"):
         logger.info("Stop requested, skipping synthesis.")
         return {"stop_requested": True}
 
-    llm = state["llm"]
+    llm = config["configurable"].get("synthesizer_llm") or config["configurable"]["llm"]
     topic = state["topic"]
-    search_results = state.get("search_results", [])
     output_dir = state["output_dir"]
     plan = state["research_plan"]  # Include plan for context
+    result_store = get_result_store(output_dir)
 
-    if not search_results:
+    if not len(result_store):
         logger.warning("No search results found to synthesize report.")
         report = f"# Research Report: {topic}\n\nNo information was gathered during the research process."
         _save_report_to_md(report, output_dir)
+        emit_event(ResearchEventType.REPORT_READY, report=report, path=os.path.join(output_dir, REPORT_FILENAME))
         return {"final_report": report}
 
     logger.info(
-        f"Synthesizing report from {len(search_results)} collected search result entries."
+        f"Synthesizing report from {len(result_store)} collected search result entries."
     )
-
-    # Prepare context for the LLM
-    # Format search results nicely, maybe group by query or original plan step
-    formatted_results = ""
-    references = {}
-    ref_count = 1
-    for i, result_entry in enumerate(search_results):
-        query = result_entry.get("query", "Unknown Query")  # From parallel_browser_search
-        tool_name = result_entry.get("tool_name")  # From other tools
-        status = result_entry.get("status", "unknown")
-        result_data = result_entry.get("result")  # From BrowserUseAgent's final_result
-        tool_output_str = result_entry.get("output")  # From other tools
-
-        if tool_name == "parallel_browser_search" and status == "completed" and result_data:
-            # result_data is the summary from BrowserUseAgent
-            formatted_results += f'### Finding from Web Search Query: "{query}"\n'
-            formatted_results += f"- **Summary:**\n{result_data}\n"  # result_data is already a summary string here
-            # If result_data contained title/URL, you'd format them here.
-            # The current BrowserUseAgent returns a string summary directly as 'final_data' in run_single_browser_task
-            formatted_results += "---\n"
-        elif tool_name != "parallel_browser_search" and status == "completed" and tool_output_str:
-            formatted_results += f'### Finding from Tool: "{tool_name}" (Args: {result_entry.get("args")})\n'
-            formatted_results += f"- **Output:**\n{tool_output_str}\n"
-            formatted_results += "---\n"
-        elif status == "failed":
-            error = result_entry.get("error")
-            q_or_t = f"Query: \"{query}\"" if query != "Unknown Query" else f"Tool: \"{tool_name}\""
-            formatted_results += f'### Failed {q_or_t}\n'
-            formatted_results += f"- **Error:** {error}\n"
-            formatted_results += "---\n"
+    emit_event(ResearchEventType.SYNTHESIS_STARTED, result_count=len(result_store),
+               mode=state.get("synthesis_mode") or "auto")
+
+    # Prepare context for the LLM, grouped by research category
+    sections: Dict[Any, List[str]] = {}
+    references = {}  # url -> {"id", "title", "url"}, numbered in plan order
+    for result_entry in _iter_results_in_plan_order(result_store):
+        block = _format_result_entry(result_entry)
+        if block:
+            sections.setdefault(result_entry.get("category_index"), []).append(block)
+            for source in result_entry.get("sources") or []:
+                if source["url"] not in references:
+                    references[source["url"]] = {"id": len(references) + 1, "url": source["url"],
+                                                 "title": source.get("title") or source["url"]}
+    formatted_results = "".join(block for blocks in sections.values() for block in blocks)
+
+    synthesis_mode = state.get("synthesis_mode") or "auto"
+    chunk_tokens = state.get("synthesis_chunk_tokens") or DEFAULT_SYNTHESIS_CHUNK_TOKENS
+    if synthesis_mode == "hierarchical" or (
+            synthesis_mode == "auto" and estimate_text_tokens(formatted_results) > chunk_tokens):
+        # Too much for one call: condense each category concurrently and write the report from the summaries
+        titled_sections = []
+        for cat_idx, blocks in sections.items():
+            if isinstance(cat_idx, int) and cat_idx < len(plan):
+                titled_sections.append((plan[cat_idx]["category_name"], blocks))
+            else:
+                titled_sections.append(("Other Findings", blocks))
+        try:
+            section_summaries = await summarize_sections(
+                llm,
+                topic,
+                titled_sections,
+                chunk_tokens=chunk_tokens,
+                max_parallel=state.get("max_parallel_synthesis") or 1,
+                cache=SynthesisCache(str(output_dir)),
+            )
+        except Exception as e:
+            logger.error(f"Error during section synthesis: {e}", exc_info=True)
+            return {"error_message": f"LLM Error during synthesis: {e}"}
+        formatted_results = "".join(
+            f"### Summary of Findings: {section}\n{summary}\n---\n" for section, summary in section_summaries
+        )
 
     # Prepare the research plan context
     plan_summary = "\nResearch Plan Followed:\n"
     for cat_idx, category in enumerate(plan):
         plan_summary += f"\n#### Category {cat_idx + 1}: {category['category_name']}\n"
         for task_idx, task in enumerate(category['tasks']):
-            marker = "[x]" if task["status"] == "completed" else "[ ]" if task["status"] == "pending" else "[-]"
-            plan_summary += f"  - {marker} {task['task_description']}\n"
+            marker = "[x]" if task["status"] == "completed" else "[ ]" if task[
+                "status"] in ("pending", "skipped") else "[-]"
+            suffix = " (not researched, budget exhausted)" if task["status"] == "skipped" else ""
+            plan_summary += f"  - {marker} {task['task_description']}{suffix}\n"
+    if state.get("budget_exhausted"):
+        plan_summary += (f"\nResearch stopped early ({state['budget_exhausted']}), "
+                         f"{len(state.get('skipped_tasks') or [])} planned tasks were not researched.\n")
 
     synthesis_prompt = ChatPromptTemplate.from_messages(
         [
@@ -886,7 +1475,8 @@ async def synthesis_node(state: DeepResearchState) -> Dict[str, Any]:
             ),
             (
                 "human",
-                f"""
+                # Template variables, not an f-string: braces inside findings must not be parsed as placeholders
+                """
             **Research Topic:** {topic}
 
             {plan_summary}
@@ -903,14 +1493,14 @@ async def synthesis_node(state: DeepResearchState) -> Dict[str, Any]:
     )
 
     try:
-        response = await llm.ainvoke(
+        final_report_md = await _generate_report(
+            llm,
             synthesis_prompt.format_prompt(
                 topic=topic,
                 plan_summary=plan_summary,
                 formatted_results=formatted_results,
             ).to_messages()
         )
-        final_report_md = response.content
 
         # Append the reference list automatically to the end of the generated markdown
         if references:
@@ -925,6 +1515,8 @@ async def synthesis_node(state: DeepResearchState) -> Dict[str, Any]:
 
         logger.info("Successfully synthesized the final report.")
         _save_report_to_md(final_report_md, output_dir)
+        emit_event(ResearchEventType.REPORT_READY, report=final_report_md,
+                   path=os.path.join(output_dir, REPORT_FILENAME))
         return {"final_report": final_report_md}
 
     except Exception as e:
@@ -985,17 +1577,38 @@ class DeepResearchAgent:
             llm: Any,
             browser_config: Dict[str, Any],
             mcp_server_config: Optional[Dict[str, Any]] = None,
+            planner_llm: Optional[Any] = None,
+            navigator_llm: Optional[Any] = None,
+            synthesizer_llm: Optional[Any] = None,
+            page_extraction_llm: Optional[Any] = None,
+            navigator_llm_config: Optional[Dict[str, Any]] = None,
     ):
         """
         Initializes the DeepSearchAgent.
 
         Args:
-            llm: The Langchain compatible language model instance.
+            llm: The Langchain compatible language model instance. It executes the research tasks
+                 and stands in for every model tier left unset.
             browser_config: Configuration dictionary for the BrowserUseAgent tool.
                             Example: {"headless": True, "window_width": 1280, ...}
+                            Optional "pool_size" and "pool_max_uses" keys tune the shared browser pool.
             mcp_server_config: Optional configuration for the MCP client.
+            planner_llm: Optional model writing the research plan.
+            navigator_llm: Optional model driving the steps of the browser sub-agents. They make most
+                           of the LLM calls of a run, a fast model here cuts latency and cost the most.
+            synthesizer_llm: Optional model writing the final report.
+            page_extraction_llm: Optional model extracting page content for the browser sub-agents,
+                                 defaults to the navigator model.
+            navigator_llm_config: Optional `llm_provider.get_llm_model` kwargs, provider included, of the
+                                  navigator model. The process browser backend builds the model from them
+                                  in its workers, most chat models cannot be sent there as objects.
         """
         self.llm = llm
+        self.planner_llm = planner_llm or llm
+        self.navigator_llm = navigator_llm or llm
+        self.synthesizer_llm = synthesizer_llm or llm
+        self.page_extraction_llm = page_extraction_llm or self.navigator_llm
+        self.navigator_llm_config = navigator_llm_config
         self.browser_config = browser_config
         self.mcp_server_config = mcp_server_config
         self.mcp_client = None
@@ -1003,10 +1616,28 @@ class DeepResearchAgent:
         self.graph = self._compile_graph()
         self.current_task_id: Optional[str] = None
         self.stop_event: Optional[threading.Event] = None
+        # Browser sub-agents running in the current run, by key, so stop() reaches them
+        self.browser_agents: Dict[str, Any] = {}
         self.runner: Optional[asyncio.Task] = None  # To hold the asyncio task for run
+        self.stop_requested_at: Optional[float] = None
 
     async def _setup_tools(
-            self, task_id: str, stop_event: threading.Event, max_parallel_browsers: int = 1
+            self, task_id: str, stop_event: threading.Event, max_parallel_browsers: int = 1,
+            max_queries_per_call: int = 10,
+            result_store: Optional[SearchResultStore] = None,
+            query_cache: Optional[QueryResultCache] = None,
+            query_deduplicator: Optional[QueryDeduplicator] = None,
+            browser_semaphore: Optional[asyncio.Semaphore] = None,
+            budget: Optional[ResearchBudget] = None,
+            llm: Optional[Any] = None,
+            browser_max_steps: int = DEFAULT_BROWSER_MAX_STEPS,
+            browser_timeout_s: Optional[float] = DEFAULT_BROWSER_TIMEOUT_S,
+            fast_fetcher: Optional[FastFetcher] = None,
+            page_store: Optional[PageStore] = None,
+            page_extraction_llm: Optional[Any] = None,
+            completed_queries: Optional[Dict[str, Dict[str, Any]]] = None,
+            process_pool: Optional[BrowserProcessPool] = None,
+            navigator_llm_spec: Any = None,
     ) -> List[Tool]:
         """Sets up the basic tools (File I/O) and optional MCP tools."""
         tools = [
@@ -1015,13 +1646,34 @@ class DeepResearchAgent:
             ListDirectoryTool(),
         ]  # Basic file operations
         browser_use_tool = create_browser_search_tool(
-            llm=self.llm,
+            llm=llm or self.navigator_llm,
             browser_config=self.browser_config,
             task_id=task_id,
             stop_event=stop_event,
             max_parallel_browsers=max_parallel_browsers,
+            max_queries_per_call=max_queries_per_call,
+            result_store=result_store,
+            query_cache=query_cache,
+            query_deduplicator=query_deduplicator,
+            browser_semaphore=browser_semaphore,
+            budget=budget,
+            browser_max_steps=browser_max_steps,
+            browser_timeout_s=browser_timeout_s,
+            page_store=page_store,
+            page_extraction_llm=page_extraction_llm or self.page_extraction_llm,
+            agent_registry=self.browser_agents,
+            completed_queries=completed_queries,
+            process_pool=process_pool,
+            navigator_llm_spec=navigator_llm_spec,
         )
         tools += [browser_use_tool]
+        if fast_fetcher is not None:
+            tools.append(create_fast_fetch_tool(
+                fast_fetcher,
+                browser_search_tool=browser_use_tool,
+                result_store=result_store,
+                max_urls_per_call=max_queries_per_call,
+            ))
         # Add MCP tools if config is provided
         if self.mcp_server_config:
             try:
@@ -1047,14 +1699,14 @@ class DeepResearchAgent:
             await self.mcp_client.__aexit__(None, None, None)
             self.mcp_client = None
 
-    def _compile_graph(self) -> StateGraph:
-        """Compiles the Langgraph state machine."""
+    def _compile_graph(self, checkpointer: Optional[SqliteCheckpointSaver] = None) -> StateGraph:
+        """Compiles the Langgraph state machine, optionally persisting a checkpoint after every node."""
         workflow = StateGraph(DeepResearchState)
 
         # Add nodes
-        workflow.add_node("plan_research", planning_node)
-        workflow.add_node("execute_research", research_execution_node)
-        workflow.add_node("synthesize_report", synthesis_node)
+        workflow.add_node("plan_research", timed_node("plan_research", planning_node))
+        workflow.add_node("execute_research", timed_node("execute_research", research_execution_node))
+        workflow.add_node("synthesize_report", timed_node("synthesize_report", synthesis_node))
         workflow.add_node(
             "end_run", lambda state: logger.info("--- Reached End Run Node ---") or {}
         )  # Simple end node
@@ -1079,7 +1731,7 @@ class DeepResearchAgent:
 
         workflow.add_edge("synthesize_report", "end_run")  # End after synthesis
 
-        app = workflow.compile()
+        app = workflow.compile(checkpointer=checkpointer)
         return app
 
     async def run(
@@ -1088,6 +1740,32 @@ class DeepResearchAgent:
             task_id: Optional[str] = None,
             save_dir: str = "./tmp/deep_research",
             max_parallel_browsers: int = 1,
+            max_parallel_tasks: int = 1,
+            max_parallel_tool_calls: int = 4,
+            max_queries_per_call: int = 10,
+            max_history_tokens: int = 32000,
+            compress_results: bool = False,
+            use_checkpointer: bool = True,
+            synthesis_mode: str = "auto",
+            synthesis_chunk_tokens: int = DEFAULT_SYNTHESIS_CHUNK_TOKENS,
+            max_parallel_synthesis: int = 4,
+            use_query_cache: bool = True,
+            dedup_threshold: float = 0.0,
+            dedup_embeddings: Optional[Any] = None,
+            event_sink: Optional[Callable[[ResearchEvent], Any]] = None,
+            browser_semaphore: Optional[asyncio.Semaphore] = None,
+            max_tokens: Optional[int] = None,
+            max_wall_time_s: Optional[float] = None,
+            max_browser_steps: Optional[int] = None,
+            browser_max_steps: int = DEFAULT_BROWSER_MAX_STEPS,
+            browser_timeout_s: Optional[float] = DEFAULT_BROWSER_TIMEOUT_S,
+            use_fast_fetch: bool = True,
+            max_parallel_fetches: int = 8,
+            use_page_store: bool = True,
+            use_plan_cache: bool = True,
+            write_event_log: bool = False,
+            browser_backend: str = "inline",
+            browser_workers: Optional[int] = None,
     ) -> Dict[str, Any]:
         """
         Starts the deep research process (Async Generator Version).
@@ -1095,6 +1773,62 @@ class DeepResearchAgent:
         Args:
             topic: The research topic.
             task_id: Optional existing task ID to resume. If None, a new ID is generated.
+            max_parallel_browsers: Maximum number of browser sub-agents running at once.
+            max_parallel_tasks: Number of tasks of the same research category executed concurrently.
+            max_parallel_tool_calls: Maximum number of tool calls running at once in this run. Tool calls
+                requested together in one LLM response are executed concurrently up to this limit.
+            max_queries_per_call: Maximum number of queries accepted by one browser search call,
+                queries beyond `max_parallel_browsers` are queued.
+            max_history_tokens: Token budget for the message history sent with each task. Older tool
+                outputs are compacted into digests once it is exceeded, 0 disables compaction.
+            compress_results: Store search results gzip-compressed. A resumed task keeps the format
+                of its existing result file.
+            use_checkpointer: Persist the graph state to `checkpoints.sqlite` in the output directory
+                after every node. Resuming a task then continues from its last checkpoint instead of
+                re-parsing the markdown plan, which is only used for tasks without a checkpoint.
+            synthesis_mode: "single" writes the report from all findings in one LLM call, "hierarchical"
+                first summarizes each research category and writes the report from those summaries.
+                "auto" switches to hierarchical once the findings exceed `synthesis_chunk_tokens`.
+            synthesis_chunk_tokens: Token budget of one LLM call in hierarchical synthesis. Section
+                summaries are cached in the output directory and reused when the findings are unchanged.
+            max_parallel_synthesis: Maximum number of section summaries generated at once.
+            use_query_cache: Answer browser search queries already researched by earlier runs from the
+                query cache in `save_dir`. Set to False to bypass the cache for this run.
+            dedup_threshold: Shingle similarity (0-1) from which a query counts as a near-duplicate of
+                a query already run in this research run and reuses its result. 0, the default, disables
+                deduplication, DEFAULT_DEDUP_THRESHOLD is a conservative value to enable it with.
+            dedup_embeddings: Optional langchain embeddings model, e.g. a local one, used to also
+                collapse paraphrased queries with a high embedding similarity.
+            event_sink: Optional callable receiving a ResearchEvent for every progress step,
+                see `astream` for the iterator version.
+            browser_semaphore: Optional semaphore shared with other runs, capping their browser agents
+                in total. `max_parallel_browsers` then only caps the browsers of a single search call.
+            max_tokens: Optional LLM token budget of the run, counted over planning, task execution,
+                browser sub-agents and synthesis.
+            max_wall_time_s: Optional wall-clock budget of the run in seconds.
+            max_browser_steps: Optional total number of steps of all browser sub-agents together.
+                Once a budget is nearly used up the remaining tasks are skipped, recorded in the
+                `skipped_tasks` of the final state, and the report is written from the findings so far.
+            browser_max_steps: Maximum number of steps of one browser sub-agent.
+            browser_timeout_s: Wall-clock limit of one browser sub-agent in seconds, None for no limit.
+                With `max_wall_time_s` it shrinks to the time left divided among the queued queries.
+                Sub-agents over the limit are cancelled and report their partial result as "timed_out".
+            use_fast_fetch: Offer the `fast_fetch` tool, which reads known URLs over plain HTTP and only
+                falls back to a browser agent for pages that need JavaScript or interaction.
+            max_parallel_fetches: Maximum number of HTTP fetches running at once.
+            use_page_store: Share the text of visited pages between browser agents and runs through the
+                page store in `save_dir`. Agents navigating to a page read recently get its stored text.
+            use_plan_cache: Reuse the plan made earlier for the same topic by the same model from the plan
+                cache in `save_dir` instead of planning again. Set to False to always plan anew.
+            write_event_log: Besides the `metrics.json` every run writes to its output directory, append
+                each node execution, LLM call and browser query to `events.jsonl` there as it happens.
+            browser_backend: "inline" runs browser sub-agents on the event loop of this process, "process"
+                in a pool of worker processes with their own event loops and browser pools, which spreads
+                the CPU load of many parallel sub-agents over all cores. Sub-agents in workers use the
+                navigator model for page extraction too. Without a `navigator_llm_config` or a picklable
+                navigator model the run ends with an error status right away.
+            browser_workers: Number of worker processes of the "process" backend, defaults to
+                `max_parallel_browsers`. Workers are shared by all runs of this process.
 
         Yields:
              Intermediate state updates or messages during execution.
@@ -1110,6 +1844,14 @@ class DeepResearchAgent:
                 "task_id": self.current_task_id,
             }
 
+        navigator_llm_spec = None
+        if browser_backend == "process":
+            try:
+                navigator_llm_spec = llm_spec_for(self.navigator_llm, self.navigator_llm_config)
+            except ValueError as e:
+                logger.error(str(e))
+                return {"status": "error", "message": str(e), "task_id": task_id}
+
         self.current_task_id = task_id if task_id else str(uuid.uuid4())
         safe_root_dir = "./tmp/deep_research"
         normalized_save_dir = os.path.normpath(save_dir)
@@ -1123,20 +1865,96 @@ class DeepResearchAgent:
             f"[AsyncGen] Starting research task ID: {self.current_task_id} for topic: '{topic}'"
         )
         logger.info(f"[AsyncGen] Output directory: {output_dir}")
+        event_sink_tokens = set_event_sink(event_sink, self.current_task_id)
+        run_metrics = RunMetrics(
+            self.current_task_id, os.path.join(output_dir, EVENT_LOG_FILENAME) if write_event_log else None
+        )
+        run_metrics_token = set_run_metrics(run_metrics)
+
+        get_browser_pool().configure(
+            pool_size=self.browser_config.get("pool_size"),
+            max_uses=self.browser_config.get("pool_max_uses"),
+        )
+
+        result_store = get_result_store(output_dir, compress=compress_results)
+        query_cache = get_query_cache(normalized_save_dir) if use_query_cache else None
+        query_deduplicator = QueryDeduplicator(
+            threshold=dedup_threshold, embeddings=dedup_embeddings
+        ) if dedup_threshold else None
+
+        page_store = get_page_store(normalized_save_dir) if use_page_store else None
+        fast_fetcher = FastFetcher(max_concurrent=max_parallel_fetches,
+                                   page_store=page_store) if use_fast_fetch else None
+        budget = ResearchBudget(
+            max_tokens=max_tokens, max_wall_time_s=max_wall_time_s, max_browser_steps=max_browser_steps
+        )
+
+        def tier_llm(llm: Any, tier: str) -> Any:
+            return track_llm_usage(track_llm_metrics(llm, run_metrics, tier), budget)
+
+        run_llm = tier_llm(self.llm, "executor")
+        model_tiers = {
+            tier: llm_model_name(model) for tier, model in (
+                ("planner", self.planner_llm),
+                ("executor", self.llm),
+                ("navigator", self.navigator_llm),
+                ("page_extraction", self.page_extraction_llm),
+                ("synthesizer", self.synthesizer_llm),
+            )
+        }
+        logger.info(f"Model tiers: {model_tiers}")
+
+        process_pool = None
+        if browser_backend == "process":
+            process_pool = get_browser_process_pool(browser_workers or max_parallel_browsers)
+        elif browser_backend != "inline":
+            logger.warning(f"Unknown browser backend '{browser_backend}', running browsers inline.")
 
         self.stop_event = threading.Event()
-        _AGENT_STOP_FLAGS[self.current_task_id] = self.stop_event
+        self.browser_agents = {}
         agent_tools = await self._setup_tools(
-            self.current_task_id, self.stop_event, max_parallel_browsers
+            self.current_task_id,
+            self.stop_event,
+            max_parallel_browsers,
+            max_queries_per_call=max_queries_per_call,
+            result_store=result_store,
+            query_cache=query_cache,
+            query_deduplicator=query_deduplicator,
+            browser_semaphore=browser_semaphore,
+            budget=budget,
+            llm=tier_llm(self.navigator_llm, "navigator"),
+            browser_max_steps=browser_max_steps,
+            browser_timeout_s=browser_timeout_s,
+            fast_fetcher=fast_fetcher,
+            page_store=page_store,
+            page_extraction_llm=tier_llm(self.page_extraction_llm, "page_extraction"),
+            # Queries finished before a crash or stop are not browsed again when the task resumes
+            completed_queries=_completed_queries(result_store) if task_id else None,
+            process_pool=process_pool,
+            navigator_llm_spec=navigator_llm_spec,
         )
+        checkpointer = open_checkpointer(output_dir) if use_checkpointer else None
+        graph = self._compile_graph(checkpointer) if checkpointer else self.graph
+        run_config = {
+            "recursion_limit": GRAPH_RECURSION_LIMIT,
+            "configurable": {
+                "thread_id": self.current_task_id,
+                "llm": run_llm,
+                "planner_llm": tier_llm(self.planner_llm, "planner"),
+                "synthesizer_llm": tier_llm(self.synthesizer_llm, "synthesizer"),
+                "tools": agent_tools,
+                "budget": budget,
+                "tool_call_semaphore": asyncio.Semaphore(max(1, max_parallel_tool_calls)),
+                "stop_event": self.stop_event,
+                "plan_cache": get_plan_cache(normalized_save_dir) if use_plan_cache else None,
+            }
+        }
         initial_state: DeepResearchState = {
             "task_id": self.current_task_id,
             "topic": topic,
             "research_plan": [],
-            "search_results": [],
+            "search_result_count": 0,
             "messages": [],
-            "llm": self.llm,
-            "tools": agent_tools,
             "output_dir": Path(output_dir),
             "browser_config": self.browser_config,
             "final_report": None,
@@ -1144,16 +1962,61 @@ class DeepResearchAgent:
             "current_task_index_in_category": 0,
             "stop_requested": False,
             "error_message": None,
+            "max_parallel_tasks": max_parallel_tasks,
+            "max_history_tokens": max_history_tokens,
+            "synthesis_mode": synthesis_mode,
+            "synthesis_chunk_tokens": synthesis_chunk_tokens,
+            "max_parallel_synthesis": max_parallel_synthesis,
+            "skipped_tasks": [],
+            "budget_exhausted": None,
         }
 
-        if task_id:
+        graph_input: Optional[DeepResearchState] = initial_state
+        checkpoint_state = None
+        if task_id and checkpointer:
+            snapshot = await graph.aget_state(run_config)
+            if snapshot.values.get("research_plan"):
+                checkpoint_state = snapshot.values
+
+        if checkpoint_state:
+            logger.info(
+                f"Resuming task {task_id} from its last checkpoint. "
+                f"Next task: Cat {checkpoint_state.get('current_category_index', 0)}, "
+                f"Task {checkpoint_state.get('current_task_index_in_category', 0)}"
+            )
+            # Continue after planning with the saved plan, messages and indices. The execution node
+            # skips completed tasks and routes to synthesis once the plan is exhausted, so this covers
+            # crashed, stopped and finished runs alike. Settings of this run replace the saved ones.
+            await graph.aupdate_state(
+                run_config,
+                {
+                    "topic": topic,
+                    "output_dir": Path(output_dir),
+                    "browser_config": self.browser_config,
+                    "search_result_count": len(result_store),
+                    "stop_requested": False,
+                    "error_message": None,
+                    "max_parallel_tasks": max_parallel_tasks,
+                    "max_history_tokens": max_history_tokens,
+                    "synthesis_mode": synthesis_mode,
+                    "synthesis_chunk_tokens": synthesis_chunk_tokens,
+                    "max_parallel_synthesis": max_parallel_synthesis,
+                    "skipped_tasks": [],
+                    "budget_exhausted": None,
+                },
+                as_node="plan_research",
+            )
+            graph_input = None
+            emit_event(ResearchEventType.PLAN_CREATED, plan=checkpoint_state["research_plan"],
+                       markdown=_format_plan_md(checkpoint_state["research_plan"]))
+        elif task_id:
             logger.info(f"Attempting to resume task {task_id}...")
             loaded_state = _load_previous_state(task_id, output_dir)
             initial_state.update(loaded_state)
             if loaded_state.get("research_plan"):
                 logger.info(
                     f"Resuming with {len(loaded_state['research_plan'])} plan categories "
-                    f"and {len(loaded_state.get('search_results', []))} existing results. "
+                    f"and {loaded_state.get('search_result_count', 0)} existing results. "
                     f"Next task: Cat {initial_state['current_category_index']}, Task {initial_state['current_task_index_in_category']}"
                 )
                 initial_state["topic"] = (
@@ -1164,13 +2027,18 @@ class DeepResearchAgent:
                     f"Resume requested for {task_id}, but no previous plan found. Starting fresh."
                 )
 
+        emit_event(ResearchEventType.RUN_STARTED, output_dir=output_dir, topic=topic,
+                   resumed=bool(checkpoint_state or initial_state["research_plan"]))
+
         # --- Execute Graph using ainvoke ---
         final_state = None
         status = "unknown"
         message = None
         try:
             logger.info(f"Invoking graph execution for task {self.current_task_id}...")
-            self.runner = asyncio.create_task(self.graph.ainvoke(initial_state))
+            self.runner = asyncio.create_task(graph.ainvoke(graph_input, run_config))
+            if self.stop_event.is_set():  # Stopped while the run was being set up
+                self.runner.cancel()
             final_state = await self.runner
             logger.info(f"Graph execution finished for task {self.current_task_id}.")
 
@@ -1186,6 +2054,9 @@ class DeepResearchAgent:
             elif final_state and final_state.get("final_report"):
                 status = "completed"
                 message = "Research process completed successfully."
+                if final_state.get("budget_exhausted"):
+                    message = (f"Research process completed early ({final_state['budget_exhausted']}), "
+                               f"{len(final_state.get('skipped_tasks') or [])} tasks were skipped.")
                 logger.info(message)
             else:
                 # If it ends without error/report (e.g., empty plan, stopped before synthesis)
@@ -1194,8 +2065,13 @@ class DeepResearchAgent:
                 logger.warning(message)
 
         except asyncio.CancelledError:
-            status = "cancelled"
-            message = f"Agent run task cancelled for {self.current_task_id}."
+            if self.stop_event and self.stop_event.is_set():
+                # `stop` cancelled the graph, the checkpoint of the last finished node stays valid
+                status = "stopped"
+                message = "Research process was stopped by request."
+            else:
+                status = "cancelled"
+                message = f"Agent run task cancelled for {self.current_task_id}."
             logger.info(message)
             # final_state will remain None or the state before cancellation if checkpointing was used
         except Exception as e:
@@ -1206,56 +2082,165 @@ class DeepResearchAgent:
         finally:
             logger.info(f"Cleaning up resources for task {self.current_task_id}")
             task_id_to_clean = self.current_task_id
+            close_result_store(output_dir)
+            if checkpointer:
+                checkpointer.close()
+            browser_pool_stats = get_browser_pool().get_stats()
+            logger.info(f"Browser pool stats: {browser_pool_stats}")
+            browser_process_pool_stats = process_pool.get_stats() if process_pool else None
+            if browser_process_pool_stats:
+                logger.info(f"Browser process pool stats: {browser_process_pool_stats}")
+            query_cache_stats = query_cache.get_stats() if query_cache else None
+            if query_cache_stats:
+                logger.info(f"Query cache stats: {query_cache_stats}")
+            query_dedup_stats = query_deduplicator.get_stats() if query_deduplicator else None
+            if query_dedup_stats:
+                logger.info(f"Query deduplication stats: {query_dedup_stats}")
+            budget_stats = budget.get_stats()
+            logger.info(f"Research budget usage: {budget_stats}")
+            fast_fetch_stats = None
+            if fast_fetcher:
+                fast_fetch_stats = fast_fetcher.get_stats()
+                logger.info(f"Fast fetch stats: {fast_fetch_stats}")
+                await fast_fetcher.aclose()
+            page_store_stats = page_store.get_stats() if page_store else None
+            if page_store_stats:
+                logger.info(f"Page store stats: {page_store_stats}")
+            stop_latency_s = None
+            if self.stop_requested_at is not None:
+                stop_latency_s = round(time.perf_counter() - self.stop_requested_at, 3)
+                logger.info(f"Research task stopped {stop_latency_s}s after the stop request.")
+                self.stop_requested_at = None
+
+            metrics_path = None
+            try:
+                metrics_path = run_metrics.save(
+                    output_dir,
+                    topic=topic,
+                    status=status,
+                    message=message,
+                    stop_latency_s=stop_latency_s,
+                    model_tiers=model_tiers,
+                    budget=budget_stats,
+                    caches={
+                        "browser_pool": browser_pool_stats,
+                        "browser_process_pool": browser_process_pool_stats,
+                        "query_cache": query_cache_stats,
+                        "query_dedup": query_dedup_stats,
+                        "fast_fetch": fast_fetch_stats,
+                        "page_store": page_store_stats,
+                    },
+                )
+            except Exception as e:
+                logger.error(f"Failed to write the run metrics of task {task_id_to_clean}: {e}")
+            run_metrics.close()
+            reset_run_metrics(run_metrics_token)
 
             self.stop_event = None
+            self.browser_agents = {}
             self.current_task_id = None
             self.runner = None  # Mark runner as finished
-            if self.mcp_client:
-                await self.mcp_client.__aexit__(None, None, None)
+            await self.close_mcp_client()
 
             # Return a result dictionary including the status and the final state if available
-            return {
+            result = {
                 "status": status,
                 "message": message,
                 "task_id": task_id_to_clean,  # Use the stored task_id
                 "final_state": final_state
                 if final_state
                 else {},  # Return the final state dict
+                "browser_pool_stats": browser_pool_stats,
+                "browser_process_pool_stats": browser_process_pool_stats,
+                "query_cache_stats": query_cache_stats,
+                "query_dedup_stats": query_dedup_stats,
+                "budget_stats": budget_stats,
+                "fast_fetch_stats": fast_fetch_stats,
+                "page_store_stats": page_store_stats,
+                "model_tiers": model_tiers,
+                "stop_latency_s": stop_latency_s,
+                "metrics_path": metrics_path,
             }
+            emit_event(ResearchEventType.RUN_FINISHED, status=status, message=message, result=result)
+            reset_event_sink(event_sink_tokens)
+            return result
 
-    async def _stop_lingering_browsers(self, task_id):
-        """Attempts to stop any BrowserUseAgent instances associated with the task_id."""
-        keys_to_stop = [
-            key for key in _BROWSER_AGENT_INSTANCES if key.startswith(f"{task_id}_")
-        ]
-        if not keys_to_stop:
+    async def astream(self, topic: str, **run_kwargs) -> AsyncIterator[ResearchEvent]:
+        """
+        Runs the research like `run` and yields its progress as ResearchEvent objects while it happens.
+
+        The stream ends with a RUN_FINISHED event whose data["result"] is the dict `run` returns.
+        Stopping works as usual through `stop`.
+        """
+        events: asyncio.Queue = asyncio.Queue()
+        run_task = asyncio.create_task(self.run(topic, event_sink=events.put_nowait, **run_kwargs))
+        while True:
+            next_event = asyncio.ensure_future(events.get())
+            await asyncio.wait({next_event, run_task}, return_when=asyncio.FIRST_COMPLETED)
+            if next_event.done():
+                event = next_event.result()
+                yield event
+                if event.type == ResearchEventType.RUN_FINISHED:
+                    break
+                continue
+            next_event.cancel()
+            if events.empty():
+                # run returned without starting, e.g. because the agent is already running
+                result = run_task.result()
+                yield ResearchEvent(
+                    type=ResearchEventType.RUN_FINISHED,
+                    task_id=result.get("task_id"),
+                    data={"status": result.get("status"), "message": result.get("message"), "result": result},
+                )
+                break
+        await run_task
+
+    def _stop_lingering_browsers(self):
+        """Attempts to stop the BrowserUseAgent instances of the current run."""
+        agents_to_stop = list(self.browser_agents.items())
+        if not agents_to_stop:
             return
 
         logger.warning(
-            f"Found {len(keys_to_stop)} potentially lingering browser agents for task {task_id}. Attempting stop..."
+            f"Found {len(agents_to_stop)} potentially lingering browser agents for task {self.current_task_id}. "
+            f"Attempting stop..."
         )
-        for key in keys_to_stop:
-            agent_instance = _BROWSER_AGENT_INSTANCES.get(key)
+        for key, agent_instance in agents_to_stop:
             try:
                 if agent_instance:
-                    # Assuming BU agent has an async stop method
-                    await agent_instance.stop()
+                    agent_instance.stop()
                     logger.info(f"Called stop() on browser agent instance {key}")
             except Exception as e:
                 logger.error(
                     f"Error calling stop() on browser agent instance {key}: {e}"
                 )
 
-    async def stop(self):
-        """Signals the currently running agent task to stop."""
+    async def stop(self, timeout_s: float = DEFAULT_STOP_TIMEOUT_S) -> Optional[float]:
+        """
+        Stops the currently running agent task and waits up to `timeout_s` seconds for it to end.
+
+        In-flight browser sub-agents and LLM calls are cancelled rather than awaited. The checkpoint
+        of the last finished graph node and every search result stored so far are kept, so the task
+        can be resumed. Returns the stop latency in seconds, None when no task was running.
+        """
         if not self.current_task_id or not self.stop_event:
             logger.info("No agent task is currently running.")
-            return
+            return None
 
         logger.info(f"Stop requested for task ID: {self.current_task_id}")
+        stop_start = self.stop_requested_at = time.perf_counter()
         self.stop_event.set()  # Signal the stop event
         self.stopped = True
-        await self._stop_lingering_browsers(self.current_task_id)
+        self._stop_lingering_browsers()
+        runner = self.runner
+        if runner and not runner.done():
+            runner.cancel()
+            await asyncio.wait({runner}, timeout=timeout_s)
+            if not runner.done():
+                logger.warning(f"Research task did not finish within {timeout_s}s of the stop request.")
+        stop_latency_s = time.perf_counter() - stop_start
+        logger.info(f"Stop of the research task took {stop_latency_s:.3f}s.")
+        return stop_latency_s
 
     def close(self):
         self.stopped = False
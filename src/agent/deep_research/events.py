@@ -0,0 +1,55 @@
+import contextvars
+import time
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+class ResearchEventType(str, Enum):
+    RUN_STARTED = "run_started"  # data: output_dir, topic, resumed
+    PLAN_CREATED = "plan_created"  # data: plan, markdown
+    PLAN_UPDATED = "plan_updated"  # data: plan, markdown
+    TASK_STARTED = "task_started"  # data: category_index, task_index, task_description
+    TASK_FINISHED = "task_finished"  # data: category_index, task_index, task_description, status
+    QUERY_COMPLETED = "query_completed"  # data: query, status, category_index, task_index, cached, duplicate_of
+    SYNTHESIS_STARTED = "synthesis_started"  # data: result_count, mode
+    SYNTHESIS_TOKEN = "synthesis_token"  # data: text
+    REPORT_READY = "report_ready"  # data: report, path
+    RUN_FINISHED = "run_finished"  # data: status, message, result
+
+
+@dataclass
+class ResearchEvent:
+    type: ResearchEventType
+    task_id: Optional[str]
+    data: Dict[str, Any] = field(default_factory=dict)
+    timestamp: float = field(default_factory=time.time)
+
+
+# Receives the events of the research run executing in the current context, set by DeepResearchAgent.run
+_EVENT_SINK: contextvars.ContextVar[Optional[Callable[[ResearchEvent], Any]]] = contextvars.ContextVar(
+    "research_event_sink", default=None
+)
+_EVENT_TASK_ID: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("research_event_task_id", default=None)
+
+
+def set_event_sink(sink: Optional[Callable[[ResearchEvent], Any]], task_id: Optional[str]) -> Tuple:
+    """Routes events of the current context to `sink`. Returns tokens for `reset_event_sink`."""
+    return _EVENT_SINK.set(sink), _EVENT_TASK_ID.set(task_id)
+
+
+def reset_event_sink(tokens: Tuple):
+    sink_token, task_id_token = tokens
+    _EVENT_SINK.reset(sink_token)
+    _EVENT_TASK_ID.reset(task_id_token)
+
+
+def has_event_sink() -> bool:
+    return _EVENT_SINK.get() is not None
+
+
+def emit_event(event_type: ResearchEventType, **data):
+    """Sends an event to the sink of the current run. Without a sink this is a no-op."""
+    sink = _EVENT_SINK.get()
+    if sink is not None:
+        sink(ResearchEvent(type=event_type, task_id=_EVENT_TASK_ID.get(), data=data))
@@ -0,0 +1,149 @@
+import asyncio
+import logging
+import re
+from typing import Any, Dict, List, Optional
+
+import httpx
+from main_content_extractor import MainContentExtractor
+
+from src.utils.page_store import PageStore
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FETCH_TIMEOUT_S = 15
+DEFAULT_FETCH_MAX_BYTES = 1024 * 1024
+DEFAULT_MIN_CONTENT_CHARS = 200
+DEFAULT_MAX_CONTENT_CHARS = 20000
+
+_USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/124.0.0.0 Safari/537.36"
+)
+_TEXT_CONTENT_TYPES = ("text/html", "application/xhtml+xml", "text/plain")
+# Shells of client-side rendered pages, whose content only exists after JavaScript ran
+_JS_REQUIRED_PATTERN = re.compile(
+    r"enable javascript|javascript is (?:required|disabled)|<div id=\"(?:root|app|__next)\">\s*</div>",
+    re.IGNORECASE,
+)
+_TITLE_PATTERN = re.compile(r"<title[^>]*>(.*?)</title>", re.IGNORECASE | re.DOTALL)
+
+
+class FastFetcher:
+    """
+    Fetches pages over plain HTTP and extracts their main content as markdown, no browser involved.
+
+    One pooled httpx client is shared by all fetches of a research run and at most `max_concurrent`
+    fetches run at once. Responses are read up to `max_bytes`. Pages that are not HTML or text, or
+    whose extracted content looks like an empty JavaScript shell, come back with status
+    "needs_browser" so the caller can hand them to a browser agent. With a `page_store`, pages
+    read recently by any agent are served from it and fetched pages are added to it.
+    """
+
+    def __init__(
+            self,
+            max_concurrent: int = 8,
+            timeout_s: float = DEFAULT_FETCH_TIMEOUT_S,
+            max_bytes: int = DEFAULT_FETCH_MAX_BYTES,
+            min_content_chars: int = DEFAULT_MIN_CONTENT_CHARS,
+            max_content_chars: int = DEFAULT_MAX_CONTENT_CHARS,
+            page_store: Optional[PageStore] = None,
+    ):
+        self.max_bytes = max_bytes
+        self.min_content_chars = min_content_chars
+        self.max_content_chars = max_content_chars
+        self.page_store = page_store
+        self._semaphore = asyncio.Semaphore(max(1, max_concurrent))
+        self._client = httpx.AsyncClient(
+            follow_redirects=True,
+            timeout=timeout_s,
+            headers={"User-Agent": _USER_AGENT},
+            limits=httpx.Limits(max_connections=max(1, max_concurrent),
+                                max_keepalive_connections=max(1, max_concurrent)),
+        )
+        self._stats = {"fetches": 0, "completed": 0, "needs_browser": 0, "failed": 0, "bytes": 0, "stored": 0}
+
+    async def _read(self, url: str) -> Dict[str, Any]:
+        async with self._client.stream("GET", url) as response:
+            response.raise_for_status()
+            content_type = response.headers.get("content-type", "").split(";")[0].strip().lower()
+            if content_type and content_type not in _TEXT_CONTENT_TYPES:
+                return {"content_type": content_type, "body": None, "truncated": False}
+            body = bytearray()
+            truncated = False
+            async for chunk in response.aiter_bytes():
+                body.extend(chunk)
+                if len(body) >= self.max_bytes:
+                    truncated = True
+                    break
+            self._stats["bytes"] += len(body)
+            encoding = response.encoding or "utf-8"
+            return {
+                "content_type": content_type or "text/html",
+                "body": bytes(body[:self.max_bytes]).decode(encoding, errors="replace"),
+                "truncated": truncated,
+            }
+
+    async def fetch(self, url: str) -> Dict[str, Any]:
+        """Returns {"url", "status", "title", "content"}, status being "completed", "needs_browser" or "failed"."""
+        self._stats["fetches"] += 1
+        stored_page = await asyncio.to_thread(self.page_store.get, url) if self.page_store is not None else None
+        if stored_page is not None:
+            self._stats["stored"] += 1
+            return self._completed(url, stored_page["title"] or url, stored_page["text"], cached=True)
+
+        async with self._semaphore:
+            try:
+                page = await self._read(url)
+            except Exception as e:
+                logger.info(f"Fast fetch of {url} failed: {e}")
+                self._stats["failed"] += 1
+                return {"url": url, "status": "failed", "error": str(e)}
+
+        if page["body"] is None:
+            self._stats["needs_browser"] += 1
+            return {"url": url, "status": "needs_browser", "reason": f"Unsupported content type {page['content_type']}."}
+
+        body = page["body"]
+        if page["content_type"] == "text/plain":
+            title, content = url, body
+        else:
+            title_match = _TITLE_PATTERN.search(body)
+            title = re.sub(r"\s+", " ", title_match.group(1)).strip() if title_match else url
+            try:
+                # Extraction parses the whole document, keep it off the event loop
+                content = await asyncio.to_thread(MainContentExtractor.extract, body, output_format="markdown")
+            except Exception as e:
+                logger.info(f"Main content extraction of {url} failed: {e}")
+                content = ""
+
+        content = (content or "").strip()
+        if len(content) < self.min_content_chars or (
+                len(content) < 4 * self.min_content_chars and _JS_REQUIRED_PATTERN.search(body)):
+            self._stats["needs_browser"] += 1
+            return {"url": url, "status": "needs_browser", "title": title,
+                    "reason": "Page has little static content, it probably needs JavaScript or interaction."}
+
+        self._stats["completed"] += 1
+        if self.page_store is not None:
+            await asyncio.to_thread(self.page_store.put, url, title, content)
+        return self._completed(url, title, content, truncated=page["truncated"])
+
+    def _completed(self, url: str, title: str, content: str, **fields) -> Dict[str, Any]:
+        if len(content) > self.max_content_chars:
+            content = content[:self.max_content_chars] + "\n\n[... content truncated ...]"
+        return {"url": url, "status": "completed", "title": title, "content": content, **fields}
+
+    async def fetch_many(self, urls: List[str]) -> List[Dict[str, Any]]:
+        return await asyncio.gather(*[self.fetch(url) for url in urls])
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(self._stats)
+
+    async def aclose(self):
+        await self._client.aclose()
+
+
+def browser_fallback_query(url: str, title: Optional[str] = None) -> str:
+    """Browser search query that reads a page the fast fetch could not handle."""
+    page = f"'{title}' ({url})" if title and title != url else url
+    return f"Open {page} and extract the information on the page."
@@ -0,0 +1,114 @@
+import json
+import logging
+from typing import Any, List
+
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage, ToolMessage
+
+logger = logging.getLogger(__name__)
+
+# Rough average for English text, good enough to keep the history inside a budget
+CHARS_PER_TOKEN = 4
+DIGEST_QUERY_LIMIT = 5
+DIGEST_TEXT_LIMIT = 200
+
+
+def estimate_tokens(messages: List[BaseMessage]) -> int:
+    """Cheap, model independent token estimate for a list of messages."""
+    total_chars = 0
+    for message in messages:
+        content = message.content
+        total_chars += len(content) if isinstance(content, str) else len(json.dumps(content, default=str))
+        tool_calls = getattr(message, "tool_calls", None)
+        if tool_calls:
+            total_chars += len(json.dumps(tool_calls, default=str))
+    return total_chars // CHARS_PER_TOKEN
+
+
+def _digest_tool_output(content: Any) -> str:
+    """Turns a full tool output into a short description that points to the stored results."""
+    try:
+        output = json.loads(content) if isinstance(content, str) else content
+    except (TypeError, ValueError):
+        output = content
+
+    if isinstance(output, list) and all(isinstance(entry, dict) and "query" in entry for entry in output):
+        statuses = {}
+        for entry in output:
+            status = entry.get("status", "unknown")
+            statuses[status] = statuses.get(status, 0) + 1
+        queries = [entry["query"] for entry in output[:DIGEST_QUERY_LIMIT]]
+        if len(output) > DIGEST_QUERY_LIMIT:
+            queries.append(f"... {len(output) - DIGEST_QUERY_LIMIT} more")
+        status_text = ", ".join(f"{count} {status}" for status, count in statuses.items())
+        return (
+            f"[Compacted browser search output: {len(output)} results ({status_text}) for queries {queries}. "
+            f"The full findings are kept in the search result store and will be used for the final report.]"
+        )
+
+    text = content if isinstance(content, str) else json.dumps(content, default=str)
+    if len(text) > DIGEST_TEXT_LIMIT:
+        text = text[:DIGEST_TEXT_LIMIT] + "..."
+    return f"[Compacted tool output: {text} The full output is kept in the search result store.]"
+
+
+def _split_turns(messages: List[BaseMessage]):
+    """Splits the history into leading system messages and turns that each start with a HumanMessage."""
+    head = []
+    turns: List[List[BaseMessage]] = []
+    for message in messages:
+        if isinstance(message, HumanMessage):
+            turns.append([message])
+        elif turns:
+            turns[-1].append(message)
+        elif isinstance(message, SystemMessage):
+            head.append(message)
+        else:
+            turns.append([message])
+    return head, turns
+
+
+def compact_messages(
+        messages: List[BaseMessage],
+        token_budget: int,
+        keep_recent_turns: int = 2,
+) -> List[BaseMessage]:
+    """
+    Keeps the research message history within `token_budget` estimated tokens.
+
+    The last `keep_recent_turns` task turns are kept verbatim. Tool outputs of older turns
+    are replaced by short digests first, and if that is not enough the oldest turns are
+    dropped entirely. Turns are never split, so tool calls always keep their tool messages.
+    """
+    if not token_budget or token_budget <= 0 or estimate_tokens(messages) <= token_budget:
+        return messages
+
+    head, turns = _split_turns(messages)
+    num_old = max(0, len(turns) - keep_recent_turns)
+
+    compacted_turns = []
+    for turn_idx, turn in enumerate(turns):
+        if turn_idx >= num_old:
+            compacted_turns.append(turn)
+            continue
+        compacted_turn = []
+        for message in turn:
+            if isinstance(message, ToolMessage) and not message.additional_kwargs.get("compacted"):
+                message = ToolMessage(
+                    content=_digest_tool_output(message.content),
+                    tool_call_id=message.tool_call_id,
+                    additional_kwargs={"compacted": True},
+                )
+            compacted_turn.append(message)
+        compacted_turns.append(compacted_turn)
+
+    dropped = 0
+    while num_old - dropped > 0 and estimate_tokens(
+            head + [message for turn in compacted_turns[dropped:] for message in turn]) > token_budget:
+        dropped += 1
+
+    compacted = head + [message for turn in compacted_turns[dropped:] for message in turn]
+    logger.info(
+        f"Compacted message history from ~{estimate_tokens(messages)} to ~{estimate_tokens(compacted)} tokens "
+        f"(budget {token_budget}, {dropped} oldest turns dropped)."
+    )
+    return compacted
@@ -0,0 +1,51 @@
+import hashlib
+import json
+import os
+from typing import Any, Dict, List, Optional
+
+from src.agent.deep_research.query_cache import QueryResultCache, normalize_query
+
+PLAN_CACHE_FILENAME = "plan_cache.sqlite"
+DEFAULT_PLAN_CACHE_TTL = int(os.getenv("PLAN_CACHE_TTL", str(30 * 24 * 3600)))
+DEFAULT_PLAN_CACHE_MAX_ENTRIES = 500
+
+
+class PlanCache:
+    """
+    Persistent cache of research plans keyed by normalized topic, model name and planning
+    prompt version, so re-running a topic skips the planning LLM call. Plans are stored as
+    the category list the planner returned and expire after `ttl` seconds.
+    """
+
+    def __init__(self, db_path: str, ttl: int = DEFAULT_PLAN_CACHE_TTL,
+                 max_entries: int = DEFAULT_PLAN_CACHE_MAX_ENTRIES):
+        # Keys are exact hashes, normalizing them again would merge model names like "gpt-4.1" and "gpt-4-1"
+        self._cache = QueryResultCache(db_path, ttl=ttl, max_entries=max_entries, normalize=False)
+
+    @staticmethod
+    def make_key(topic: str, model_name: str, prompt_version: str) -> str:
+        """Only the topic is normalized, model name and prompt version must match exactly."""
+        key = json.dumps([model_name, prompt_version, normalize_query(topic)], ensure_ascii=False)
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def get(self, topic: str, model_name: str, prompt_version: str) -> Optional[List[Dict[str, Any]]]:
+        return self._cache.get(self.make_key(topic, model_name, prompt_version))
+
+    def put(self, topic: str, model_name: str, prompt_version: str, plan: List[Dict[str, Any]]):
+        self._cache.put(self.make_key(topic, model_name, prompt_version), plan)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return self._cache.get_stats()
+
+
+_PLAN_CACHES: Dict[str, PlanCache] = {}
+
+
+def get_plan_cache(cache_dir: str) -> PlanCache:
+    """Returns the process-wide plan cache stored in `cache_dir`."""
+    db_path = os.path.abspath(os.path.join(str(cache_dir), PLAN_CACHE_FILENAME))
+    cache = _PLAN_CACHES.get(db_path)
+    if cache is None:
+        cache = PlanCache(db_path)
+        _PLAN_CACHES[db_path] = cache
+    return cache
@@ -0,0 +1,228 @@
+import asyncio
+import atexit
+import json
+import logging
+import multiprocessing
+import os
+import pickle
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+STOP_POLL_INTERVAL_S = 0.2
+
+# --- Worker process side ---
+
+# One event loop per worker process, kept for its whole life so pooled browsers stay usable between tasks
+_WORKER_LOOP: Optional[asyncio.AbstractEventLoop] = None
+_WORKER_LLMS: Dict[str, Any] = {}
+
+
+def _worker_llm(llm_spec: Any) -> Any:
+    """Builds the model of an llm spec once per worker, specs are get_llm_model kwargs or a pickled model."""
+    if not isinstance(llm_spec, dict):
+        return llm_spec
+    key = json.dumps(llm_spec, sort_keys=True, default=str)
+    if key not in _WORKER_LLMS:
+        from src.utils import llm_provider
+
+        _WORKER_LLMS[key] = llm_provider.get_llm_model(**llm_spec)
+    return _WORKER_LLMS[key]
+
+
+async def _run_in_worker(
+        task_query: str,
+        task_id: str,
+        llm_spec: Any,
+        browser_config: Dict[str, Any],
+        remote_stop: Any,
+        run_kwargs: Dict[str, Any],
+        page_store_dir: Optional[str],
+        max_tokens: Optional[int],
+) -> Dict[str, Any]:
+    # Imported here, the agent module imports this one
+    from src.agent.deep_research.budget import ResearchBudget, track_llm_usage
+    from src.agent.deep_research.deep_research_agent import run_single_browser_task
+    from src.browser.browser_pool import get_browser_pool
+    from src.utils.page_store import get_page_store
+
+    get_browser_pool().configure(
+        pool_size=browser_config.get("pool_size"), max_uses=browser_config.get("pool_max_uses")
+    )
+    # Token usage of the worker's LLM calls is reported back with the result
+    usage = ResearchBudget(max_tokens=max_tokens, synthesis_reserve=0)
+    llm = track_llm_usage(_worker_llm(llm_spec), usage)
+    stop_event = threading.Event()
+    agent_registry: Dict[str, Any] = {}
+    task = asyncio.ensure_future(run_single_browser_task(
+        task_query,
+        task_id,
+        llm,
+        browser_config,
+        stop_event,
+        page_store=get_page_store(page_store_dir) if page_store_dir else None,
+        page_extraction_llm=llm,
+        agent_registry=agent_registry,
+        **run_kwargs,
+    ))
+    # The parent's budget callbacks do not see the worker's LLM calls, the worker enforces its share itself
+    exhausted = None
+    while not task.done():
+        await asyncio.wait({task}, timeout=STOP_POLL_INTERVAL_S)
+        if task.done():
+            break
+        exhausted = usage.exhausted()
+        if remote_stop.is_set() or exhausted:
+            stop_event.set()
+            for agent in list(agent_registry.values()):
+                agent.stop()
+            task.cancel()
+    try:
+        result = await task
+    except asyncio.CancelledError:
+        result = {"query": task_query, "result": None, "status": "stopped"}
+        if exhausted:
+            result["error"] = f"Research {exhausted}."
+    return {**result, "tokens": usage.tokens_used}
+
+
+def _worker_run(*args) -> Dict[str, Any]:
+    """Entry point of a browser task in a worker process."""
+    global _WORKER_LOOP
+    if _WORKER_LOOP is None:
+        _WORKER_LOOP = asyncio.new_event_loop()
+        asyncio.set_event_loop(_WORKER_LOOP)
+    return _WORKER_LOOP.run_until_complete(_run_in_worker(*args))
+
+
+# --- Parent process side ---
+
+
+class BrowserProcessPool:
+    """
+    Runs browser sub-agents in worker processes, each with its own event loop and browser pool,
+    so Playwright sessions, DOM processing and JSON handling of parallel sub-agents use all CPU
+    cores instead of the event loop of the calling process.
+
+    Workers are started on first use and reused across queries and research runs. Chat models
+    usually cannot be pickled, so the navigator model is passed as an llm spec: the kwargs of
+    `llm_provider.get_llm_model` (each worker builds the model once), or a picklable model.
+    Results come back over IPC. A cancelled task sets a stop event shared with its worker, which
+    then stops the browser agent and returns. Callbacks and limiters of the calling process do not
+    reach the workers' LLM calls: a task's token budget is passed to its worker, which stops the
+    browser agent once the budget is used up.
+    """
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max(1, max_workers)
+        # Playwright does not survive fork, workers start from a fresh interpreter
+        context = multiprocessing.get_context("spawn")
+        self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context)
+        self._manager = context.Manager()
+        self._active_stops = set()
+        self._stats = {"tasks": 0, "stopped": 0, "failed": 0}
+
+    async def run_task(
+            self,
+            task_query: str,
+            task_id: str,
+            llm_spec: Any,
+            browser_config: Dict[str, Any],
+            stop_event: threading.Event,
+            page_store_dir: Optional[str] = None,
+            max_tokens: Optional[int] = None,
+            **run_kwargs,
+    ) -> Dict[str, Any]:
+        """
+        Runs `run_single_browser_task` in a worker. `run_kwargs` (max_steps, timeout_s, ...) are passed
+        on. The worker stops the task once its LLM calls used `max_tokens` tokens. The result
+        additionally holds the tokens the worker's LLM calls used as "tokens".
+        """
+        if stop_event.is_set():
+            return {"query": task_query, "result": None, "status": "cancelled"}
+        remote_stop = self._manager.Event()
+        self._active_stops.add(remote_stop)
+        self._stats["tasks"] += 1
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(
+            self._executor, _worker_run,
+            task_query, task_id, llm_spec, browser_config, remote_stop, run_kwargs, page_store_dir, max_tokens,
+        )
+        try:
+            return await future
+        except asyncio.CancelledError:
+            # The worker keeps running a cancelled future, tell it to stop its browser agent
+            remote_stop.set()
+            self._stats["stopped"] += 1
+            raise
+        except Exception as e:
+            self._stats["failed"] += 1
+            logger.error(f"Browser worker failed for query '{task_query}': {e}", exc_info=True)
+            return {"query": task_query, "error": str(e), "status": "failed"}
+        finally:
+            self._active_stops.discard(remote_stop)
+
+    def stop_all(self):
+        """Asks every worker running a task to stop it."""
+        for remote_stop in list(self._active_stops):
+            remote_stop.set()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"max_workers": self.max_workers, "running": len(self._active_stops), **self._stats}
+
+    def shutdown(self):
+        self.stop_all()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._manager.shutdown()
+
+
+def llm_spec_for(llm: Any, llm_config: Optional[Dict[str, Any]] = None) -> Any:
+    """
+    What a worker needs to rebuild `llm`: `llm_config` (provider and get_llm_model kwargs) when
+    given, else the model itself if it can be pickled. Raises ValueError when neither works.
+    """
+    if llm_config:
+        if not llm_config.get("provider"):
+            raise ValueError("The navigator LLM config for worker processes has no provider.")
+        return dict(llm_config)
+    try:
+        pickle.dumps(llm)
+        return llm
+    except Exception as e:
+        raise ValueError(
+            f"The process browser backend cannot use the navigator LLM: it has no LLM config (provider and "
+            f"get_llm_model kwargs) and its {type(llm).__name__} instance cannot be pickled ({e}). Pass "
+            f"navigator_llm_config or use the inline backend."
+        ) from e
+
+
+_BROWSER_PROCESS_POOL: Optional[BrowserProcessPool] = None
+
+
+def get_browser_process_pool(max_workers: int) -> BrowserProcessPool:
+    """
+    Returns the process-wide worker pool. A pool of another size is replaced once it is idle,
+    otherwise the running pool is kept.
+    """
+    global _BROWSER_PROCESS_POOL
+    max_workers = max(1, max_workers or os.cpu_count() or 1)
+    pool = _BROWSER_PROCESS_POOL
+    if pool is not None and pool.max_workers != max_workers and not pool._active_stops:
+        pool.shutdown()
+        pool = None
+    if pool is None:
+        pool = _BROWSER_PROCESS_POOL = BrowserProcessPool(max_workers)
+    return pool
+
+
+def shutdown_browser_process_pool():
+    global _BROWSER_PROCESS_POOL
+    if _BROWSER_PROCESS_POOL is not None:
+        _BROWSER_PROCESS_POOL.shutdown()
+        _BROWSER_PROCESS_POOL = None
+
+
+# Workers and their browsers must not outlive the process that spawned them
+atexit.register(shutdown_browser_process_pool)
@@ -0,0 +1,119 @@
+import json
+import logging
+import os
+import re
+import sqlite3
+import time
+import unicodedata
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+QUERY_CACHE_FILENAME = "query_cache.sqlite"
+DEFAULT_QUERY_CACHE_TTL = int(os.getenv("QUERY_CACHE_TTL", str(7 * 24 * 3600)))
+DEFAULT_QUERY_CACHE_MAX_ENTRIES = int(os.getenv("QUERY_CACHE_MAX_ENTRIES", "1000"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS query_results (
+    query_key TEXT PRIMARY KEY,
+    query TEXT NOT NULL,
+    result TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    last_used_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_query_results_last_used ON query_results (last_used_at);
+"""
+
+
+def normalize_query(query: str) -> str:
+    """
+    Cache key of a query: case, punctuation and whitespace differences are ignored. `+`, `#`
+    and `.` inside tokens are kept, so "C++", "C#" and "3.11" stay distinct from "C" and "311".
+    """
+    query = unicodedata.normalize("NFKC", query).casefold()
+    query = re.sub(r"['’]", "", query)
+    query = re.sub(r"[^\w\s+#.]", " ", query)
+    # Dots only count inside a token, "end." and "...more" are plain words
+    tokens = (token.strip(".") for token in query.split())
+    return " ".join(token for token in tokens if re.search(r"\w", token))
+
+
+class QueryResultCache:
+    """
+    Persistent cache of browser search results keyed by normalized query, shared across
+    research runs. Entries expire after `ttl` seconds and the least recently used entries
+    are evicted once more than `max_entries` are stored. With `normalize=False` queries are
+    used as keys exactly as given.
+    """
+
+    def __init__(self, db_path: str, ttl: int = DEFAULT_QUERY_CACHE_TTL,
+                 max_entries: int = DEFAULT_QUERY_CACHE_MAX_ENTRIES, normalize: bool = True):
+        self.db_path = db_path
+        self.ttl = ttl
+        self.max_entries = max(1, max_entries)
+        self.normalize = normalize
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.executescript(_SCHEMA)
+        self._stats = {"hits": 0, "misses": 0, "expired": 0, "stores": 0, "evictions": 0}
+
+    def get(self, query: str) -> Optional[Any]:
+        """Returns the cached result of a query, or None on a miss."""
+        key = normalize_query(query) if self.normalize else query
+        row = self.conn.execute(
+            "SELECT result, created_at FROM query_results WHERE query_key = ?", (key,)
+        ).fetchone()
+        now = time.time()
+        if row is None:
+            self._stats["misses"] += 1
+            return None
+        result, created_at = row
+        with self.conn:
+            if self.ttl and now - created_at > self.ttl:
+                self.conn.execute("DELETE FROM query_results WHERE query_key = ?", (key,))
+                self._stats["expired"] += 1
+                self._stats["misses"] += 1
+                return None
+            self.conn.execute("UPDATE query_results SET last_used_at = ? WHERE query_key = ?", (now, key))
+        self._stats["hits"] += 1
+        return json.loads(result)
+
+    def put(self, query: str, result: Any):
+        key = normalize_query(query) if self.normalize else query
+        now = time.time()
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO query_results VALUES (?, ?, ?, ?, ?)",
+                (key, query, json.dumps(result, ensure_ascii=False, default=str), now, now),
+            )
+            evicted = self.conn.execute(
+                "DELETE FROM query_results WHERE query_key IN ("
+                "SELECT query_key FROM query_results ORDER BY last_used_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            ).rowcount
+        self._stats["stores"] += 1
+        self._stats["evictions"] += max(0, evicted)
+
+    def clear(self):
+        with self.conn:
+            self.conn.execute("DELETE FROM query_results")
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        stats["entries"] = self.conn.execute("SELECT COUNT(*) FROM query_results").fetchone()[0]
+        return stats
+
+
+_QUERY_CACHES: Dict[str, QueryResultCache] = {}
+
+
+def get_query_cache(cache_dir: str) -> QueryResultCache:
+    """Returns the process-wide query cache stored in `cache_dir`."""
+    db_path = os.path.abspath(os.path.join(str(cache_dir), QUERY_CACHE_FILENAME))
+    cache = _QUERY_CACHES.get(db_path)
+    if cache is None:
+        cache = QueryResultCache(db_path)
+        _QUERY_CACHES[db_path] = cache
+    return cache
@@ -0,0 +1,169 @@
+import asyncio
+import logging
+import math
+import re
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+from src.agent.deep_research.query_cache import normalize_query
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DEDUP_THRESHOLD = 0.9
+
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from how in is it of on or the to was what when where which who why with".split()
+)
+_NEGATION_WORDS = frozenset("no non not never without".split())
+_NEGATION_PREFIXES = ("anti", "dis", "non", "un", "in", "im", "il", "ir")
+_MIN_NEGATED_STEM_LENGTH = 4
+
+
+def _query_tokens(query: str) -> FrozenSet[str]:
+    return frozenset(token for token in normalize_query(query).split() if token not in _STOPWORDS)
+
+
+def query_key_tokens(query: str) -> FrozenSet[str]:
+    """
+    Tokens two queries must share to be duplicates however similar they are otherwise: numbers,
+    years and versions, names like "C++" and "C#", and negations.
+    """
+    return frozenset(token for token in _query_tokens(query)
+                     if token in _NEGATION_WORDS or re.search(r"[\d+#]", token))
+
+
+def _negated_stems(tokens: FrozenSet[str]) -> FrozenSet[str]:
+    return frozenset(token[len(prefix):] for token in tokens for prefix in _NEGATION_PREFIXES
+                     if token.startswith(prefix) and len(token) - len(prefix) >= _MIN_NEGATED_STEM_LENGTH)
+
+
+def queries_contradict(a: FrozenSet[str], b: FrozenSet[str]) -> bool:
+    """Whether one token set holds the negated form of a word of the other, e.g. "disadvantages" and "advantages"."""
+    return bool(_negated_stems(a) & b or _negated_stems(b) & a)
+
+
+def query_shingles(query: str, size: int = 3) -> FrozenSet[str]:
+    """
+    Word tokens plus character shingles of each token, ignoring stopwords and word order,
+    so reordered queries and small spelling or inflection differences still overlap.
+    """
+    tokens = _query_tokens(query)
+    shingles = set(tokens)
+    for token in tokens:
+        padded = f" {token} "
+        shingles.update(padded[i:i + size] for i in range(max(1, len(padded) - size + 1)))
+    return frozenset(shingles)
+
+
+def jaccard_similarity(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def _cosine_similarity(a: List[float], b: List[float]) -> float:
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return sum(x * y for x, y in zip(a, b)) / norm if norm else 0.0
+
+
+class _QueryEntry:
+    def __init__(self, query: str, shingles: FrozenSet[str], vector: Optional[List[float]]):
+        self.query = query
+        self.tokens = _query_tokens(query)
+        self.key_tokens = query_key_tokens(query)
+        self.shingles = shingles
+        self.vector = vector
+        self.result: asyncio.Future = asyncio.get_running_loop().create_future()
+
+
+class QueryDeduplicator:
+    """
+    Collapses near-duplicate browser search queries of one research run.
+
+    Every query that launches a browser agent is remembered. A later query, from the same
+    search call or from an earlier task, whose shingle similarity reaches `threshold` reuses
+    the result of that query instead of launching its own agent. With a langchain
+    `embeddings` model (e.g. a local sentence-transformers model), queries whose embedding
+    cosine similarity reaches `embedding_threshold` are collapsed as well. Queries differing in
+    a number, version, name like "C++" or a negation are never collapsed, and only completed
+    results are reused: the duplicates of a query that failed or timed out run themselves.
+    """
+
+    def __init__(
+            self,
+            threshold: float = DEFAULT_DEDUP_THRESHOLD,
+            embeddings: Optional[Any] = None,
+            embedding_threshold: float = 0.9,
+    ):
+        self.threshold = threshold
+        self.embeddings = embeddings
+        self.embedding_threshold = embedding_threshold
+        self._history: List[_QueryEntry] = []
+        self._stats = {"queries": 0, "suppressed": 0, "launches_saved": 0, "retried": 0}
+
+    def _embed(self, query: str) -> Optional[List[float]]:
+        if self.embeddings is None:
+            return None
+        try:
+            return self.embeddings.embed_query(query)
+        except Exception as e:
+            logger.warning(f"Query embedding failed, using lexical similarity only: {e}")
+            return None
+
+    def claim(self, query: str) -> Tuple[_QueryEntry, bool, float]:
+        """
+        Returns the history entry that answers `query`, whether it is a near-duplicate of
+        an earlier query, and the similarity. New queries become entries the caller must
+        `resolve` once their result is known.
+        """
+        self._stats["queries"] += 1
+        shingles = query_shingles(query)
+        tokens = _query_tokens(query)
+        key_tokens = query_key_tokens(query)
+        vector = self._embed(query)
+        best_entry, best_similarity = None, 0.0
+        for entry in self._history:
+            if entry.key_tokens != key_tokens or queries_contradict(tokens, entry.tokens):
+                continue
+            similarity = jaccard_similarity(shingles, entry.shingles)
+            matched = similarity >= self.threshold
+            if not matched and vector is not None and entry.vector is not None:
+                cosine = _cosine_similarity(vector, entry.vector)
+                if cosine >= self.embedding_threshold:
+                    matched, similarity = True, cosine
+            if matched and similarity > best_similarity:
+                best_entry, best_similarity = entry, similarity
+
+        if best_entry is not None:
+            self._stats["suppressed"] += 1
+            logger.info(f"Query '{query}' is a near-duplicate of '{best_entry.query}' ({best_similarity:.2f}).")
+            return best_entry, True, best_similarity
+
+        entry = _QueryEntry(query, shingles, vector)
+        self._history.append(entry)
+        return entry, False, 1.0
+
+    def resolve(self, entry: _QueryEntry, result: Dict[str, Any]):
+        if not entry.result.done():
+            entry.result.set_result(result)
+
+    async def reuse(self, entry: _QueryEntry, query: str, similarity: float) -> Optional[Dict[str, Any]]:
+        """
+        Waits for the result of `entry` and returns it on behalf of the suppressed `query`. Returns
+        None when that query did not complete, the caller then runs `query` itself.
+        """
+        original = await entry.result
+        if original.get("status") != "completed":
+            self._stats["retried"] += 1
+            return None
+        self._stats["launches_saved"] += 1
+        return {
+            "query": query,
+            "result": original.get("result"),
+            "status": "completed",
+            "sources": original.get("sources") or [],
+            "duplicate_of": entry.query,
+            "similarity": round(similarity, 3),
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(self._stats, threshold=self.threshold, history=len(self._history))
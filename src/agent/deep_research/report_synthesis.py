@@ -0,0 +1,143 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from src.agent.deep_research.message_compaction import CHARS_PER_TOKEN
+
+logger = logging.getLogger(__name__)
+
+SYNTHESIS_CACHE_FILENAME = "synthesis_cache.json"
+# Bump when the section prompts change, so cached summaries of the old prompts are not reused
+SECTION_PROMPT_VERSION = "1"
+
+_SECTION_SYSTEM_PROMPT = """You are a research assistant condensing findings for one section of a research report.
+Summarize the findings you are given for the section "{section}" of the research topic "{topic}".
+Keep every key fact, number, date, name and source URL, note contradictions and drop repetition.
+Write concise Markdown without an introduction or conclusion, it will be merged with other sections."""
+
+
+def llm_model_name(llm: Any) -> str:
+    """Name of the model behind a chat model instance, as far as it tells."""
+    return str(getattr(llm, "model_name", None) or getattr(llm, "model", None) or type(llm).__name__)
+
+
+def estimate_text_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN
+
+
+def chunk_blocks(blocks: List[str], chunk_tokens: int) -> List[str]:
+    """
+    Greedily packs text blocks into chunks of at most `chunk_tokens` estimated tokens.
+    Blocks are never reordered, a single oversized block is split into several chunks.
+    """
+    max_chars = max(1, chunk_tokens) * CHARS_PER_TOKEN
+    chunks = []
+    current: List[str] = []
+    current_chars = 0
+    for block in blocks:
+        pieces = [block[i:i + max_chars] for i in range(0, len(block), max_chars)] or [block]
+        for piece in pieces:
+            if current and current_chars + len(piece) > max_chars:
+                chunks.append("\n".join(current))
+                current, current_chars = [], 0
+            current.append(piece)
+            current_chars += len(piece)
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+
+class SynthesisCache:
+    """
+    Section summaries of a research task, keyed by a hash of everything that went into them.
+    Stored as `synthesis_cache.json` in the output dir, so re-synthesizing a report only calls
+    the LLM for sections whose findings changed.
+    """
+
+    def __init__(self, output_dir: str):
+        self.path = os.path.join(str(output_dir), SYNTHESIS_CACHE_FILENAME)
+        self.hits = 0
+        self.misses = 0
+        self._entries: Dict[str, str] = {}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self._entries = json.load(f)
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable synthesis cache {self.path}: {e}")
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        return hashlib.sha256(json.dumps(parts, ensure_ascii=False, default=str).encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        value = self._entries.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key: str, value: str):
+        self._entries[key] = value
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.error(f"Failed to save synthesis cache {self.path}: {e}")
+
+
+async def summarize_sections(
+        llm: Any,
+        topic: str,
+        sections: List[Tuple[str, List[str]]],
+        chunk_tokens: int,
+        max_parallel: int,
+        cache: SynthesisCache,
+) -> List[Tuple[str, str]]:
+    """
+    Map step of the hierarchical synthesis: condenses the findings of each section.
+
+    The findings of a section are packed into token-bounded chunks that are summarized
+    concurrently (at most `max_parallel` LLM calls at once). Chunk summaries of a section
+    are reduced the same way until one summary per section remains.
+    """
+    semaphore = asyncio.Semaphore(max(1, max_parallel))
+    model_name = llm_model_name(llm)
+
+    async def summarize(section: str, text: str) -> str:
+        key = cache.make_key(SECTION_PROMPT_VERSION, model_name, topic, section, text)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+        async with semaphore:
+            response = await llm.ainvoke([
+                SystemMessage(content=_SECTION_SYSTEM_PROMPT.format(section=section, topic=topic)),
+                HumanMessage(content=f"**Findings:**\n{text}"),
+            ])
+        cache.set(key, response.content)
+        return response.content
+
+    async def summarize_section(section: str, blocks: List[str]) -> str:
+        summaries = await asyncio.gather(*[summarize(section, chunk) for chunk in chunk_blocks(blocks, chunk_tokens)])
+        while len(summaries) > 1:
+            chunks = chunk_blocks(summaries, chunk_tokens)
+            if len(chunks) >= len(summaries):
+                # Summaries too long to pack together, merge them pairwise so the reduction terminates
+                chunks = ["\n".join(summaries[i:i + 2]) for i in range(0, len(summaries), 2)]
+            summaries = await asyncio.gather(*[summarize(section, chunk) for chunk in chunks])
+        return summaries[0]
+
+    section_summaries = await asyncio.gather(*[summarize_section(section, blocks) for section, blocks in sections])
+    logger.info(
+        f"Summarized {len(sections)} report sections "
+        f"({cache.hits} cached summaries reused, {cache.misses} generated)."
+    )
+    return list(zip([section for section, _ in sections], section_summaries))
@@ -0,0 +1,233 @@
+import asyncio
+import gzip
+import json
+import logging
+import os
+import struct
+import threading
+import zlib
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SEARCH_RESULTS_FILENAME = "search_results.jsonl"
+SEARCH_RESULTS_INDEX_FILENAME = "search_results.idx"
+
+# One index entry per record: byte offset and length of the record in the data file
+_INDEX_ENTRY = struct.Struct("<QI")
+
+
+class SearchResultStore:
+    """
+    Append-only store for research search results.
+
+    Records are written as JSON lines to `search_results.jsonl` (or, with `compress=True`,
+    as one gzip member per record to `search_results.jsonl.gz`, which still decompresses to
+    plain JSONL). Every append is flushed and fsynced before it returns, and a fixed-size
+    offset index allows reading single records without loading the whole file. From the event
+    loop, use `aappend`/`aextend`: the write runs in a thread, and records appended while a
+    write is in progress are written together in the next one.
+    """
+
+    def __init__(self, output_dir: str, compress: bool = False):
+        self.output_dir = str(output_dir)
+        plain_path = os.path.join(self.output_dir, SEARCH_RESULTS_FILENAME)
+        # An existing file decides the format, so a resumed run keeps appending to the same file
+        if os.path.exists(plain_path + ".gz"):
+            compress = True
+        elif os.path.exists(plain_path):
+            compress = False
+        self.compress = compress
+        self.path = plain_path + ".gz" if compress else plain_path
+        self.index_path = os.path.join(self.output_dir, SEARCH_RESULTS_INDEX_FILENAME)
+        self._index: List[Tuple[int, int]] = []
+        # Sync appends and the writer thread of the async ones must not interleave
+        self._write_lock = threading.Lock()
+        self._pending: List[Tuple[List[Dict[str, Any]], asyncio.Future]] = []
+        self._writer: Optional[asyncio.Task] = None
+        os.makedirs(self.output_dir, exist_ok=True)
+        self._load_index()
+
+    # --- Index handling ---
+
+    def _load_index(self):
+        data_size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        index: List[Tuple[int, int]] = []
+        if os.path.exists(self.index_path):
+            with open(self.index_path, "rb") as f:
+                raw = f.read()
+            usable = len(raw) - len(raw) % _INDEX_ENTRY.size
+            index = [entry for entry in _INDEX_ENTRY.iter_unpack(raw[:usable])]
+
+        index_end = index[-1][0] + index[-1][1] if index else 0
+        if index_end != data_size:
+            # Crash between data and index write, or the index is missing: rebuild from the data
+            logger.warning(f"Search result index out of date for {self.path}, rebuilding it.")
+            index = self._scan_data_file()
+            self._truncate_data(index[-1][0] + index[-1][1] if index else 0)
+            with open(self.index_path, "wb") as f:
+                for offset, length in index:
+                    f.write(_INDEX_ENTRY.pack(offset, length))
+                f.flush()
+                os.fsync(f.fileno())
+        self._index = index
+
+    def _scan_data_file(self) -> List[Tuple[int, int]]:
+        """Recovers record boundaries from the data file, ignoring a partially written last record."""
+        index = []
+        if not os.path.exists(self.path):
+            return index
+        with open(self.path, "rb") as f:
+            data = f.read()
+        offset = 0
+        while offset < len(data):
+            if self.compress:
+                decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+                try:
+                    decompressor.decompress(data[offset:])
+                except zlib.error:
+                    break
+                if not decompressor.eof:
+                    break
+                length = len(data) - offset - len(decompressor.unused_data)
+            else:
+                newline = data.find(b"\n", offset)
+                if newline == -1:
+                    break
+                length = newline + 1 - offset
+            index.append((offset, length))
+            offset += length
+        return index
+
+    def _truncate_data(self, size: int):
+        if os.path.exists(self.path) and os.path.getsize(self.path) > size:
+            logger.warning(f"Dropping partially written search result at the end of {self.path}.")
+            with open(self.path, "r+b") as f:
+                f.truncate(size)
+
+    # --- Writing ---
+
+    def _encode(self, record: Dict[str, Any]) -> bytes:
+        line = (json.dumps(record, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+        return gzip.compress(line) if self.compress else line
+
+    def extend(self, records: Iterable[Dict[str, Any]]) -> List[int]:
+        """Durably appends records and returns their record ids."""
+        payloads = [self._encode(record) for record in records]
+        if not payloads:
+            return []
+        with self._write_lock:
+            offset = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+            new_entries = []
+            for payload in payloads:
+                new_entries.append((offset, len(payload)))
+                offset += len(payload)
+
+            with open(self.path, "ab") as f:
+                f.write(b"".join(payloads))
+                f.flush()
+                os.fsync(f.fileno())
+            with open(self.index_path, "ab") as f:
+                f.write(b"".join(_INDEX_ENTRY.pack(*entry) for entry in new_entries))
+                f.flush()
+                os.fsync(f.fileno())
+
+            first_id = len(self._index)
+            self._index.extend(new_entries)
+            return list(range(first_id, len(self._index)))
+
+    def append(self, record: Dict[str, Any]) -> int:
+        """Durably appends a single record and returns its record id."""
+        return self.extend([record])[0]
+
+    async def aextend(self, records: Iterable[Dict[str, Any]]) -> List[int]:
+        """Durably appends records without blocking the event loop and returns their record ids."""
+        records = list(records)
+        if not records:
+            return []
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((records, future))
+        if self._writer is None or self._writer.done():
+            self._writer = asyncio.create_task(self._write_pending())
+        # A cancelled caller does not take its records out of the batch, they are written anyway
+        return await asyncio.shield(future)
+
+    async def aappend(self, record: Dict[str, Any]) -> int:
+        """Durably appends a single record without blocking the event loop and returns its record id."""
+        return (await self.aextend([record]))[0]
+
+    async def _write_pending(self):
+        while self._pending:
+            batch, self._pending = self._pending, []
+            try:
+                record_ids = await asyncio.to_thread(self.extend, [record for records, _ in batch for record in records])
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            start = 0
+            for records, future in batch:
+                if not future.done():
+                    future.set_result(record_ids[start:start + len(records)])
+                start += len(records)
+
+    # --- Reading ---
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def _decode(self, payload: bytes) -> Dict[str, Any]:
+        if self.compress:
+            payload = gzip.decompress(payload)
+        return json.loads(payload.decode("utf-8"))
+
+    def get(self, record_id: int) -> Dict[str, Any]:
+        """Reads a single record using the offset index."""
+        offset, length = self._index[record_id]
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            return self._decode(f.read(length))
+
+    def get_many(self, record_ids: Iterable[int]) -> Iterator[Dict[str, Any]]:
+        with open(self.path, "rb") as f:
+            for record_id in record_ids:
+                offset, length = self._index[record_id]
+                f.seek(offset)
+                yield self._decode(f.read(length))
+
+    def iter_records(self, start: int = 0) -> Iterator[Dict[str, Any]]:
+        """Streams records from disk in append order without loading the whole file."""
+        if start >= len(self._index):
+            return
+        yield from self.get_many(range(start, len(self._index)))
+
+    def migrate_legacy_json(self, legacy_file: str):
+        """Imports a `search_info.json` written by older versions if this store is still empty."""
+        if len(self) or not os.path.exists(legacy_file):
+            return
+        try:
+            with open(legacy_file, "r", encoding="utf-8") as f:
+                legacy_results = json.load(f)
+            self.extend(legacy_results)
+            logger.info(f"Migrated {len(legacy_results)} search results from {legacy_file} to {self.path}")
+        except Exception as e:
+            logger.error(f"Failed to migrate search results from {legacy_file}: {e}")
+
+
+_OPEN_STORES: Dict[str, SearchResultStore] = {}
+
+
+def get_result_store(output_dir: str, compress: Optional[bool] = None) -> SearchResultStore:
+    """Returns the store of a research output dir, reusing the instance already opened in this process."""
+    key = os.path.abspath(str(output_dir))
+    store = _OPEN_STORES.get(key)
+    if store is None:
+        store = SearchResultStore(key, compress=bool(compress))
+        _OPEN_STORES[key] = store
+    return store
+
+
+def close_result_store(output_dir: str):
+    """Forgets the cached store of an output dir, e.g. once its run has finished."""
+    _OPEN_STORES.pop(os.path.abspath(str(output_dir)), None)
@@ -0,0 +1,226 @@
+import contextvars
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import AsyncCallbackHandler
+
+from src.agent.deep_research.budget import llm_result_usage
+from src.utils.llm_provider import with_callbacks
+
+logger = logging.getLogger(__name__)
+
+METRICS_FILENAME = "metrics.json"
+EVENT_LOG_FILENAME = "events.jsonl"
+
+
+class RunMetrics:
+    """
+    Timing and usage metrics of one research run.
+
+    Records the wall time of every graph node execution, the latency and token usage of every
+    LLM call, the launch, run and close time and queue wait of every browser query, and named
+    counters such as cache hits. `save` writes them with the run's summary stats to
+    `metrics.json`. With `event_log_path`, every record is also appended to a JSONL log as it
+    happens, so the log survives a crash of the run.
+    """
+
+    def __init__(self, task_id: str, event_log_path: Optional[str] = None):
+        self.task_id = task_id
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self.nodes: List[Dict[str, Any]] = []
+        self.llm_calls: List[Dict[str, Any]] = []
+        self.queries: List[Dict[str, Any]] = []
+        self.counters: Dict[str, float] = {}
+        # Records may also arrive from worker threads
+        self._lock = threading.Lock()
+        self._event_log = open(event_log_path, "a", encoding="utf-8") if event_log_path else None
+
+    def offset_s(self) -> float:
+        """Seconds since the run started."""
+        return round(time.perf_counter() - self._start, 3)
+
+    def _log(self, kind: str, record: Dict[str, Any]):
+        if self._event_log is None:
+            return
+        line = json.dumps({"type": kind, "task_id": self.task_id, "timestamp": time.time(), **record},
+                          ensure_ascii=False, default=str)
+        with self._lock:
+            self._event_log.write(line + "\n")
+            self._event_log.flush()
+
+    def record_node(self, node: str, start_offset_s: float, duration_s: float, error: Optional[str] = None):
+        record = {"node": node, "start_offset_s": start_offset_s, "duration_s": round(duration_s, 3)}
+        if error:
+            record["error"] = error
+        self.nodes.append(record)
+        self._log("node", record)
+
+    def record_llm_call(self, tier: str, latency_s: float, usage: Dict[str, int], error: Optional[str] = None):
+        record = {"tier": tier, "start_offset_s": round(self.offset_s() - latency_s, 3),
+                  "latency_s": round(latency_s, 3), **usage}
+        if error:
+            record["error"] = error
+        self.llm_calls.append(record)
+        self._log("llm_call", record)
+
+    def record_query(self, result: Dict[str, Any], category_index: Optional[int] = None,
+                     task_index: Optional[int] = None):
+        record = {
+            "query": result.get("query"),
+            "status": result.get("status"),
+            "category_index": category_index,
+            "task_index": task_index,
+            "cached": bool(result.get("cached")),
+            "duplicate_of": result.get("duplicate_of"),
+            "queue_wait_s": result.get("queue_wait_s"),
+            "run_time_s": result.get("run_time_s"),
+            "steps": result.get("steps"),
+            **(result.get("timings") or {}),
+        }
+        self.queries.append(record)
+        self._log("query", record)
+
+    def count(self, name: str, value: float = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def summary(self) -> Dict[str, Any]:
+        """Per node, per LLM tier and browser query totals."""
+        nodes: Dict[str, Dict[str, Any]] = {}
+        for record in self.nodes:
+            node = nodes.setdefault(record["node"], {"calls": 0, "total_s": 0.0, "max_s": 0.0})
+            node["calls"] += 1
+            node["total_s"] = round(node["total_s"] + record["duration_s"], 3)
+            node["max_s"] = max(node["max_s"], record["duration_s"])
+        llm_tiers: Dict[str, Dict[str, Any]] = {}
+        for record in self.llm_calls:
+            tier = llm_tiers.setdefault(record["tier"], {"calls": 0, "errors": 0, "total_latency_s": 0.0,
+                                                         "max_latency_s": 0.0, "input_tokens": 0,
+                                                         "output_tokens": 0, "total_tokens": 0})
+            tier["calls"] += 1
+            tier["errors"] += 1 if record.get("error") else 0
+            tier["total_latency_s"] = round(tier["total_latency_s"] + record["latency_s"], 3)
+            tier["max_latency_s"] = max(tier["max_latency_s"], record["latency_s"])
+            for key in ("input_tokens", "output_tokens", "total_tokens"):
+                tier[key] += record.get(key, 0)
+        browser_queries = [record for record in self.queries if record.get("run_time_s")]
+        queries = {
+            "count": len(self.queries),
+            "cached": sum(1 for record in self.queries if record["cached"]),
+            "duplicates": sum(1 for record in self.queries if record["duplicate_of"]),
+            "browser_runs": len(browser_queries),
+        }
+        for key in ("queue_wait_s", "launch_s", "run_s", "close_s"):
+            values = [record[key] for record in self.queries if record.get(key) is not None]
+            queries[f"total_{key}"] = round(sum(values), 3)
+            queries[f"max_{key}"] = max(values, default=0.0)
+        return {"nodes": nodes, "llm": llm_tiers, "queries": queries}
+
+    def save(self, output_dir: str, **run_fields) -> str:
+        """Writes metrics.json to `output_dir`, `run_fields` (status, stats, ...) are included as is."""
+        metrics = {
+            "task_id": self.task_id,
+            "started_at": self.started_at,
+            "finished_at": time.time(),
+            "wall_time_s": self.offset_s(),
+            **run_fields,
+            "summary": self.summary(),
+            "counters": {name: round(value, 3) for name, value in self.counters.items()},
+            "nodes": self.nodes,
+            "llm_calls": self.llm_calls,
+            "queries": self.queries,
+        }
+        metrics_path = os.path.join(output_dir, METRICS_FILENAME)
+        tmp_path = metrics_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(metrics, f, indent=2, ensure_ascii=False, default=str)
+        os.replace(tmp_path, metrics_path)
+        return metrics_path
+
+    def close(self):
+        if self._event_log is not None:
+            self._event_log.close()
+            self._event_log = None
+
+
+# Metrics of the research run executing in the current context, set by DeepResearchAgent.run
+_RUN_METRICS: contextvars.ContextVar[Optional[RunMetrics]] = contextvars.ContextVar("research_run_metrics",
+                                                                                   default=None)
+
+
+def set_run_metrics(metrics: Optional[RunMetrics]) -> contextvars.Token:
+    return _RUN_METRICS.set(metrics)
+
+
+def reset_run_metrics(token: contextvars.Token):
+    _RUN_METRICS.reset(token)
+
+
+def get_run_metrics() -> Optional[RunMetrics]:
+    return _RUN_METRICS.get()
+
+
+def count_metric(name: str, value: float = 1):
+    """Adds `value` to a counter of the current run. Without metrics this is a no-op."""
+    metrics = _RUN_METRICS.get()
+    if metrics is not None:
+        metrics.count(name, value)
+
+
+def timed_node(name: str, node: Callable) -> Callable:
+    """Wraps an async graph node so every execution is recorded in the metrics of the current run."""
+
+    @functools.wraps(node)
+    async def wrapper(state, config):
+        metrics = _RUN_METRICS.get()
+        if metrics is None:
+            return await node(state, config)
+        start_offset_s = metrics.offset_s()
+        start_time = time.perf_counter()
+        error = None
+        try:
+            return await node(state, config)
+        except BaseException as e:
+            error = type(e).__name__
+            raise
+        finally:
+            metrics.record_node(name, start_offset_s, time.perf_counter() - start_time, error)
+
+    return wrapper
+
+
+class LLMMetricsCallback(AsyncCallbackHandler):
+    """Records latency and token usage of every LLM call of a model tier in RunMetrics."""
+
+    def __init__(self, metrics: RunMetrics, tier: str):
+        self.metrics = metrics
+        self.tier = tier
+        self._start_times: Dict[UUID, float] = {}
+
+    async def on_chat_model_start(self, serialized, messages, *, run_id: UUID, **kwargs: Any) -> None:
+        self._start_times[run_id] = time.perf_counter()
+
+    async def on_llm_start(self, serialized, prompts, *, run_id: UUID, **kwargs: Any) -> None:
+        self._start_times[run_id] = time.perf_counter()
+
+    async def on_llm_end(self, response, *, run_id: UUID, **kwargs: Any) -> None:
+        start_time = self._start_times.pop(run_id, None)
+        if start_time is not None:
+            self.metrics.record_llm_call(self.tier, time.perf_counter() - start_time, llm_result_usage(response))
+
+    async def on_llm_error(self, error, *, run_id: UUID, **kwargs: Any) -> None:
+        start_time = self._start_times.pop(run_id, None)
+        if start_time is not None:
+            self.metrics.record_llm_call(self.tier, time.perf_counter() - start_time, {}, error=str(error))
+
+
+def track_llm_metrics(llm: Any, metrics: RunMetrics, tier: str) -> Any:
+    """Returns a copy of `llm` whose calls are recorded in `metrics` under `tier`."""
+    return with_callbacks(llm, LLMMetricsCallback(metrics, tier))
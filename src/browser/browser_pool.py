@@ -0,0 +1,356 @@
+import asyncio
+import atexit
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+import psutil
+from browser_use.browser.browser import BrowserConfig
+from browser_use.browser.context import BrowserContextConfig
+
+from .custom_browser import CustomBrowser
+from .custom_context import CustomBrowserContext
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", "2"))
+DEFAULT_POOL_MAX_USES = int(os.getenv("BROWSER_POOL_MAX_USES", "20"))
+
+
+def build_browser_config(browser_config: Dict[str, Any]) -> BrowserConfig:
+    """
+    Translates the plain browser settings dict used across the webui
+    (headless, window_width, use_own_browser, ...) into a BrowserConfig.
+    """
+    headless = browser_config.get("headless", False)
+    window_w = browser_config.get("window_width", 1280)
+    window_h = browser_config.get("window_height", 1100)
+    browser_user_data_dir = browser_config.get("user_data_dir", None)
+    use_own_browser = browser_config.get("use_own_browser", False)
+    browser_binary_path = browser_config.get("browser_binary_path", None)
+    wss_url = browser_config.get("wss_url", None)
+    cdp_url = browser_config.get("cdp_url", None)
+    disable_security = browser_config.get("disable_security", False)
+
+    extra_args = []
+    if use_own_browser:
+        browser_binary_path = os.getenv("BROWSER_PATH", None) or browser_binary_path
+        if browser_binary_path == "":
+            browser_binary_path = None
+        browser_user_data = browser_user_data_dir or os.getenv("BROWSER_USER_DATA", None)
+        if browser_user_data:
+            extra_args += [f"--user-data-dir={browser_user_data}"]
+    else:
+        browser_binary_path = None
+
+    return BrowserConfig(
+        headless=headless,
+        disable_security=disable_security,
+        browser_binary_path=browser_binary_path,
+        extra_browser_args=extra_args,
+        wss_url=wss_url or None,
+        cdp_url=cdp_url or None,
+        new_context_config=BrowserContextConfig(
+            window_width=window_w,
+            window_height=window_h,
+        )
+    )
+
+
+def _is_single_instance(config: BrowserConfig) -> bool:
+    """A browser profile or remote browser endpoint can only back one pooled browser."""
+    return bool(config.cdp_url or config.wss_url or
+                any(arg.startswith("--user-data-dir") for arg in config.extra_browser_args))
+
+
+def _config_key(config: BrowserConfig) -> str:
+    """Browsers are only shared between callers that would launch an identical instance."""
+    return json.dumps(config.model_dump(), sort_keys=True, default=str)
+
+
+def _browser_pids(browser: CustomBrowser) -> List[int]:
+    """Processes of a browser: the Playwright driver, whose children are the browser processes, or an own Chrome."""
+    pids = []
+    chrome_proc = getattr(browser, "_chrome_subprocess", None)
+    if chrome_proc is not None:
+        pids.append(chrome_proc.pid)
+    try:
+        pids.append(browser.playwright._impl_obj._connection._transport._proc.pid)
+    except AttributeError:
+        pass
+    return pids
+
+
+def _kill_browser_processes(browser: CustomBrowser) -> int:
+    """Kills the processes of a browser that can no longer be closed through Playwright, returns how many."""
+    killed = 0
+    for pid in _browser_pids(browser):
+        try:
+            process = psutil.Process(pid)
+            for child in process.children(recursive=True):
+                child.kill()
+                killed += 1
+            process.kill()
+            killed += 1
+        except psutil.Error:
+            continue
+    return killed
+
+
+async def _close_browsers(browsers: List[CustomBrowser]):
+    await asyncio.gather(*[browser.close() for browser in browsers], return_exceptions=True)
+
+
+class _PooledBrowser:
+    def __init__(self, key: str):
+        self.key = key
+        self.browser: Optional[CustomBrowser] = None
+        # Resolved with the browser once its launch finishes, every lease taken meanwhile waits for it
+        self.ready: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.launch_task: Optional[asyncio.Task] = None
+        self.uses = 0
+        self.leases = 0
+        self.retired = False
+        self.launched_at = time.time()
+
+    def is_healthy(self) -> bool:
+        if not self.ready.done():
+            return True
+        playwright_browser = self.browser.playwright_browser if self.browser is not None else None
+        try:
+            return playwright_browser is not None and playwright_browser.is_connected()
+        except Exception:
+            return False
+
+
+class BrowserPool:
+    """
+    Keeps warm browser instances around so that short-lived agents (e.g. deep research
+    sub-agents) only pay for a new context instead of a full browser launch.
+
+    Browsers are grouped by their launch configuration. Up to `pool_size` browsers are
+    kept per configuration, each serving any number of isolated contexts. A browser is
+    recycled once it has served `max_uses` leases, and dropped as soon as a health check
+    shows its connection is gone.
+    """
+
+    def __init__(self, pool_size: int = DEFAULT_POOL_SIZE, max_uses: int = DEFAULT_POOL_MAX_USES):
+        self.pool_size = max(1, pool_size)
+        self.max_uses = max(1, max_uses)
+        self._entries: Dict[str, List[_PooledBrowser]] = {}
+        self._by_browser: Dict[int, _PooledBrowser] = {}
+        self._by_context: Dict[str, _PooledBrowser] = {}
+        self._lock: Optional[asyncio.Lock] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "launches": 0,
+            "launch_failures": 0,
+            "launch_latency_total_s": 0.0,
+            "launch_latency_max_s": 0.0,
+            "recycled": 0,
+            "evicted_unhealthy": 0,
+        }
+
+    def configure(self, pool_size: Optional[int] = None, max_uses: Optional[int] = None):
+        """Adjusts pool limits. Browsers already launched are kept until they are released."""
+        if pool_size:
+            self.pool_size = max(1, int(pool_size))
+        if max_uses:
+            self.max_uses = max(1, int(max_uses))
+
+    async def _bind_loop(self):
+        # Playwright objects belong to the loop that created them, so a pool that was
+        # used from another loop cannot hand out its browsers anymore.
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        old_loop, browsers = self._loop, [entry.browser for entry in self._by_browser.values()]
+        self._entries.clear()
+        self._by_browser.clear()
+        self._by_context.clear()
+        self._lock = asyncio.Lock()
+        self._loop = loop
+        if not browsers:
+            return
+        if old_loop is not None and old_loop.is_running() and not old_loop.is_closed():
+            logger.warning(f"Browser pool used from a new event loop, closing {len(browsers)} browsers on the old loop.")
+            await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(_close_browsers(browsers), old_loop))
+        else:
+            # The old loop no longer runs, Playwright cannot close its browsers, their processes are killed instead
+            killed = sum(_kill_browser_processes(browser) for browser in browsers)
+            logger.warning(f"Browser pool used from a new event loop after the old one stopped, "
+                           f"killed {killed} processes of {len(browsers)} browsers it left open.")
+
+    async def _launch(self, entry: _PooledBrowser, config: BrowserConfig):
+        browser = CustomBrowser(config=config)
+        start_time = time.perf_counter()
+        try:
+            await browser.get_playwright_browser()
+        except BaseException as e:
+            self._stats["launch_failures"] += 1
+            entries = self._entries.get(entry.key, [])
+            if entry in entries:
+                entries.remove(entry)
+            entry.ready.set_exception(e if isinstance(e, Exception) else RuntimeError("Browser launch was cancelled."))
+            # Every waiter gets the exception, the launch task itself does not report it again
+            entry.ready.exception()
+            await browser.close()
+            return
+        latency = time.perf_counter() - start_time
+        self._stats["launches"] += 1
+        self._stats["launch_latency_total_s"] += latency
+        self._stats["launch_latency_max_s"] = max(self._stats["launch_latency_max_s"], latency)
+        logger.info(f"Launched pooled browser in {latency:.2f}s.")
+
+        entry.browser = browser
+        self._by_browser[id(browser)] = entry
+        entry.ready.set_result(browser)
+
+    async def _discard(self, entry: _PooledBrowser):
+        entries = self._entries.get(entry.key, [])
+        if entry in entries:
+            entries.remove(entry)
+        self._by_browser.pop(id(entry.browser), None)
+        try:
+            await entry.browser.close()
+        except Exception as e:
+            logger.error(f"Error closing pooled browser: {e}")
+
+    async def acquire_browser(self, browser_config: Dict[str, Any]) -> CustomBrowser:
+        """
+        Leases a warm browser matching `browser_config`, launching one if needed.
+        Every lease must be returned with `release_browser`.
+        """
+        await self._bind_loop()
+        config = build_browser_config(browser_config)
+        key = _config_key(config)
+
+        async with self._lock:
+            candidates = []
+            for entry in list(self._entries.get(key, [])):
+                if not entry.is_healthy():
+                    logger.warning("Pooled browser failed health check, evicting it.")
+                    self._stats["evicted_unhealthy"] += 1
+                    await self._discard(entry)
+                elif not entry.retired:
+                    candidates.append(entry)
+
+            idle = [entry for entry in candidates if entry.leases == 0]
+            # A second browser on the same profile would fail on its lock or attach to the first one
+            pool_size = 1 if _is_single_instance(config) else self.pool_size
+            if idle or len(candidates) >= pool_size:
+                entry = min(idle or candidates, key=lambda e: e.leases)
+                self._stats["hits"] += 1
+            else:
+                self._stats["misses"] += 1
+                # Launches run outside the lock, so cold starts of several slots overlap
+                entry = _PooledBrowser(key)
+                self._entries.setdefault(key, []).append(entry)
+                entry.launch_task = asyncio.create_task(self._launch(entry, config))
+
+            entry.leases += 1
+            entry.uses += 1
+            if entry.uses >= self.max_uses:
+                entry.retired = True
+
+        try:
+            return await asyncio.shield(entry.ready)
+        except BaseException:
+            entry.leases = max(0, entry.leases - 1)
+            raise
+
+    async def release_browser(self, browser: CustomBrowser, close_if_idle: bool = False):
+        """
+        Returns a leased browser. Retired or unhealthy browsers are closed once their last
+        lease is returned, `close_if_idle=True` does the same for any browser nobody else uses.
+        Browsers not owned by the pool are simply closed.
+        """
+        entry = self._by_browser.get(id(browser))
+        if entry is None:
+            await browser.close()
+            return
+
+        entry.leases = max(0, entry.leases - 1)
+        if entry.leases > 0:
+            return
+        if entry.retired:
+            logger.info(f"Recycling pooled browser after {entry.uses} uses.")
+            self._stats["recycled"] += 1
+            await self._discard(entry)
+        elif not entry.is_healthy():
+            self._stats["evicted_unhealthy"] += 1
+            await self._discard(entry)
+        elif close_if_idle:
+            await self._discard(entry)
+
+    async def new_context(
+            self,
+            browser_config: Dict[str, Any],
+            context_config: Optional[BrowserContextConfig] = None,
+    ) -> CustomBrowserContext:
+        """Leases a pooled browser and opens a fresh, isolated context on it."""
+        browser = await self.acquire_browser(browser_config)
+        try:
+            context = await browser.new_context(config=context_config)
+        except Exception:
+            await self.release_browser(browser)
+            raise
+        self._by_context[context.context_id] = self._by_browser[id(browser)]
+        return context
+
+    async def release_context(self, context: CustomBrowserContext):
+        """Closes a context obtained from `new_context` and returns its browser lease."""
+        try:
+            await context.close()
+        except Exception as e:
+            logger.error(f"Error closing pooled browser context: {e}")
+        entry = self._by_context.pop(context.context_id, None)
+        if entry is not None:
+            await self.release_browser(entry.browser)
+
+    async def close(self):
+        """Closes every pooled browser, including leased ones."""
+        launches = [entry.launch_task for entries in self._entries.values() for entry in entries
+                    if entry.launch_task is not None and not entry.launch_task.done()]
+        if launches:
+            await asyncio.gather(*launches, return_exceptions=True)
+        for entry in list(self._by_browser.values()):
+            await self._discard(entry)
+        self._by_context.clear()
+
+    def terminate(self):
+        """Kills the processes of every pooled browser, for process exit when no event loop can close them."""
+        browsers = [entry.browser for entry in self._by_browser.values()]
+        self._entries.clear()
+        self._by_browser.clear()
+        self._by_context.clear()
+        killed = sum(_kill_browser_processes(browser) for browser in browsers)
+        if killed:
+            logger.info(f"Killed {killed} processes of {len(browsers)} pooled browsers.")
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = dict(self._stats)
+        launches = stats["launches"]
+        stats["launch_latency_avg_s"] = stats["launch_latency_total_s"] / launches if launches else 0.0
+        stats["browsers"] = len(self._by_browser)
+        stats["leases"] = sum(entry.leases for entry in self._by_browser.values())
+        stats["pool_size"] = self.pool_size
+        stats["max_uses"] = self.max_uses
+        return stats
+
+
+_BROWSER_POOL: Optional[BrowserPool] = None
+
+
+def get_browser_pool() -> BrowserPool:
+    """Returns the process-wide browser pool."""
+    global _BROWSER_POOL
+    if _BROWSER_POOL is None:
+        _BROWSER_POOL = BrowserPool()
+        # Browsers still open when the process exits, e.g. the webui being stopped, are not left running
+        atexit.register(_BROWSER_POOL.terminate)
+    return _BROWSER_POOL
@@ -28,6 +28,8 @@ from langchain_core.language_models.chat_models import BaseChatModel
 from browser_use.agent.views import ActionModel, ActionResult
 
 from src.utils.mcp_client import create_tool_param_model, setup_mcp_client_and_tools
+from src.utils.page_store import PageStore, is_search_page
+from src.utils.pdf_reader import PDF_DOWNLOAD_DIR, format_pdf_result, read_pdf
 
 from browser_use.utils import time_execution_sync
 
@@ -35,14 +37,27 @@ logger = logging.getLogger(__name__)
 
 Context = TypeVar('Context')
 
+# Same prompt as browser_use's extract_content, run over the stored main content of the page
+PAGE_EXTRACTION_PROMPT = ('Your task is to extract the content of the page. You will be given a page and a goal and '
+                          'you should extract all relevant information around this goal from the page. If the goal '
+                          'is vague, summarize the page. Respond in json format. Extraction goal: {goal}, Page: {page}')
+# Actions after which the current page is added to the page store
+_PAGE_STORING_ACTIONS = ("go_to_url", "open_tab", "extract_content")
+
 
 class CustomController(Controller):
     def __init__(self, exclude_actions: list[str] = [],
                  output_model: Optional[Type[BaseModel]] = None,
                  ask_assistant_callback: Optional[Union[Callable[[str, BrowserContext], Dict[str, Any]], Callable[
                      [str, BrowserContext], Awaitable[Dict[str, Any]]]]] = None,
+                 page_store: Optional[PageStore] = None,
+                 pdf_download_dir: str = PDF_DOWNLOAD_DIR,
                  ):
         super().__init__(exclude_actions=exclude_actions, output_model=output_model)
+        self.pdf_download_dir = pdf_download_dir
+        # Pages read by any agent sharing the store can be extracted again without opening them
+        self.page_store = page_store
+        self._store_tasks = set()
         self._register_custom_actions()
         self.ask_assistant_callback = ask_assistant_callback
         self.mcp_client = None
@@ -106,6 +121,71 @@ class CustomController(Controller):
                 logger.info(msg)
                 return ActionResult(error=msg)
 
+        @self.registry.action(
+            'Read a PDF document by its URL and get the passages most relevant to a query. '
+            'Use this instead of opening, downloading or scrolling through PDF files in the browser.',
+        )
+        async def read_pdf_document(url: str, query: str):
+            try:
+                result = await read_pdf(url, query, download_dir=self.pdf_download_dir)
+            except Exception as e:
+                msg = f'Failed to read PDF {url}: {str(e)}'
+                logger.info(msg)
+                return ActionResult(error=msg)
+            return ActionResult(extracted_content=format_pdf_result(result), include_in_memory=True)
+
+        if self.page_store is not None:
+            @self.registry.action(
+                'Extract information for a goal from a web page by its URL. Pages read before are answered from '
+                'their stored text without opening them, other pages are opened in the current tab first. '
+                'Use go_to_url instead when you need to interact with the page.',
+            )
+            async def extract_url_content(url: str, goal: str, browser: BrowserContext,
+                                          page_extraction_llm: BaseChatModel):
+                stored_page = None if is_search_page(url) else await asyncio.to_thread(self.page_store.get, url)
+                if stored_page is None:
+                    await self.registry.execute_action("go_to_url", {"url": url}, browser=browser)
+                    await self._schedule_store_current_page(browser)
+                    return await self.registry.execute_action(
+                        "extract_content", {"goal": goal, "should_strip_link_urls": False},
+                        browser=browser, page_extraction_llm=page_extraction_llm,
+                    )
+                output = await page_extraction_llm.ainvoke(
+                    PAGE_EXTRACTION_PROMPT.format(goal=goal, page=stored_page["text"]))
+                msg = f'📄  Extracted from stored page {url}\n: {output.content}\n'
+                logger.info(msg)
+                return ActionResult(extracted_content=msg, include_in_memory=True)
+
+    def _store_page(self, url: str, title: str, html: str):
+        text = MainContentExtractor.extract(html, output_format="markdown")
+        if text and text.strip():
+            self.page_store.put(url, title, text.strip())
+
+    async def _store_current_page(self, page: Any):
+        """Adds the main content of a page to the page store, unless it changed URL meanwhile."""
+        try:
+            url = page.url
+            if not url.startswith("http") or is_search_page(url):
+                return
+            html = await page.content()
+            title = await page.title()
+            if page.url != url:
+                return
+            await asyncio.to_thread(self._store_page, url, title, html)
+        except Exception as e:
+            logger.debug(f"Failed to add the current page to the page store: {e}")
+
+    async def _schedule_store_current_page(self, browser_context: BrowserContext):
+        """Stores the current page in the background, the agent step does not wait for the extraction."""
+        try:
+            page = await browser_context.get_current_page()
+        except Exception as e:
+            logger.debug(f"Failed to get the current page: {e}")
+            return
+        task = asyncio.create_task(self._store_current_page(page))
+        self._store_tasks.add(task)
+        task.add_done_callback(self._store_tasks.discard)
+
     @time_execution_sync('--act')
     async def act(
             self,
@@ -139,6 +219,10 @@ class CustomController(Controller):
                             context=context,
                         )
 
+                    if self.page_store is not None and browser_context is not None and (
+                            action_name in _PAGE_STORING_ACTIONS):
+                        await self._schedule_store_current_page(browser_context)
+
                     if isinstance(result, str):
                         return ActionResult(extracted_content=result)
                     elif isinstance(result, ActionResult):
@@ -1,12 +1,15 @@
 from openai import OpenAI
 import pdb
 from langchain_openai import ChatOpenAI
+from langchain_core.callbacks import BaseCallbackManager
 from langchain_core.globals import get_llm_cache
+from langchain_core.language_models.chat_models import BaseChatModel
 from langchain_core.language_models.base import (
     BaseLanguageModel,
     LangSmithParams,
     LanguageModelInput,
 )
+import logging
 import os
 from langchain_core.load import dumpd, dumps
 from langchain_core.messages import (
@@ -51,6 +54,8 @@ from pydantic import SecretStr
 
 from src.utils import config
 
+logger = logging.getLogger(__name__)
+
 
 class DeepSeekR1ChatOpenAI(ChatOpenAI):
 
@@ -353,3 +358,21 @@ def get_llm_model(provider: str, **kwargs):
         )
     else:
         raise ValueError(f"Unsupported provider: {provider}")
+
+
+def with_callbacks(llm: Any, *handlers: Any) -> Any:
+    """
+    Returns a copy of a chat model that reports every call to `handlers` in addition to its
+    own callbacks, e.g. for usage tracking or call limits. Other objects are returned unchanged.
+    """
+    if not isinstance(llm, BaseChatModel):
+        logger.warning(f"LLM of type {type(llm).__name__} is not a chat model, callbacks are not attached.")
+        return llm
+    if isinstance(llm.callbacks, BaseCallbackManager):
+        # A manager also carries inheritable handlers, tags and metadata, extend a copy of it
+        callbacks = llm.callbacks.copy()
+        for handler in handlers:
+            callbacks.add_handler(handler)
+    else:
+        callbacks = list(llm.callbacks or []) + list(handlers)
+    return llm.model_copy(update={"callbacks": callbacks})
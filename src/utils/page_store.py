@@ -0,0 +1,180 @@
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+PAGE_STORE_FILENAME = "page_store.sqlite"
+DEFAULT_PAGE_STORE_TTL = int(os.getenv("PAGE_STORE_TTL", str(24 * 3600)))
+DEFAULT_PAGE_STORE_MAX_MB = int(os.getenv("PAGE_STORE_MAX_MB", "200"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS contents (
+    content_hash TEXT PRIMARY KEY,
+    text TEXT NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT PRIMARY KEY,
+    title TEXT,
+    content_hash TEXT NOT NULL REFERENCES contents (content_hash),
+    fetched_at REAL NOT NULL,
+    last_used_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_pages_last_used ON pages (last_used_at);
+CREATE INDEX IF NOT EXISTS idx_pages_content_hash ON pages (content_hash);
+"""
+
+
+# Result pages of search engines and site searches, their content depends on the query and changes all the time
+_SEARCH_PAGE_PATTERN = re.compile(
+    r"^https?://(www\.)?(google\.[^/]+/search|bing\.com/search|duckduckgo\.com/|search\.yahoo\.com/|"
+    r"baidu\.com/s\b|yandex\.[^/]+/search)"
+    r"|[?&](q|query|search|search_query|keywords?|s)=",
+    re.IGNORECASE,
+)
+# Running byte totals are re-read from the database now and then, workers of other processes share the file
+_TOTAL_BYTES_RESYNC_PUTS = 100
+
+
+def is_search_page(url: str) -> bool:
+    return bool(_SEARCH_PAGE_PATTERN.search(url))
+
+
+def normalize_url(url: str) -> str:
+    """Store key of a URL: the fragment and a trailing slash do not make a different page."""
+    url = url.split("#", 1)[0].strip()
+    return url[:-1] if url.endswith("/") else url
+
+
+class PageStore:
+    """
+    Persistent, content-addressed store of the extracted text of visited pages.
+
+    Browser agents and the fetch tool of all research runs share it: URLs map to the hash of
+    their text, identical texts are stored once. Pages older than `ttl` seconds count as
+    missing, and the least recently used pages are evicted once the stored text exceeds
+    `max_bytes`.
+    """
+
+    def __init__(self, db_path: str, ttl: int = DEFAULT_PAGE_STORE_TTL,
+                 max_bytes: int = DEFAULT_PAGE_STORE_MAX_MB * 1024 * 1024):
+        self.db_path = db_path
+        self.ttl = ttl
+        self.max_bytes = max(1, max_bytes)
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.executescript(_SCHEMA)
+        # Extraction runs in worker threads, keep every statement sequence atomic
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "expired": 0, "stores": 0, "evictions": 0}
+        self._total_bytes = self._read_total_bytes()
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """Returns {"url", "title", "text", "content_hash", "fetched_at"} of a stored page, or None."""
+        key = normalize_url(url)
+        now = time.time()
+        with self._lock, self.conn:
+            row = self.conn.execute(
+                "SELECT p.title, p.content_hash, p.fetched_at, c.text FROM pages p "
+                "JOIN contents c ON c.content_hash = p.content_hash WHERE p.url = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self._stats["misses"] += 1
+                return None
+            title, content_hash, fetched_at, text = row
+            if self.ttl and now - fetched_at > self.ttl:
+                self._delete_page(key, content_hash)
+                self._stats["expired"] += 1
+                self._stats["misses"] += 1
+                return None
+            self.conn.execute("UPDATE pages SET last_used_at = ? WHERE url = ?", (now, key))
+        self._stats["hits"] += 1
+        return {"url": key, "title": title, "text": text, "content_hash": content_hash, "fetched_at": fetched_at}
+
+    def get_title(self, url: str) -> Optional[str]:
+        """Title of a stored page, without counting as a lookup."""
+        with self._lock:
+            row = self.conn.execute("SELECT title FROM pages WHERE url = ?", (normalize_url(url),)).fetchone()
+        return row[0] if row else None
+
+    def put(self, url: str, title: Optional[str], text: str) -> str:
+        """Stores the text of a page and returns its content hash."""
+        key = normalize_url(url)
+        content_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        now = time.time()
+        with self._lock, self.conn:
+            previous = self.conn.execute("SELECT content_hash FROM pages WHERE url = ?", (key,)).fetchone()
+            size = len(text.encode("utf-8"))
+            if self.conn.execute("INSERT OR IGNORE INTO contents VALUES (?, ?, ?)",
+                                 (content_hash, text, size)).rowcount:
+                self._total_bytes += size
+            self.conn.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?)",
+                (key, title, content_hash, now, now),
+            )
+            if previous and previous[0] != content_hash:
+                self._release_content(previous[0])
+            self._stats["stores"] += 1
+            if self._stats["stores"] % _TOTAL_BYTES_RESYNC_PUTS == 0:
+                self._total_bytes = self._read_total_bytes()
+            self._evict()
+        return content_hash
+
+    def _read_total_bytes(self) -> int:
+        return self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM contents").fetchone()[0]
+
+    def _release_content(self, content_hash: str) -> int:
+        """Deletes a text no page refers to anymore, returns the number of bytes freed."""
+        if self.conn.execute("SELECT 1 FROM pages WHERE content_hash = ? LIMIT 1", (content_hash,)).fetchone():
+            return 0
+        row = self.conn.execute("SELECT size FROM contents WHERE content_hash = ?", (content_hash,)).fetchone()
+        self.conn.execute("DELETE FROM contents WHERE content_hash = ?", (content_hash,))
+        freed = row[0] if row else 0
+        self._total_bytes -= freed
+        return freed
+
+    def _delete_page(self, url: str, content_hash: str) -> int:
+        self.conn.execute("DELETE FROM pages WHERE url = ?", (url,))
+        return self._release_content(content_hash)
+
+    def _evict(self):
+        while self._total_bytes > self.max_bytes:
+            row = self.conn.execute("SELECT url, content_hash FROM pages ORDER BY last_used_at LIMIT 1").fetchone()
+            if row is None:
+                break
+            self._delete_page(*row)
+            self._stats["evictions"] += 1
+
+    def clear(self):
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM pages")
+            self.conn.execute("DELETE FROM contents")
+            self._total_bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        with self._lock:
+            stats["pages"] = self.conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+            stats["bytes"] = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM contents").fetchone()[0]
+        return stats
+
+
+_PAGE_STORES: Dict[str, PageStore] = {}
+
+
+def get_page_store(store_dir: str) -> PageStore:
+    """Returns the process-wide page store kept in `store_dir`."""
+    db_path = os.path.abspath(os.path.join(str(store_dir), PAGE_STORE_FILENAME))
+    store = _PAGE_STORES.get(db_path)
+    if store is None:
+        store = PageStore(db_path)
+        _PAGE_STORES[db_path] = store
+    return store
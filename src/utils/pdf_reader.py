@@ -0,0 +1,192 @@
+import asyncio
+import hashlib
+import logging
+import math
+import multiprocessing
+import os
+import re
+import tempfile
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+PDF_DOWNLOAD_DIR = "./tmp/downloads"
+DEFAULT_PDF_MAX_BYTES = 50 * 1024 * 1024
+DEFAULT_PDF_CHUNK_CHARS = 2000
+DEFAULT_PDF_TOP_K = 5
+PAGES_PER_JOB = 20
+
+# Parsed documents kept by each worker process, so the page ranges of one PDF are not parsed again per job
+WORKER_READER_CACHE_SIZE = 2
+
+_PDF_EXECUTOR: Optional[ProcessPoolExecutor] = None
+_WORKER_READERS: "OrderedDict[Tuple[str, float], Any]" = OrderedDict()
+_WORD_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def get_pdf_executor() -> ProcessPoolExecutor:
+    """Process pool shared by all PDF extractions, text extraction is CPU bound and would block the event loop."""
+    global _PDF_EXECUTOR
+    if _PDF_EXECUTOR is None:
+        # Forking a process that runs an event loop and threads can deadlock the children, start them fresh
+        _PDF_EXECUTOR = ProcessPoolExecutor(max_workers=max(1, min(4, (os.cpu_count() or 1))),
+                                            mp_context=multiprocessing.get_context("spawn"))
+    return _PDF_EXECUTOR
+
+
+async def download_pdf(url: str, download_dir: str = PDF_DOWNLOAD_DIR,
+                       max_bytes: int = DEFAULT_PDF_MAX_BYTES) -> str:
+    """
+    Streams the PDF at `url` to `download_dir` and returns its path. The file is named after the
+    URL, so a PDF downloaded before is reused. Larger files than `max_bytes` are rejected.
+    """
+    os.makedirs(download_dir, exist_ok=True)
+    pdf_path = os.path.join(download_dir, hashlib.sha1(url.encode("utf-8")).hexdigest() + ".pdf")
+    if os.path.exists(pdf_path):
+        return pdf_path
+
+    # Every download gets its own partial file, concurrent downloads of the same URL do not mix
+    fd, tmp_path = tempfile.mkstemp(suffix=".part", dir=download_dir)
+    try:
+        size = 0
+        with os.fdopen(fd, "wb") as f:
+            async with httpx.AsyncClient(follow_redirects=True, timeout=60) as client:
+                async with client.stream("GET", url) as response:
+                    response.raise_for_status()
+                    async for chunk in response.aiter_bytes():
+                        size += len(chunk)
+                        if size > max_bytes:
+                            raise ValueError(f"PDF is larger than {max_bytes // (1024 * 1024)} MB.")
+                        f.write(chunk)
+        with open(tmp_path, "rb") as f:
+            if not f.read(5).startswith(b"%PDF"):
+                raise ValueError(f"{url} did not return a PDF document.")
+        os.replace(tmp_path, pdf_path)
+    except BaseException:
+        # Failed, rejected and cancelled downloads leave nothing behind
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return pdf_path
+
+
+def _worker_reader(pdf_path: str) -> Any:
+    """Runs in a worker process: the parsed PDF, opened once per worker and file version."""
+    from pypdf import PdfReader
+
+    key = (pdf_path, os.path.getmtime(pdf_path))
+    reader = _WORKER_READERS.pop(key, None) or PdfReader(pdf_path)
+    _WORKER_READERS[key] = reader
+    while len(_WORKER_READERS) > WORKER_READER_CACHE_SIZE:
+        _WORKER_READERS.popitem(last=False)
+    return reader
+
+
+def _count_pages(pdf_path: str) -> int:
+    return len(_worker_reader(pdf_path).pages)
+
+
+def _extract_pages(pdf_path: str, start: int, end: int) -> List[str]:
+    """Runs in a worker process: text of pages [start, end)."""
+    reader = _worker_reader(pdf_path)
+    texts = []
+    for page_number in range(start, min(end, len(reader.pages))):
+        try:
+            texts.append(reader.pages[page_number].extract_text() or "")
+        except Exception as e:
+            texts.append("")
+            logger.warning(f"Failed to extract page {page_number + 1} of {pdf_path}: {e}")
+    return texts
+
+
+async def extract_pdf_pages(pdf_path: str) -> List[str]:
+    """Text of every page of the PDF. Page ranges are extracted in parallel in the process pool."""
+    loop = asyncio.get_running_loop()
+    executor = get_pdf_executor()
+    page_count = await loop.run_in_executor(executor, _count_pages, pdf_path)
+    jobs = [
+        loop.run_in_executor(executor, _extract_pages, pdf_path, start, start + PAGES_PER_JOB)
+        for start in range(0, page_count, PAGES_PER_JOB)
+    ]
+    pages = []
+    for texts in await asyncio.gather(*jobs):
+        pages.extend(texts)
+    return pages
+
+
+def chunk_pages(pages: List[str], chunk_chars: int = DEFAULT_PDF_CHUNK_CHARS) -> List[Dict[str, Any]]:
+    """Splits page texts into chunks of about `chunk_chars` characters at paragraph or line breaks."""
+    chunks = []
+    for page_number, text in enumerate(pages, start=1):
+        current = ""
+        for paragraph in re.split(r"\n\s*\n|\n", text):
+            paragraph = paragraph.strip()
+            if not paragraph:
+                continue
+            if current and len(current) + len(paragraph) + 1 > chunk_chars:
+                chunks.append({"page": page_number, "text": current})
+                current = ""
+            while len(paragraph) > chunk_chars:
+                chunks.append({"page": page_number, "text": paragraph[:chunk_chars]})
+                paragraph = paragraph[chunk_chars:]
+            current = f"{current}\n{paragraph}" if current else paragraph
+        if current:
+            chunks.append({"page": page_number, "text": current})
+    return chunks
+
+
+def _terms(text: str) -> List[str]:
+    return [word for word in _WORD_PATTERN.findall(text.casefold()) if len(word) > 2]
+
+
+def rank_chunks(chunks: List[Dict[str, Any]], query: str, top_k: int = DEFAULT_PDF_TOP_K) -> List[Dict[str, Any]]:
+    """
+    Returns the `top_k` chunks most relevant to `query` by BM25 score, in document order.
+    Without query terms the first chunks are returned.
+    """
+    query_terms = set(_terms(query))
+    if not query_terms or not chunks:
+        return chunks[:top_k]
+    chunk_terms = [Counter(_terms(chunk["text"])) for chunk in chunks]
+    avg_length = sum(sum(terms.values()) for terms in chunk_terms) / len(chunks) or 1
+    document_frequency = {term: sum(1 for terms in chunk_terms if term in terms) for term in query_terms}
+    scored = []
+    for index, terms in enumerate(chunk_terms):
+        length = sum(terms.values())
+        score = 0.0
+        for term in query_terms:
+            frequency = terms.get(term, 0)
+            if not frequency:
+                continue
+            idf = math.log(1 + (len(chunks) - document_frequency[term] + 0.5) / (document_frequency[term] + 0.5))
+            score += idf * frequency * 2.2 / (frequency + 1.2 * (0.25 + 0.75 * length / avg_length))
+        if score > 0:
+            scored.append((score, index))
+    best = sorted(scored, reverse=True)[:top_k]
+    return [dict(chunks[index], score=round(score, 3)) for score, index in sorted(best, key=lambda item: item[1])]
+
+
+async def read_pdf(url: str, query: str, top_k: int = DEFAULT_PDF_TOP_K,
+                   chunk_chars: int = DEFAULT_PDF_CHUNK_CHARS,
+                   download_dir: str = PDF_DOWNLOAD_DIR) -> Dict[str, Any]:
+    """Downloads the PDF at `url`, extracts its text and returns the chunks most relevant to `query`."""
+    pdf_path = await download_pdf(url, download_dir)
+    pages = await extract_pdf_pages(pdf_path)
+    chunks = chunk_pages(pages, chunk_chars)
+    relevant_chunks = rank_chunks(chunks, query, top_k)
+    logger.info(f"Read {len(pages)} pages from {url}, returning {len(relevant_chunks)} of {len(chunks)} chunks.")
+    return {"url": url, "path": pdf_path, "pages": len(pages), "chunks": relevant_chunks}
+
+
+def format_pdf_result(result: Dict[str, Any]) -> str:
+    """Renders a `read_pdf` result as text for an LLM."""
+    if not result["chunks"]:
+        return f"No relevant text found in the PDF {result['url']} ({result['pages']} pages)."
+    parts = [f"Relevant passages from the PDF {result['url']} ({result['pages']} pages):"]
+    for chunk in result["chunks"]:
+        parts.append(f"[Page {chunk['page']}]\n{chunk['text']}")
+    return "\n\n".join(parts)
@@ -4,6 +4,7 @@ import gradio as gr
 import logging
 from gradio.components import Component
 
+from src.browser.browser_pool import get_browser_pool
 from src.webui.webui_manager import WebuiManager
 from src.utils import config
 
@@ -24,7 +25,7 @@ async def close_browser(webui_manager: WebuiManager):
 
     if webui_manager.bu_browser:
         logger.info("⚠️ Closing browser when changing browser config.")
-        await webui_manager.bu_browser.close()
+        await get_browser_pool().release_browser(webui_manager.bu_browser, close_if_idle=True)
         webui_manager.bu_browser = None
 
 def create_browser_settings_tab(webui_manager: WebuiManager):
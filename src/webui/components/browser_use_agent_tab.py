@@ -12,14 +12,13 @@ from browser_use.agent.views import (
     AgentHistoryList,
     AgentOutput,
 )
-from browser_use.browser.browser import BrowserConfig
 from browser_use.browser.context import BrowserContext, BrowserContextConfig
 from browser_use.browser.views import BrowserState
 from gradio.components import Component
 from langchain_core.language_models.chat_models import BaseChatModel
 
 from src.agent.browser_use.browser_use_agent import BrowserUseAgent
-from src.browser.custom_browser import CustomBrowser
+from src.browser.browser_pool import get_browser_pool
 from src.controller.custom_controller import CustomController
 from src.utils import llm_provider
 from src.webui.webui_manager import WebuiManager
@@ -444,36 +443,24 @@ async def run_agent_task(
                 webui_manager.bu_browser_context = None
             if webui_manager.bu_browser:
                 logger.info("Closing previous browser.")
-                await webui_manager.bu_browser.close()
+                await get_browser_pool().release_browser(webui_manager.bu_browser, close_if_idle=True)
                 webui_manager.bu_browser = None
 
         # Create Browser if needed
         if not webui_manager.bu_browser:
-            logger.info("Launching new browser instance.")
-            extra_args = []
-            if use_own_browser:
-                browser_binary_path = os.getenv("BROWSER_PATH", None) or browser_binary_path
-                if browser_binary_path == "":
-                    browser_binary_path = None
-                browser_user_data = browser_user_data_dir or os.getenv("BROWSER_USER_DATA", None)
-                if browser_user_data:
-                    extra_args += [f"--user-data-dir={browser_user_data}"]
-            else:
-                browser_binary_path = None
-
-            webui_manager.bu_browser = CustomBrowser(
-                config=BrowserConfig(
-                    headless=headless,
-                    disable_security=disable_security,
-                    browser_binary_path=browser_binary_path,
-                    extra_browser_args=extra_args,
-                    wss_url=wss_url,
-                    cdp_url=cdp_url,
-                    new_context_config=BrowserContextConfig(
-                        window_width=window_w,
-                        window_height=window_h,
-                    )
-                )
+            logger.info("Acquiring browser instance from the browser pool.")
+            webui_manager.bu_browser = await get_browser_pool().acquire_browser(
+                {
+                    "headless": headless,
+                    "disable_security": disable_security,
+                    "browser_binary_path": browser_binary_path,
+                    "user_data_dir": browser_user_data_dir,
+                    "use_own_browser": use_own_browser,
+                    "wss_url": wss_url,
+                    "cdp_url": cdp_url,
+                    "window_width": window_w,
+                    "window_height": window_h,
+                }
             )
 
         # Create Context if needed
@@ -748,7 +735,7 @@ async def run_agent_task(
                     webui_manager.bu_browser_context = None
                 if webui_manager.bu_browser:
                     logger.info("Closing browser after task.")
-                    await webui_manager.bu_browser.close()
+                    await get_browser_pool().release_browser(webui_manager.bu_browser, close_if_idle=True)
                     webui_manager.bu_browser = None
 
             # --- 8. Final UI Update ---
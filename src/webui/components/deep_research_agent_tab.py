@@ -9,12 +9,28 @@ import os
 from typing import Any, Dict, AsyncGenerator, Optional, Tuple, Union
 import asyncio
 import json
+import time
 from src.agent.deep_research.deep_research_agent import DeepResearchAgent
+from src.agent.deep_research.events import ResearchEventType
 from src.utils import llm_provider
+from src.webui.components.agent_settings_tab import update_model_dropdown
 
 logger = logging.getLogger(__name__)
 
 
+def _llm_config(provider: Optional[str], model_name: Optional[str], temperature: float,
+                base_url: Optional[str], api_key: Optional[str], num_ctx: Optional[int] = None) -> Dict[str, Any]:
+    """`llm_provider.get_llm_model` kwargs of the LLM settings, worker processes rebuild the model from them."""
+    return {
+        "provider": provider,
+        "model_name": model_name,
+        "temperature": temperature,
+        "base_url": base_url or None,
+        "api_key": api_key or None,
+        "num_ctx": num_ctx if provider == "ollama" else None,
+    }
+
+
 async def _initialize_llm(provider: Optional[str], model_name: Optional[str], temperature: float,
                           base_url: Optional[str], api_key: Optional[str], num_ctx: Optional[int] = None):
     """Initializes the LLM based on settings. Returns None if provider/model is missing."""
@@ -25,12 +41,7 @@ async def _initialize_llm(provider: Optional[str], model_name: Optional[str], te
         logger.info(f"Initializing LLM: Provider={provider}, Model={model_name}, Temp={temperature}")
         # Use your actual LLM provider logic here
         llm = llm_provider.get_llm_model(
-            provider=provider,
-            model_name=model_name,
-            temperature=temperature,
-            base_url=base_url or None,
-            api_key=api_key or None,
-            num_ctx=num_ctx if provider == "ollama" else None
+            **_llm_config(provider, model_name, temperature, base_url, api_key, num_ctx)
         )
         return llm
     except Exception as e:
@@ -40,6 +51,15 @@ async def _initialize_llm(provider: Optional[str], model_name: Optional[str], te
         return None
 
 
+# Model tiers of the deep research agent, (constructor argument, UI label). Unset tiers use the main LLM.
+MODEL_TIERS = (
+    ("planner_llm", "Planner"),
+    ("navigator_llm", "Browser Navigator"),
+    ("page_extraction_llm", "Page Extractor"),
+    ("synthesizer_llm", "Report Synthesizer"),
+)
+
+
 def _read_file_safe(file_path: str) -> Optional[str]:
     """Safely read a file, returning None if it doesn't exist or on error."""
     if not os.path.exists(file_path):
@@ -62,6 +82,8 @@ async def run_deep_research(webui_manager: WebuiManager, components: Dict[Compon
     research_task_comp = webui_manager.get_component_by_id("deep_research_agent.research_task")
     resume_task_id_comp = webui_manager.get_component_by_id("deep_research_agent.resume_task_id")
     parallel_num_comp = webui_manager.get_component_by_id("deep_research_agent.parallel_num")
+    parallel_task_num_comp = webui_manager.get_component_by_id("deep_research_agent.parallel_task_num")
+    use_query_cache_comp = webui_manager.get_component_by_id("deep_research_agent.use_query_cache")
     save_dir_comp = webui_manager.get_component_by_id(
         "deep_research_agent.max_query")  # Note: component ID seems misnamed in original code
     start_button_comp = webui_manager.get_component_by_id("deep_research_agent.start_button")
@@ -74,6 +96,8 @@ async def run_deep_research(webui_manager: WebuiManager, components: Dict[Compon
     task_topic = components.get(research_task_comp, "").strip()
     task_id_to_resume = components.get(resume_task_id_comp, "").strip() or None
     max_parallel_agents = int(components.get(parallel_num_comp, 1))
+    max_parallel_tasks = int(components.get(parallel_task_num_comp, 1))
+    use_query_cache = bool(components.get(use_query_cache_comp, True))
     base_save_dir = components.get(save_dir_comp, "./tmp/deep_research").strip()
     safe_root_dir = "./tmp/deep_research"
     normalized_base_save_dir = os.path.abspath(os.path.normpath(base_save_dir))
@@ -100,17 +124,15 @@ async def run_deep_research(webui_manager: WebuiManager, components: Dict[Compon
         research_task_comp: gr.update(interactive=False),
         resume_task_id_comp: gr.update(interactive=False),
         parallel_num_comp: gr.update(interactive=False),
+        parallel_task_num_comp: gr.update(interactive=False),
+        use_query_cache_comp: gr.update(interactive=False),
         save_dir_comp: gr.update(interactive=False),
         markdown_display_comp: gr.update(value="Starting research..."),
         markdown_download_comp: gr.update(value=None, interactive=False)
     }
 
-    agent_task = None
     running_task_id = None
-    plan_file_path = None
     report_file_path = None
-    last_plan_content = None
-    last_plan_mtime = 0
 
     try:
         # --- 3. Get LLM and Browser Config from other tabs ---
@@ -133,6 +155,30 @@ async def run_deep_research(webui_manager: WebuiManager, components: Dict[Compon
         )
         if not llm:
             raise ValueError("LLM Initialization failed. Please check Agent Settings.")
+        # The process browser backend rebuilds the navigator model in its workers from these settings
+        navigator_llm_config = _llm_config(
+            llm_provider_name, llm_model_name, llm_temperature, llm_base_url, llm_api_key, ollama_num_ctx
+        )
+
+        # Optional model tiers, they share temperature and, for the same provider, endpoint and key with the main LLM
+        tier_llms = {}
+        for tier, tier_label in MODEL_TIERS:
+            tier_provider = components.get(webui_manager.get_component_by_id(f"deep_research_agent.{tier}_provider"))
+            tier_model_name = components.get(webui_manager.get_component_by_id(f"deep_research_agent.{tier}_model_name"))
+            if not tier_provider:
+                continue
+            same_provider = tier_provider == llm_provider_name
+            tier_config = _llm_config(
+                tier_provider, tier_model_name, llm_temperature,
+                llm_base_url if same_provider else None,
+                llm_api_key if same_provider else None,
+                ollama_num_ctx
+            )
+            tier_llms[tier] = await _initialize_llm(**tier_config)
+            if not tier_llms[tier]:
+                raise ValueError(f"{tier_label} LLM Initialization failed. Please check the model tier settings.")
+            if tier == "navigator_llm":
+                navigator_llm_config = tier_config
 
         # Browser Config (from browser_settings tab)
         # Note: DeepResearchAgent constructor takes a dict, not full Browser/Context objects
@@ -141,96 +187,63 @@ async def run_deep_research(webui_manager: WebuiManager, components: Dict[Compon
             "disable_security": get_setting("browser_settings", "disable_security", False),
             "browser_binary_path": get_setting("browser_settings", "browser_binary_path"),
             "user_data_dir": get_setting("browser_settings", "browser_user_data_dir"),
+            "use_own_browser": get_setting("browser_settings", "use_own_browser", False),
+            "cdp_url": get_setting("browser_settings", "cdp_url"),
+            "wss_url": get_setting("browser_settings", "wss_url"),
             "window_width": int(get_setting("browser_settings", "window_w", 1280)),
             "window_height": int(get_setting("browser_settings", "window_h", 1100)),
             # Add other relevant fields if DeepResearchAgent accepts them
         }
 
-        # --- 4. Initialize or Get Agent ---
-        if not webui_manager.dr_agent:
-            webui_manager.dr_agent = DeepResearchAgent(
-                llm=llm,
-                browser_config=browser_config_dict,
-                mcp_server_config=mcp_config
-            )
-            logger.info("DeepResearchAgent initialized.")
-
-        # --- 5. Start Agent Run ---
-        agent_run_coro = webui_manager.dr_agent.run(
-            topic=task_topic,
-            task_id=task_id_to_resume,
-            save_dir=base_save_dir,
-            max_parallel_browsers=max_parallel_agents
+        # --- 4. Initialize Agent ---
+        # A new agent for every run, so changed LLM, model tier, browser and MCP settings take effect
+        if webui_manager.dr_agent:
+            await webui_manager.dr_agent.close_mcp_client()
+        webui_manager.dr_agent = DeepResearchAgent(
+            llm=llm,
+            browser_config=browser_config_dict,
+            mcp_server_config=mcp_config,
+            navigator_llm_config=navigator_llm_config,
+            **tier_llms
         )
-        agent_task = asyncio.create_task(agent_run_coro)
-        webui_manager.dr_current_task = agent_task
-
-        # Wait briefly for the agent to start and potentially create the task ID/folder
-        await asyncio.sleep(1.0)
-
-        # Determine the actual task ID being used (agent sets this)
-        running_task_id = webui_manager.dr_agent.current_task_id
-        if not running_task_id:
-            # Agent might not have set it yet, try to get from result later? Risky.
-            # Or derive from resume_task_id if provided?
-            running_task_id = task_id_to_resume
-            if not running_task_id:
-                logger.warning("Could not determine running task ID immediately.")
-                # We can still monitor, but might miss initial plan if ID needed for path
-            else:
-                logger.info(f"Assuming task ID based on resume ID: {running_task_id}")
-        else:
-            logger.info(f"Agent started with Task ID: {running_task_id}")
-
-        webui_manager.dr_task_id = running_task_id  # Store for stop handler
-
-        # --- 6. Monitor Progress via research_plan.md ---
-        if running_task_id:
-            task_specific_dir = os.path.join(base_save_dir, str(running_task_id))
-            plan_file_path = os.path.join(task_specific_dir, "research_plan.md")
-            report_file_path = os.path.join(task_specific_dir, "report.md")
-            logger.info(f"Monitoring plan file: {plan_file_path}")
-        else:
-            logger.warning("Cannot monitor plan file: Task ID unknown.")
-            plan_file_path = None
-        last_plan_content = None
-        while not agent_task.done():
-            update_dict = {}
-            update_dict[resume_task_id_comp] = gr.update(value=running_task_id)
-            agent_stopped = getattr(webui_manager.dr_agent, 'stopped', False)
-            if agent_stopped:
-                logger.info("Stop signal detected from agent state.")
-                break  # Exit monitoring loop
-
-            # Check and update research plan display
-            if plan_file_path:
-                try:
-                    current_mtime = os.path.getmtime(plan_file_path) if os.path.exists(plan_file_path) else 0
-                    if current_mtime > last_plan_mtime:
-                        logger.info(f"Detected change in {plan_file_path}")
-                        plan_content = _read_file_safe(plan_file_path)
-                        if last_plan_content is None or (
-                                plan_content is not None and plan_content != last_plan_content):
-                            update_dict[markdown_display_comp] = gr.update(value=plan_content)
-                            last_plan_content = plan_content
-                            last_plan_mtime = current_mtime
-                        elif plan_content is None:
-                            # File might have been deleted or became unreadable
-                            last_plan_mtime = 0  # Reset to force re-read attempt later
-                except Exception as e:
-                    logger.warning(f"Error checking/reading plan file {plan_file_path}: {e}")
-                    # Avoid continuous logging for the same error
-                    await asyncio.sleep(2.0)
-
-            # Yield updates if any
-            if update_dict:
-                yield update_dict
-
-            await asyncio.sleep(1.0)  # Check file changes every second
+        logger.info("DeepResearchAgent initialized.")
+
+        # --- 5. Start Agent Run and follow its event stream ---
+        webui_manager.dr_current_task = asyncio.current_task()
+        final_result_dict = None
+        plan_content = None
+        report_stream = ""
+        last_stream_update = 0.0
+        async for event in webui_manager.dr_agent.astream(
+                topic=task_topic,
+                task_id=task_id_to_resume,
+                save_dir=base_save_dir,
+                max_parallel_browsers=max_parallel_agents,
+                max_parallel_tasks=max_parallel_tasks,
+                use_query_cache=use_query_cache,
+        ):
+            if event.type == ResearchEventType.RUN_STARTED:
+                running_task_id = event.task_id
+                webui_manager.dr_task_id = running_task_id  # Store for stop handler
+                report_file_path = os.path.join(event.data["output_dir"], "report.md")
+                logger.info(f"Agent started with Task ID: {running_task_id}")
+                yield {resume_task_id_comp: gr.update(value=running_task_id)}
+            elif event.type in (ResearchEventType.PLAN_CREATED, ResearchEventType.PLAN_UPDATED):
+                plan_content = event.data["markdown"]
+                yield {markdown_display_comp: gr.update(value=plan_content)}
+            elif event.type == ResearchEventType.TASK_STARTED and plan_content:
+                yield {markdown_display_comp: gr.update(
+                    value=f"{plan_content}\n---\n*Researching: {event.data['task_description']}*")}
+            elif event.type == ResearchEventType.SYNTHESIS_TOKEN:
+                report_stream += event.data["text"]
+                # Streaming every token would flood the browser, refresh a few times per second
+                if time.monotonic() - last_stream_update > 0.25:
+                    last_stream_update = time.monotonic()
+                    yield {markdown_display_comp: gr.update(value=report_stream)}
+            elif event.type == ResearchEventType.RUN_FINISHED:
+                final_result_dict = event.data["result"]
 
         # --- 7. Task Finalization ---
-        logger.info("Agent task processing finished. Awaiting final result...")
-        final_result_dict = await agent_task  # Get result or raise exception
         logger.info(f"Agent run completed. Result keys: {final_result_dict.keys() if final_result_dict else 'None'}")
 
         # Try to get task ID from result if not known before
@@ -283,6 +296,8 @@ async def run_deep_research(webui_manager: WebuiManager, components: Dict[Compon
             research_task_comp: gr.update(interactive=True),
             resume_task_id_comp: gr.update(value="", interactive=True),
             parallel_num_comp: gr.update(interactive=True),
+            parallel_task_num_comp: gr.update(interactive=True),
+            use_query_cache_comp: gr.update(interactive=True),
             save_dir_comp: gr.update(interactive=True),
             # Keep download button enabled if file exists
             markdown_download_comp: gr.update() if report_file_path and os.path.exists(report_file_path) else gr.update(
@@ -310,16 +325,16 @@ async def stop_deep_research(webui_manager: WebuiManager) -> Dict[Component, Any
     if agent and task and not task.done():
         logger.info("Signalling DeepResearchAgent to stop.")
         try:
-            # Assuming stop is synchronous or sets a flag quickly
-            await agent.stop()
+            # Cancels in-flight sub-agents and returns once the run has ended, or after at most ~2s
+            stop_latency_s = await agent.stop()
+            if stop_latency_s is not None:
+                logger.info(f"Deep research stopped in {stop_latency_s:.2f}s.")
         except Exception as e:
             logger.error(f"Error calling agent.stop(): {e}")
 
-        # The run_deep_research loop should detect the stop and exit.
-        # We yield an intermediate "Stopping..." state. The final reset is done by run_deep_research.
+        # The run_deep_research loop sees the run finish and does the final UI reset.
 
         # Try to show the final report if available after stopping
-        await asyncio.sleep(1.5)  # Give agent a moment to write final files potentially
         report_file_path = None
         if task_id and base_save_dir:
             report_file_path = os.path.join(base_save_dir, str(task_id), "report.md")
@@ -395,8 +410,40 @@ def create_deep_research_agent_tab(webui_manager: WebuiManager):
             parallel_num = gr.Number(label="Parallel Agent Num", value=1,
                                      precision=0,
                                      interactive=True)
+            parallel_task_num = gr.Number(label="Parallel Task Num", value=1,
+                                          precision=0,
+                                          info="Tasks of one research category executed at once",
+                                          interactive=True)
+            use_query_cache = gr.Checkbox(label="Use Query Cache", value=True,
+                                          info="Reuse results of queries researched in earlier runs",
+                                          interactive=True)
             max_query = gr.Textbox(label="Research Save Dir", value="./tmp/deep_research",
                                    interactive=True)
+    with gr.Accordion("Model Tiers", open=False):
+        gr.Markdown("Optional models for single stages of the research, leave the provider empty to use the "
+                    "LLM of the Agent Settings. A fast model for the browser navigator saves the most time and cost.")
+        tier_components = {}
+        for tier, tier_label in MODEL_TIERS:
+            with gr.Row():
+                tier_provider = gr.Dropdown(
+                    choices=[provider for provider, model in config.model_names.items()],
+                    label=f"{tier_label} LLM Provider",
+                    value=None,
+                    interactive=True
+                )
+                tier_model_name = gr.Dropdown(
+                    label=f"{tier_label} LLM Model Name",
+                    interactive=True,
+                    allow_custom_value=True,
+                    info="Select a model in the dropdown options or directly type a custom model name"
+                )
+            tier_provider.change(
+                lambda provider: update_model_dropdown(provider),
+                inputs=[tier_provider],
+                outputs=[tier_model_name]
+            )
+            tier_components[f"{tier}_provider"] = tier_provider
+            tier_components[f"{tier}_model_name"] = tier_model_name
     with gr.Row():
         stop_button = gr.Button("⏹️ Stop", variant="stop", scale=2)
         start_button = gr.Button("▶️ Run", variant="primary", scale=3)
@@ -407,6 +454,8 @@ def create_deep_research_agent_tab(webui_manager: WebuiManager):
         dict(
             research_task=research_task,
             parallel_num=parallel_num,
+            parallel_task_num=parallel_task_num,
+            use_query_cache=use_query_cache,
             max_query=max_query,
             start_button=start_button,
             stop_button=stop_button,
@@ -415,6 +464,7 @@ def create_deep_research_agent_tab(webui_manager: WebuiManager):
             resume_task_id=resume_task_id,
             mcp_json_file=mcp_json_file,
             mcp_server_config=mcp_server_config,
+            **tier_components,
         )
     )
     webui_manager.add_components("deep_research_agent", tab_components)
@@ -0,0 +1,266 @@
+"""
+Offline benchmark of the deep research graph.
+
+Drives DeepResearchAgent with a scripted chat model and a fake browser sub-agent behind the real
+parallel_browser_search tool, both with configurable latency, so neither LLM APIs nor the internet
+are needed. For every plan size it reports end-to-end time, per graph node time, the time spent in
+persistence I/O (result store, checkpoints, plan and report files) and memory growth. With the
+default zero latencies all measured time is overhead of the graph code itself.
+
+    python tests/benchmark_deep_research.py --tasks 10 50 100 500
+    python tests/benchmark_deep_research.py --tasks 100 --llm-latency 0.05 --browser-latency 0.2 --json bench.json
+"""
+import sys
+
+sys.path.append(".")
+import argparse
+import asyncio
+import contextlib
+import functools
+import json
+import logging
+import math
+import os
+import resource
+import shutil
+import time
+import tracemalloc
+import uuid
+from typing import Any, Dict, List
+
+os.environ.setdefault("ANONYMIZED_TELEMETRY", "false")
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+import src.agent.deep_research.deep_research_agent as deep_research_agent
+from src.agent.deep_research.checkpointer import SqliteCheckpointSaver
+from src.agent.deep_research.result_store import SearchResultStore
+
+BENCHMARK_DIR = os.path.abspath("./tmp/deep_research/benchmark")
+TASKS_PER_CATEGORY = 10
+
+
+class ScriptedChatModel(BaseChatModel):
+    """Answers the prompts of the research graph from a script after `latency_s` seconds."""
+
+    task_count: int = 10
+    queries_per_task: int = 3
+    latency_s: float = 0.0
+    model_name: str = "scripted-benchmark-model"
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted-benchmark"
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        if self.latency_s:
+            time.sleep(self.latency_s)
+        return self._scripted_result(messages)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        if self.latency_s:
+            await asyncio.sleep(self.latency_s)
+        return self._scripted_result(messages)
+
+    def _scripted_result(self, messages) -> ChatResult:
+        message = self._respond(str(messages[-1].content))
+        input_tokens = sum(len(str(m.content)) for m in messages) // 4
+        output_tokens = len(str(message.content)) // 4 + 10
+        message.usage_metadata = {"input_tokens": input_tokens, "output_tokens": output_tokens,
+                                  "total_tokens": input_tokens + output_tokens}
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _respond(self, prompt: str) -> AIMessage:
+        if "research plan" in prompt and "JSON" in prompt:
+            plan = []
+            for start in range(0, self.task_count, TASKS_PER_CATEGORY):
+                tasks = [f"Benchmark task {index}" for index in range(start, min(start + TASKS_PER_CATEGORY,
+                                                                                   self.task_count))]
+                plan.append({"category_name": f"Category {len(plan) + 1}", "tasks": tasks})
+            return AIMessage(content=json.dumps(plan))
+        if "Specific Task:" in prompt:
+            task = prompt.split("Specific Task:")[1].split("\n")[0].strip()
+            queries = [f"{task} query {index}" for index in range(self.queries_per_task)]
+            return AIMessage(content="", tool_calls=[{"name": "parallel_browser_search", "args": {"queries": queries},
+                                                     "id": f"call_{uuid.uuid4().hex[:12]}"}])
+        return AIMessage(content="# Benchmark Report\n\n" + "The findings are summarized here. " * 40)
+
+
+def fake_browser_task(latency_s: float):
+    """Stand-in for run_single_browser_task that answers every query after `latency_s` seconds."""
+
+    async def run_single_browser_task(task_query: str, task_id: str, llm: Any, browser_config: Dict[str, Any],
+                                      stop_event, **kwargs) -> Dict[str, Any]:
+        if latency_s:
+            await asyncio.sleep(latency_s)
+        return {
+            "query": task_query,
+            "result": f"Finding for '{task_query}': " + "relevant benchmark content " * 60,
+            "status": "completed",
+            "steps": 3,
+            "sources": [{"url": f"https://example.com/{abs(hash(task_query))}", "title": task_query}],
+        }
+
+    return run_single_browser_task
+
+
+@contextlib.contextmanager
+def timed_io(io_times: Dict[str, float]):
+    """Accumulates the time spent in the persistence functions of the research graph in `io_times`."""
+    targets = [
+        (SearchResultStore, "extend", "result_store"),
+        (SqliteCheckpointSaver, "put", "checkpoints"),
+        (SqliteCheckpointSaver, "put_writes", "checkpoints"),
+        (deep_research_agent, "_save_plan_to_md", "plan_markdown"),
+        (deep_research_agent, "_save_report_to_md", "report_markdown"),
+    ]
+    originals = []
+    for owner, name, bucket in targets:
+        original = getattr(owner, name)
+        originals.append((owner, name, original))
+        io_times.setdefault(bucket, 0.0)
+
+        def timed(*args, _original=original, _bucket=bucket, **kwargs):
+            start_time = time.perf_counter()
+            try:
+                return _original(*args, **kwargs)
+            finally:
+                io_times[_bucket] += time.perf_counter() - start_time
+
+        setattr(owner, name, functools.wraps(original)(timed))
+    try:
+        yield io_times
+    finally:
+        for owner, name, original in originals:
+            setattr(owner, name, original)
+
+
+def _max_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss / (1024 * 1024) if sys.platform == "darwin" else max_rss / 1024
+
+
+async def benchmark_plan(
+        task_count: int,
+        llm_latency_s: float = 0.0,
+        browser_latency_s: float = 0.0,
+        queries_per_task: int = 3,
+        max_parallel_tasks: int = 1,
+        trace_memory: bool = False,
+        keep_output: bool = False,
+) -> Dict[str, Any]:
+    """Runs one research task with a plan of `task_count` tasks and returns its measurements."""
+    llm = ScriptedChatModel(task_count=task_count, queries_per_task=queries_per_task, latency_s=llm_latency_s)
+    agent = deep_research_agent.DeepResearchAgent(llm=llm, browser_config={"headless": True})
+    io_times: Dict[str, float] = {}
+
+    rss_before_mb = _max_rss_mb()
+    if trace_memory:
+        tracemalloc.start()
+    start_time = time.perf_counter()
+    with timed_io(io_times):
+        result = await agent.run(
+            f"Benchmark topic with {task_count} tasks",
+            save_dir=BENCHMARK_DIR,
+            max_parallel_browsers=queries_per_task,
+            max_parallel_tasks=max_parallel_tasks,
+            use_plan_cache=False,
+            use_query_cache=False,
+            use_page_store=False,
+            use_fast_fetch=False,
+            dedup_threshold=0,
+        )
+    wall_time_s = time.perf_counter() - start_time
+    traced_memory = None
+    if trace_memory:
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        traced_memory = {"current_mb": round(current / (1024 * 1024), 2), "peak_mb": round(peak / (1024 * 1024), 2)}
+
+    with open(result["metrics_path"], "r", encoding="utf-8") as f:
+        metrics = json.load(f)
+    nodes = {
+        name: {"calls": stats["calls"], "total_s": stats["total_s"],
+               "mean_ms": round(stats["total_s"] / stats["calls"] * 1000, 2), "max_ms": round(stats["max_s"] * 1000, 2)}
+        for name, stats in metrics["summary"]["nodes"].items()
+    }
+    llm_calls = sum(tier["calls"] for tier in metrics["summary"]["llm"].values())
+    # Time spent waiting for the fake LLM and browsers, exact for max_parallel_tasks=1
+    browser_waves = math.ceil(task_count / max_parallel_tasks)
+    external_wait_s = llm_calls * llm_latency_s / max_parallel_tasks + browser_waves * browser_latency_s
+
+    if not keep_output:
+        shutil.rmtree(os.path.join(BENCHMARK_DIR, result["task_id"]), ignore_errors=True)
+    return {
+        "tasks": task_count,
+        "status": result["status"],
+        "wall_time_s": round(wall_time_s, 3),
+        "graph_overhead_s": round(max(0.0, wall_time_s - external_wait_s), 3),
+        "overhead_per_task_ms": round(max(0.0, wall_time_s - external_wait_s) / task_count * 1000, 2),
+        "nodes": nodes,
+        "persistence_io_s": {bucket: round(seconds, 3) for bucket, seconds in io_times.items()},
+        "llm_calls": llm_calls,
+        "queries": metrics["summary"]["queries"]["count"],
+        "max_rss_growth_mb": round(_max_rss_mb() - rss_before_mb, 2),
+        "traced_memory": traced_memory,
+    }
+
+
+def _print_report(results: List[Dict[str, Any]]):
+    print(f"{'tasks':>6} {'status':>10} {'wall s':>8} {'overhead s':>10} {'ms/task':>8} {'exec ms':>8} "
+          f"{'I/O s':>7} {'ckpt s':>7} {'plan md s':>9} {'rss +MB':>8}")
+    for result in results:
+        execute_node = result["nodes"].get("execute_research", {})
+        io = result["persistence_io_s"]
+        print(f"{result['tasks']:>6} {result['status']:>10} {result['wall_time_s']:>8.2f} "
+              f"{result['graph_overhead_s']:>10.2f} {result['overhead_per_task_ms']:>8.1f} "
+              f"{execute_node.get('mean_ms', 0):>8.1f} {sum(io.values()):>7.2f} {io.get('checkpoints', 0):>7.2f} "
+              f"{io.get('plan_markdown', 0):>9.2f} {result['max_rss_growth_mb']:>8.1f}")
+
+
+async def benchmark_deep_research(task_counts: List[int], **benchmark_kwargs) -> List[Dict[str, Any]]:
+    results = []
+    for task_count in task_counts:
+        result = await benchmark_plan(task_count, **benchmark_kwargs)
+        if result["status"] != "completed":
+            print(f"Run with {task_count} tasks ended with status {result['status']}")
+        results.append(result)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline benchmark of the deep research graph")
+    parser.add_argument("--tasks", type=int, nargs="+", default=[10, 50, 100, 500], help="Plan sizes to run")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="Latency of each fake LLM call in seconds")
+    parser.add_argument("--browser-latency", type=float, default=0.0,
+                        help="Latency of each fake browser sub-agent in seconds")
+    parser.add_argument("--queries-per-task", type=int, default=3, help="Search queries the fake LLM issues per task")
+    parser.add_argument("--parallel-tasks", type=int, default=1, help="Tasks of one category run at once")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="Also measure Python allocations with tracemalloc (slows the run down)")
+    parser.add_argument("--keep-output", action="store_true", help="Keep the output dirs of the benchmark runs")
+    parser.add_argument("--json", type=str, default=None, help="Write the full results to this JSON file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    logging.getLogger("src").setLevel(logging.WARNING)
+    deep_research_agent.run_single_browser_task = fake_browser_task(args.browser_latency)
+    benchmark_results = asyncio.run(benchmark_deep_research(
+        args.tasks,
+        llm_latency_s=args.llm_latency,
+        browser_latency_s=args.browser_latency,
+        queries_per_task=args.queries_per_task,
+        max_parallel_tasks=args.parallel_tasks,
+        trace_memory=args.trace_memory,
+        keep_output=args.keep_output,
+    ))
+    _print_report(benchmark_results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(benchmark_results, f, indent=2)
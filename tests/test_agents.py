@@ -378,7 +378,7 @@ async def test_deep_research_agent():
             print("\n--- Final State Summary ---")
             print(
                 f"  Plan Steps Completed: {sum(1 for item in final_state.get('research_plan', []) if item.get('status') == 'completed')}")
-            print(f"  Total Search Results Logged: {len(final_state.get('search_results', []))}")
+            print(f"  Total Search Results Logged: {final_state.get('search_result_count', 0)}")
             if final_state.get("final_report"):
                 print("  Final Report: Generated (content omitted). You can find it in the output directory.")
                 # print("\n--- Final Report ---") # Optionally print report
@@ -394,7 +394,179 @@ async def test_deep_research_agent():
         print(e)
 
 
+async def test_fast_fetch():
+    import functools
+    import http.server
+    import tempfile
+    import threading
+
+    from src.agent.deep_research.fast_fetch import FastFetcher
+
+    # Serve a static article and a JavaScript-only page from a local HTTP server
+    site_dir = tempfile.mkdtemp()
+    with open(os.path.join(site_dir, "article.html"), "w") as f:
+        f.write("<html><head><title>Static Article</title></head><body><article><h1>Solar power</h1>" +
+                "".join(f"<p>Paragraph {i} about photovoltaic efficiency and storage.</p>" for i in range(20)) +
+                "</article></body></html>")
+    with open(os.path.join(site_dir, "app.html"), "w") as f:
+        f.write('<html><body><noscript>Please enable JavaScript.</noscript><div id="root"></div></body></html>')
+    server = http.server.ThreadingHTTPServer(
+        ("127.0.0.1", 0), functools.partial(http.server.SimpleHTTPRequestHandler, directory=site_dir)
+    )
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    fetcher = FastFetcher(max_concurrent=2)
+    try:
+        results = await fetcher.fetch_many([f"{base_url}/article.html", f"{base_url}/app.html",
+                                            f"{base_url}/missing.html"])
+        for result in results:
+            print(result["url"], result["status"], result.get("title"))
+        assert [result["status"] for result in results] == ["completed", "needs_browser", "failed"]
+        assert "photovoltaic" in results[0]["content"]
+        pprint(fetcher.get_stats())
+    finally:
+        await fetcher.aclose()
+        server.shutdown()
+
+
+async def test_llm_call_limiter():
+    from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+    from src.agent.deep_research.batch_runner import LLMCallLimiter, limit_llm_calls
+
+    limiter = LLMCallLimiter(max_concurrent_calls=2)
+    llm = limit_llm_calls(FakeListChatModel(responses=["done"], sleep=1.0), limiter)
+    # Calls cancelled mid-flight, like browser timeouts and stop requests do, must give their slot back
+    for _ in range(2):
+        try:
+            await asyncio.wait_for(llm.ainvoke("slow call"), timeout=0.1)
+        except asyncio.TimeoutError:
+            pass
+    assert limiter.get_stats()["in_flight"] == 0
+    fast_llm = limit_llm_calls(FakeListChatModel(responses=["done"]), limiter)
+    responses = await asyncio.wait_for(asyncio.gather(*[fast_llm.ainvoke("call") for _ in range(3)]), timeout=5)
+    assert [response.content for response in responses] == ["done"] * 3
+    pprint(limiter.get_stats())
+
+
+async def test_search_result_store():
+    import tempfile
+
+    from src.agent.deep_research.result_store import SearchResultStore
+
+    for compress in (False, True):
+        output_dir = tempfile.mkdtemp()
+        store = SearchResultStore(output_dir, compress=compress)
+        # Concurrent appends are written in batches, record ids follow the order of the calls
+        record_ids = await asyncio.gather(*[store.aappend({"query": f"query {i}", "result": "x" * i}) for i in range(10)])
+        assert record_ids == list(range(10))
+        assert [record["query"] for record in store.iter_records(start=7)] == ["query 7", "query 8", "query 9"]
+        assert store.get(3)["result"] == "xxx"
+        assert list(store.iter_records(start=10)) == []
+
+        # A crash while appending leaves a partial record and an index that does not match the data
+        with open(store.path, "ab") as f:
+            f.write(store._encode({"query": "partial"})[:5])
+        os.remove(store.index_path)
+        reopened = SearchResultStore(output_dir)
+        assert reopened.compress == compress
+        assert len(reopened) == 10
+        assert [record["query"] for record in reopened.iter_records(start=8)] == ["query 8", "query 9"]
+        assert reopened.append({"query": "after rebuild"}) == 10
+        assert reopened.get(10)["query"] == "after rebuild"
+        print(f"compress={compress}: {len(reopened)} records in {reopened.path}")
+
+
+async def test_checkpointer():
+    import operator
+    import tempfile
+    from typing import Annotated, List, TypedDict
+
+    from langgraph.checkpoint.base import create_checkpoint, empty_checkpoint
+    from langgraph.constants import ERROR
+    from langgraph.graph import END, StateGraph
+
+    from src.agent.deep_research.checkpointer import CHECKPOINT_DB_FILENAME, SqliteCheckpointSaver
+
+    output_dir = tempfile.mkdtemp()
+    db_path = os.path.join(output_dir, CHECKPOINT_DB_FILENAME)
+    saver = SqliteCheckpointSaver(db_path)
+    config = {"configurable": {"thread_id": "thread", "checkpoint_ns": ""}}
+
+    # A put only writes the channels that changed, a get returns the values of all of them
+    first = empty_checkpoint()
+    first["channel_values"] = {"topic": "solar", "results": [1]}
+    first["channel_versions"] = {"topic": "1", "results": "1"}
+    first_config = await saver.aput(config, first, {"step": 0}, {"topic": "1", "results": "1"})
+    second = create_checkpoint(first, None, 1)
+    second["channel_values"] = {"topic": "solar", "results": [1, 2]}
+    second["channel_versions"] = {"topic": "1", "results": "2"}
+    second_config = await saver.aput(first_config, second, {"step": 1}, {"results": "2"})
+    checkpoint_tuple = await saver.aget_tuple(config)
+    assert checkpoint_tuple.checkpoint["id"] == second["id"]
+    assert checkpoint_tuple.checkpoint["channel_values"] == {"topic": "solar", "results": [1, 2]}
+    assert checkpoint_tuple.metadata["step"] == 1
+    assert checkpoint_tuple.parent_config["configurable"]["checkpoint_id"] == first["id"]
+    # Only the latest checkpoint is kept
+    assert await saver.aget_tuple(first_config) is None
+    assert [t.checkpoint["id"] async for t in saver.alist(config)] == [second["id"]]
+
+    # Regular writes are kept as first written, special writes replace earlier ones
+    await saver.aput_writes(second_config, [("results", "first"), (ERROR, "first error")], "task")
+    await saver.aput_writes(second_config, [("results", "second"), (ERROR, "second error")], "task")
+    pending_writes = (await saver.aget_tuple(second_config)).pending_writes
+    assert sorted(pending_writes) == [("task", ERROR, "second error"), ("task", "results", "first")]
+
+    # Everything survives closing and reopening the database
+    saver.close()
+    saver = SqliteCheckpointSaver(db_path)
+    checkpoint_tuple = await saver.aget_tuple(config)
+    assert checkpoint_tuple.checkpoint["channel_values"]["results"] == [1, 2]
+    assert len(checkpoint_tuple.pending_writes) == 2
+    await saver.adelete_thread("thread")
+    assert await saver.aget_tuple(config) is None
+
+    # A graph that crashed resumes from its last completed node after a reopen
+    class State(TypedDict):
+        steps: Annotated[List[str], operator.add]
+
+    calls = []
+
+    def plan(state: State):
+        calls.append("plan")
+        return {"steps": ["plan"]}
+
+    def research(state: State):
+        calls.append("research")
+        if calls.count("research") == 1:
+            raise RuntimeError("crashed")
+        return {"steps": ["research"]}
+
+    builder = StateGraph(State)
+    builder.add_node("plan", plan)
+    builder.add_node("research", research)
+    builder.set_entry_point("plan")
+    builder.add_edge("plan", "research")
+    builder.add_edge("research", END)
+    run_config = {"configurable": {"thread_id": "graph"}}
+    try:
+        await builder.compile(checkpointer=saver).ainvoke({"steps": []}, run_config)
+    except RuntimeError:
+        pass
+    saver.close()
+    saver = SqliteCheckpointSaver(db_path)
+    result = await builder.compile(checkpointer=saver).ainvoke(None, run_config)
+    assert result["steps"] == ["plan", "research"]
+    assert calls == ["plan", "research", "research"]
+    saver.close()
+
+
 if __name__ == "__main__":
     asyncio.run(test_browser_use_agent())
     # asyncio.run(test_browser_use_parallel())
     # asyncio.run(test_deep_research_agent())
+    # asyncio.run(test_fast_fetch())
+    # asyncio.run(test_llm_call_limiter())
+    # asyncio.run(test_search_result_store())
+    # asyncio.run(test_checkpointer())
@@ -126,6 +126,67 @@ async def test_controller_with_mcp():
     pdb.set_trace()
 
 
+async def test_read_pdf_document():
+    import functools
+    import http.server
+    import os
+    import tempfile
+    import threading
+
+    from pypdf import PdfWriter
+    from pypdf.generic import DecodedStreamObject, DictionaryObject, NameObject
+
+    from src.controller.custom_controller import CustomController
+    from src.utils.pdf_reader import PAGES_PER_JOB
+
+    # A PDF long enough to be extracted in several jobs, with the relevant passage on page 32
+    site_dir = tempfile.mkdtemp()
+    font = DictionaryObject({NameObject("/Type"): NameObject("/Font"), NameObject("/Subtype"): NameObject("/Type1"),
+                             NameObject("/BaseFont"): NameObject("/Helvetica")})
+    writer = PdfWriter()
+    for page_number in range(1, 2 * PAGES_PER_JOB + 6):
+        lines = [f"Page {page_number} covers the general history of the topic."] * 20
+        if page_number == 32:
+            lines.insert(0, "Lithium ion battery storage prices dropped 90 percent.")
+        content = DecodedStreamObject()
+        content.set_data(("BT /F1 11 Tf 50 750 Td 14 TL " + " ".join(f"({line}) Tj T*" for line in lines) +
+                          " ET").encode())
+        page = writer.add_blank_page(612, 792)
+        page.replace_contents(content)
+        page[NameObject("/Resources")] = DictionaryObject(
+            {NameObject("/Font"): DictionaryObject({NameObject("/F1"): font})})
+    writer.write(os.path.join(site_dir, "report.pdf"))
+    with open(os.path.join(site_dir, "page.html"), "w") as f:
+        f.write("<html><body>Not a PDF</body></html>")
+    server = http.server.ThreadingHTTPServer(
+        ("127.0.0.1", 0), functools.partial(http.server.SimpleHTTPRequestHandler, directory=site_dir)
+    )
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    download_dir = tempfile.TemporaryDirectory()
+    controller = CustomController(pdf_download_dir=download_dir.name)
+    ActionModel_ = controller.registry.create_action_model()
+    try:
+        result = await controller.act(ActionModel_(read_pdf_document={"url": f"{base_url}/report.pdf",
+                                                                      "query": "battery storage prices"}))
+        print(result.extracted_content[:300])
+        assert result.error is None
+        assert f"({2 * PAGES_PER_JOB + 5} pages)" in result.extracted_content
+        assert "[Page 32]" in result.extracted_content and "dropped 90 percent" in result.extracted_content
+
+        result = await controller.act(ActionModel_(read_pdf_document={"url": f"{base_url}/page.html",
+                                                                      "query": "anything"}))
+        print(result.error)
+        assert result.error and "did not return a PDF" in result.error
+        # Only the PDF is kept, the rejected download left no partial file
+        assert [name for name in os.listdir(download_dir.name) if not name.endswith(".pdf")] == []
+    finally:
+        server.shutdown()
+        download_dir.cleanup()
+
+
 if __name__ == '__main__':
     # asyncio.run(test_mcp_client())
     asyncio.run(test_controller_with_mcp())
+    # asyncio.run(test_read_pdf_document())